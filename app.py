@@ -3,42 +3,17 @@ from langchain.callbacks.base import BaseCallbackHandler
 from langchain.memory import ConversationBufferMemory
 from langchain.schema.runnable import RunnableConfig
 import io
-import asyncio
+import time
 
-# --- Import update checker ---
-from pipeline_runner import AsyncPipelineRunner
-from qdrant_client import QdrantClient
-from config import validate_config, QDRANT_URL, QDRANT_API_KEY, STATE_CODES
+from data_version import read_data_version
 
-client = QdrantClient(
-    url=QDRANT_URL,
-    api_key=QDRANT_API_KEY,
-)
-
-runner = AsyncPipelineRunner(qdrant_client=client)
-
-async def process_all_states():
-    for state_code in STATE_CODES.keys():
-        try:
-            print(f"▶ Processing cadre/state: {state_code}")
-            await runner.run_for_cadre(state_code)
-        except Exception as e:
-            print(f"❌ Error in {state_code}: {e}")
+# Ingestion runs separately (refresh_worker.py); the app serves whatever is already in the collection.
 
 # --- Streamlit page setup ---
 st.set_page_config(page_title="IAS Officer Bot (Multi-Agent)", layout="wide")
 st.title("🎯 IAS Officer Search Bot (v5.1)")
 st.write("Now powered by LangChain agent + tools")
 
-# --- Run update check once at startup ---
-@st.cache_resource(show_spinner="🔄 Checking for updates in dataset...")
-def check_for_updates():
-    validate_config()
-    asyncio.run(process_all_states())
-    return True
-
-check_for_updates()
-
 # --- Cached Graph Loader ---
 @st.cache_resource(show_spinner="⚙️ Warming up reasoning engine...")
 def load_workflow():
@@ -46,6 +21,7 @@ def load_workflow():
     return app
 
 workflow = load_workflow()
+from main import result_cache  # same module instance as the cached workflow
 
 # --- Session State ---
 if "messages" not in st.session_state:
@@ -53,6 +29,15 @@ if "messages" not in st.session_state:
 if "memory" not in st.session_state:
     st.session_state.memory = ConversationBufferMemory(return_messages=True)
 
+# --- Sidebar: data freshness ---
+data_version = read_data_version()
+if data_version:
+    refreshed = time.strftime("%d %b %Y, %H:%M", time.localtime(data_version["refreshed_at"]))
+    st.sidebar.caption(f"📦 Data version {data_version['version']} · last refreshed {refreshed}")
+else:
+    st.sidebar.caption("📦 No refresh published yet. Answering from the existing collection.")
+st.sidebar.caption(f"💾 Cache hits: {result_cache.format_report()}")
+
 # --- Sidebar with Filters ---
 st.sidebar.header("🧰 Filters")
 st.sidebar.markdown(
@@ -135,6 +120,7 @@ if user_input:
         "search_results": [],
         "filtered_officers": [],
         "reasoning_output": "",
+        "expansion_skipped": False,
         "steps": []
     }
 
@@ -0,0 +1,4 @@
+# bench/
+#
+# Benchmarks; run them from the repository root as modules, e.g.
+#   python -m bench.bench_replica --path ./qdrant_data
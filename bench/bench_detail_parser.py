@@ -0,0 +1,73 @@
+# bench/bench_detail_parser.py
+#
+# Parity check and per-page parse-time benchmark for the supremo detail parsers.
+#
+#   python -m bench.bench_detail_parser recorded_pages/            # *.html files saved from supremo.nic.in
+#   python -m bench.bench_detail_parser recorded_pages/ --repeat 20
+#
+# Exits non-zero if the lxml extractor and the BeautifulSoup parser disagree on any page.
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from fetch_officer_details import parse_officer_details_bs4
+from detail_extractor import extract_officer_details
+
+
+def time_parser(parser, pages: list[str], repeat: int) -> list[float]:
+    timings = []
+    for html in pages:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            parser(html)
+        timings.append((time.perf_counter() - start) / repeat * 1000)
+    return timings
+
+
+def summarize(name: str, timings: list[float]) -> str:
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (
+        f"{name:<6} mean {statistics.mean(timings):7.2f} ms | "
+        f"p50 {statistics.median(timings):7.2f} ms | p95 {p95:7.2f} ms"
+    )
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Parity check and parse-time benchmark for supremo detail parsers")
+    ap.add_argument("pages_dir", type=Path, help="Directory of recorded supremo ER sheet *.html files")
+    ap.add_argument("--repeat", type=int, default=5, help="Parses per page for timing")
+    args = ap.parse_args()
+
+    files = sorted(args.pages_dir.glob("*.html"))
+    if not files:
+        sys.exit(f"No *.html files in {args.pages_dir}")
+    pages = [f.read_text(encoding="utf-8", errors="replace") for f in files]
+
+    mismatches = 0
+    for path, html in zip(files, pages):
+        expected = parse_officer_details_bs4(html)
+        actual = extract_officer_details(html)
+        if expected != actual:
+            mismatches += 1
+            print(f"❌ Mismatch: {path.name}")
+            for key in expected:
+                if expected[key] != actual.get(key):
+                    print(f"   {key}:\n     bs4  = {expected[key]}\n     lxml = {actual.get(key)}")
+
+    print(f"Parity: {len(files) - mismatches}/{len(files)} pages identical")
+
+    bs4_timings = time_parser(parse_officer_details_bs4, pages, args.repeat)
+    lxml_timings = time_parser(extract_officer_details, pages, args.repeat)
+    print(summarize("bs4", bs4_timings))
+    print(summarize("lxml", lxml_timings))
+    print(f"Speed-up: {statistics.mean(bs4_timings) / statistics.mean(lxml_timings):.1f}x")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# bench/bench_embedding.py
+#
+# Throughput benchmark: per-officer encoding (as the pipeline used to do) vs. the
+# micro-batching EmbeddingBatcher, on CPU, with synthetic officer profiles.
+#
+#   python -m bench.bench_embedding                        # nomic-embed-text-v1.5, 200 texts
+#   python -m bench.bench_embedding --texts 500 --model sentence-transformers/all-MiniLM-L6-v2
+
+import argparse
+import asyncio
+import random
+import time
+
+from config import EMBEDDING_MODEL_NAME, EMBED_MAX_BATCH_SIZE, EMBED_MAX_WAIT
+from embedding_batcher import EmbeddingBatcher
+from model_registry import get_model
+
+MINISTRIES = ["MeitY", "Finance", "Home Affairs", "DoPT", "NITI Aayog", "Health", "Rural Development"]
+AREAS = ["E-Governance", "Public Finance", "Land Revenue", "Health", "Industries", "Urban Development"]
+DESIGNATIONS = ["Collector", "Director", "Joint Secretary", "Commissioner", "Secretary", "Deputy Secretary"]
+
+
+def synthetic_officer_text(rng: random.Random) -> str:
+    """
+    Text shaped like FullPDFEmbedder.format_officer_as_text output, with a
+    realistic spread of lengths (2–30 experience rows).
+    """
+    parts = [
+        f"Name: Officer {rng.randint(1, 99999)}",
+        f"Cadre: {rng.choice(['Gujarat', 'Bihar', 'Kerala', 'Punjab'])}",
+        f"Allotment Year: {rng.randint(1987, 2022)}",
+        f"Education: B.Tech in {rng.choice(['Computer Science', 'Civil', 'Electrical'])} (First)",
+    ]
+    for _ in range(rng.randint(2, 30)):
+        parts.append(
+            f"Worked as ['{rng.choice(DESIGNATIONS)}'] in Govt ({rng.choice(MINISTRIES)}, "
+            f"{rng.choice(AREAS)}) during {rng.randint(1990, 2024)}"
+        )
+    return "\n".join(parts)
+
+
+def bench_sequential(model, texts: list[str]) -> tuple[float, list]:
+    start = time.perf_counter()
+    vectors = [model.encode(text, convert_to_numpy=True).tolist() for text in texts]
+    return time.perf_counter() - start, vectors
+
+
+async def bench_batched(model, texts: list[str], batch_size: int, max_wait: float) -> tuple[float, list, dict]:
+    batcher = EmbeddingBatcher(
+        lambda batch: model.encode(batch, batch_size=len(batch), convert_to_numpy=True).tolist(),
+        max_batch_size=batch_size,
+        max_wait=max_wait,
+    )
+    await batcher.start()
+    start = time.perf_counter()
+    vectors = await asyncio.gather(*(batcher.embed(text) for text in texts))
+    elapsed = time.perf_counter() - start
+    await batcher.stop()
+    return elapsed, vectors, batcher.stats
+
+
+def cosine(a: list[float], b: list[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = (sum(x * x for x in a) ** 0.5) * (sum(y * y for y in b) ** 0.5)
+    return dot / norm if norm else 0.0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Per-officer vs micro-batched embedding throughput")
+    ap.add_argument("--model", default=EMBEDDING_MODEL_NAME)
+    ap.add_argument("--texts", type=int, default=200)
+    ap.add_argument("--batch-size", type=int, default=EMBED_MAX_BATCH_SIZE)
+    ap.add_argument("--max-wait", type=float, default=EMBED_MAX_WAIT)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = [synthetic_officer_text(rng) for _ in range(args.texts)]
+    model = get_model(args.model)
+    model.encode(texts[:2])  # warm-up
+
+    seq_time, seq_vectors = bench_sequential(model, texts)
+    batch_time, batch_vectors, stats = asyncio.run(bench_batched(model, texts, args.batch_size, args.max_wait))
+    agreement = min(cosine(a, b) for a, b in zip(seq_vectors, batch_vectors))
+
+    print(f"Model: {args.model} | {len(texts)} texts | avg {sum(map(len, texts)) / len(texts):.0f} chars")
+    print(f"per-officer : {seq_time:7.2f}s  {len(texts) / seq_time:7.1f} texts/s")
+    print(f"batched     : {batch_time:7.2f}s  {len(texts) / batch_time:7.1f} texts/s "
+          f"({stats['batches']} batches, avg {stats['texts'] / stats['batches']:.1f})")
+    print(f"Speed-up    : {seq_time / batch_time:.2f}x | min cosine(per-officer, batched) = {agreement:.5f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# bench/bench_embedding_backends.py
+#
+# Compares the embedding backends (see embedding_backends.BACKENDS) against the
+# PyTorch baseline on CPU: load time, batch throughput, single-query latency and
+# cosine agreement of the vectors. Exits non-zero if any backend agrees with the
+# baseline less than --min-cosine (tests/test_embedding_backends.py checks the
+# same on a tiny model).
+#
+#   python -m bench.bench_embedding_backends                                   # nomic, all backends
+#   python -m bench.bench_embedding_backends --model sentence-transformers/all-MiniLM-L6-v2 --texts 50
+#   python -m bench.bench_embedding_backends --backends torch,onnx-int8 --min-cosine 0.98
+
+import argparse
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from bench.bench_embedding import synthetic_officer_text
+from config import EMBEDDING_MODEL_NAME
+from embedding_backends import BACKENDS
+from model_registry import get_model, loaded_models
+
+QUERIES = [
+    "Joint Secretary with experience in public finance",
+    "officer who worked on e-governance projects in MeitY",
+    "Collector with rural development background in Bihar",
+    "health secretary with a medical degree",
+]
+
+
+def bench_backend(model, texts: list[str], queries: list[str], batch_size: int) -> dict:
+    model.encode(texts[:2])  # warm-up
+    start = time.perf_counter()
+    vectors = model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+    throughput = len(texts) / (time.perf_counter() - start)
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        model.encode(query, convert_to_numpy=True)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "vectors": vectors,
+        "throughput": throughput,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(0.95 * (len(latencies) - 1))],
+    }
+
+
+def cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return (a * b).sum(axis=1)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Embedding backend throughput, latency and agreement vs PyTorch")
+    ap.add_argument("--model", default=EMBEDDING_MODEL_NAME)
+    ap.add_argument("--backends", default=",".join(BACKENDS), help="Comma-separated backends (torch is always run)")
+    ap.add_argument("--texts", type=int, default=200)
+    ap.add_argument("--batch-size", type=int, default=32)
+    ap.add_argument("--min-cosine", type=float, default=0.95, help="Fail if min cosine vs torch is below this")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = [synthetic_officer_text(rng) for _ in range(args.texts)]
+    queries = QUERIES * 5
+    backends = ["torch"] + [b for b in args.backends.split(",") if b and b != "torch"]
+
+    results = {}
+    for backend in backends:
+        results[backend] = bench_backend(get_model(args.model, backend), texts, queries, args.batch_size)
+    load_times = loaded_models()
+
+    baseline = results["torch"]
+    print(f"Model: {args.model} | {len(texts)} texts | avg {sum(map(len, texts)) / len(texts):.0f} chars")
+    print(f"{'backend':<11} {'load s':>7} {'texts/s':>8} {'speed-up':>8} {'p50 ms':>7} {'p95 ms':>7} "
+          f"{'min cos':>8} {'mean cos':>8}")
+    failed = []
+    for backend, r in results.items():
+        agreement = cosine_rows(baseline["vectors"], r["vectors"])
+        if agreement.min() < args.min_cosine:
+            failed.append(backend)
+        print(f"{backend:<11} {load_times[f'{args.model} ({backend})']:7.1f} {r['throughput']:8.1f} "
+              f"{r['throughput'] / baseline['throughput']:7.2f}x {r['p50_ms']:7.1f} {r['p95_ms']:7.1f} "
+              f"{agreement.min():8.4f} {agreement.mean():8.4f}")
+
+    if failed:
+        print(f"❌ Below min cosine {args.min_cosine}: {', '.join(failed)}")
+        sys.exit(1)
+    print(f"✅ All backends agree with torch (min cosine ≥ {args.min_cosine})")
+
+
+if __name__ == "__main__":
+    main()
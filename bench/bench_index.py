@@ -0,0 +1,170 @@
+# bench/bench_index.py
+#
+# Recall vs. latency vs. memory for Matryoshka dimension truncation and vector
+# quantization, to pick EMBEDDING_DIM and VECTOR_QUANTIZATION without guessing.
+#
+# Ground truth is exact cosine top-k at the model's full dimension. Recall and
+# memory are computed locally (quantization simulated in numpy, the way Qdrant
+# does it); with --qdrant-url every variant is also loaded into a temporary
+# collection on that server to measure real search latency and recall.
+#
+#   python -m bench.bench_index                                  # nomic, 2000 officers, local estimate
+#   python -m bench.bench_index --dims 768,256 --qdrant-url http://localhost:6333
+#   python -m bench.bench_index --model /path/to/small-model --officers 300 --dims 64,32
+
+import argparse
+import random
+import statistics
+import time
+import uuid
+
+import numpy as np
+
+from bench.bench_embedding import synthetic_officer_text, DESIGNATIONS, MINISTRIES, AREAS
+from config import EMBEDDING_MODEL_NAME, QUANTIZATION_OVERSAMPLING
+from model_registry import get_model, truncate_dim
+
+QUANTIZATIONS = ("none", "scalar", "binary")
+
+
+def synthetic_query(rng: random.Random) -> str:
+    return (f"{rng.choice(DESIGNATIONS)} with experience in {rng.choice(AREAS)} "
+            f"at {rng.choice(MINISTRIES)}")
+
+
+def normalise(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    idx = np.argpartition(-scores, kth=min(k, scores.shape[1] - 1), axis=1)[:, :k]
+    order = np.take_along_axis(scores, idx, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(idx, order, axis=1)
+
+
+def approximate_scores(corpus: np.ndarray, queries: np.ndarray, quantization: str) -> np.ndarray:
+    """Scores as seen through the quantized index (before any rescoring)."""
+    if quantization == "scalar":
+        # int8 over the 0.99 quantile range of all values, as Qdrant's ScalarQuantization
+        low, high = np.quantile(corpus, [0.005, 0.995])
+        scale = (high - low) / 255
+        codes = np.clip(np.round((corpus - low) / scale), 0, 255)
+        return queries @ (codes * scale + low).T
+    if quantization == "binary":
+        # 1 bit per dimension (sign); similarity = matching bits
+        return (np.sign(queries) @ np.sign(corpus).T)
+    return queries @ corpus.T
+
+
+def memory_mb(n: int, dim: int, quantization: str) -> tuple[float, float]:
+    """(RAM, disk) MB for the vectors alone; with quantization the originals can live on disk."""
+    full = n * dim * 4 / 1e6
+    if quantization == "scalar":
+        return n * dim / 1e6, full
+    if quantization == "binary":
+        return n * dim / 8 / 1e6, full
+    return full, 0.0
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+
+def local_variant(corpus: np.ndarray, queries: np.ndarray, truth: np.ndarray, dim: int, quantization: str,
+                  k: int, oversampling: float) -> dict:
+    corpus_d, queries_d = truncate_dim(corpus, dim), truncate_dim(queries, dim)
+    corpus_d, queries_d = normalise(corpus_d), normalise(queries_d)
+    approx = approximate_scores(corpus_d, queries_d, quantization)
+    result = {"recall": recall(top_k(approx, k), truth), "recall_rescored": None}
+    if quantization != "none":
+        candidates = top_k(approx, int(k * oversampling))
+        exact = np.einsum("qd,qcd->qc", queries_d, corpus_d[candidates])
+        rescored = np.take_along_axis(candidates, exact.argsort(axis=1)[:, ::-1][:, :k], axis=1)
+        result["recall_rescored"] = recall(rescored, truth)
+    return result
+
+
+def qdrant_variant(url: str, api_key: str | None, corpus: np.ndarray, queries: np.ndarray, truth: np.ndarray,
+                   dim: int, quantization: str, k: int, oversampling: float) -> dict:
+    """Load the variant into a temporary collection and time real searches (with rescoring if quantized)."""
+    from qdrant_client import QdrantClient
+    from qdrant_client.http.models import (
+        Distance, VectorParams, PointStruct, ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+        BinaryQuantization, BinaryQuantizationConfig, SearchParams, QuantizationSearchParams,
+    )
+
+    quantization_config = {
+        "none": None,
+        "scalar": ScalarQuantization(scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99,
+                                                                     always_ram=True)),
+        "binary": BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True)),
+    }[quantization]
+    params = None
+    if quantization_config is not None:
+        params = SearchParams(quantization=QuantizationSearchParams(rescore=True, oversampling=oversampling))
+
+    client = QdrantClient(url=url, api_key=api_key)
+    name = f"bench_index_{dim}_{quantization}_{uuid.uuid4().hex[:6]}"
+    corpus_d, queries_d = truncate_dim(corpus, dim), truncate_dim(queries, dim)
+    client.create_collection(
+        collection_name=name,
+        vectors_config=VectorParams(size=dim, distance=Distance.COSINE, on_disk=quantization != "none"),
+        quantization_config=quantization_config,
+    )
+    try:
+        for i in range(0, len(corpus_d), 256):
+            client.upsert(name, points=[
+                PointStruct(id=j, vector=corpus_d[j].tolist()) for j in range(i, min(i + 256, len(corpus_d)))
+            ], wait=True)
+        latencies, found = [], []
+        for query in queries_d:
+            start = time.perf_counter()
+            hits = client.query_points(name, query=query.tolist(), limit=k, search_params=params).points
+            latencies.append((time.perf_counter() - start) * 1000)
+            found.append([hit.id for hit in hits])
+        return {"qdrant_recall": recall(np.array(found), truth), "p50_ms": statistics.median(latencies)}
+    finally:
+        client.delete_collection(name)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Recall / latency / memory of truncated and quantized indexes")
+    ap.add_argument("--model", default=EMBEDDING_MODEL_NAME)
+    ap.add_argument("--officers", type=int, default=2000)
+    ap.add_argument("--queries", type=int, default=100)
+    ap.add_argument("--dims", default="768,512,256,128")
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--oversampling", type=float, default=QUANTIZATION_OVERSAMPLING)
+    ap.add_argument("--qdrant-url", help="Also measure on this Qdrant server (temporary collections)")
+    ap.add_argument("--qdrant-api-key")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    model = get_model(args.model)
+    corpus = model.encode([synthetic_officer_text(rng) for _ in range(args.officers)], convert_to_numpy=True)
+    queries = model.encode([synthetic_query(rng) for _ in range(args.queries)], convert_to_numpy=True)
+    truth = top_k(normalise(queries) @ normalise(corpus).T, args.k)
+    dims = [d for d in map(int, args.dims.split(",")) if d <= corpus.shape[1]]
+
+    print(f"Model: {args.model} ({corpus.shape[1]} dims) | {args.officers} officers | {args.queries} queries | "
+          f"recall@{args.k} vs exact full-dim search | oversampling {args.oversampling}")
+    header = f"{'dims':>5} {'quant':<7} {'RAM MB':>8} {'disk MB':>8} {'recall':>7} {'rescored':>8}"
+    if args.qdrant_url:
+        header += f" {'qdrant recall':>13} {'p50 ms':>7}"
+    print(header)
+    for dim in dims:
+        for quantization in QUANTIZATIONS:
+            r = local_variant(corpus, queries, truth, dim, quantization, args.k, args.oversampling)
+            ram, disk = memory_mb(args.officers, dim, quantization)
+            rescored = f"{r['recall_rescored']:8.3f}" if r["recall_rescored"] is not None else f"{'-':>8}"
+            line = f"{dim:>5} {quantization:<7} {ram:8.2f} {disk:8.2f} {r['recall']:7.3f} {rescored}"
+            if args.qdrant_url:
+                q = qdrant_variant(args.qdrant_url, args.qdrant_api_key, corpus, queries, truth, dim,
+                                   quantization, args.k, args.oversampling)
+                line += f" {q['qdrant_recall']:13.3f} {q['p50_ms']:7.2f}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
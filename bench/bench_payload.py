@@ -0,0 +1,63 @@
+# bench/bench_payload.py
+#
+# Bytes and time per search for each payload profile (config.PAYLOAD_PROFILES),
+# using random query vectors against the live collection (or a local one).
+#
+#   python -m bench.bench_payload                        # QDRANT_URL / QDRANT_API_KEY from config
+#   python -m bench.bench_payload --path ./qdrant_data   # local on-disk Qdrant
+#   python -m bench.bench_payload --searches 50 --limit 10
+
+import argparse
+import json
+import statistics
+import time
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import QueryRequest
+
+from config import QDRANT_URL, QDRANT_API_KEY, QDRANT_COLLECTION_NAME, EMBEDDING_SECTIONS, PAYLOAD_PROFILES
+
+
+def bench_profile(client: QdrantClient, queries: np.ndarray, profile: str, limit: int) -> dict:
+    sizes, seconds = [], []
+    for query in queries:
+        start = time.perf_counter()
+        responses = client.query_batch_points(
+            collection_name=QDRANT_COLLECTION_NAME,
+            requests=[
+                QueryRequest(query=query.tolist(), using=section, limit=limit,
+                             with_payload=PAYLOAD_PROFILES[profile], with_vector=False)
+                for section in EMBEDDING_SECTIONS
+            ],
+        )
+        seconds.append(time.perf_counter() - start)
+        payloads = [point.payload for response in responses for point in response.points]
+        sizes.append(len(json.dumps(payloads, ensure_ascii=False, default=str).encode("utf-8")))
+    return {"kb": statistics.mean(sizes) / 1024, "p50_ms": statistics.median(seconds) * 1000}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Payload bytes and latency per search, by payload profile")
+    ap.add_argument("--path", help="Local Qdrant storage path instead of QDRANT_URL")
+    ap.add_argument("--searches", type=int, default=20)
+    ap.add_argument("--limit", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    client = QdrantClient(path=args.path) if args.path else QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY)
+    info = client.get_collection(QDRANT_COLLECTION_NAME)
+    dim = info.config.params.vectors[EMBEDDING_SECTIONS[0]].size
+    queries = np.random.default_rng(args.seed).normal(size=(args.searches, dim))
+
+    print(f"{QDRANT_COLLECTION_NAME}: {info.points_count} points | {args.searches} searches × "
+          f"{len(EMBEDDING_SECTIONS)} sections, limit {args.limit}")
+    results = {profile: bench_profile(client, queries, profile, args.limit) for profile in PAYLOAD_PROFILES}
+    full = results["full"]
+    for profile, r in results.items():
+        print(f"{profile:<5} {r['kb']:8.1f} KB/search ({r['kb'] / full['kb']:5.1%} of full) "
+              f"{r['p50_ms']:7.2f} ms p50")
+
+
+if __name__ == "__main__":
+    main()
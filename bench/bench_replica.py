@@ -0,0 +1,125 @@
+# bench/bench_replica.py
+#
+# Parity and latency of the in-process replica (local_replica.py) against Qdrant:
+# syncs a throwaway replica, then runs the same random section searches (and, if
+# the replica holds the lexical vectors, BM25 searches) with and without filters
+# on both. Exits non-zero if any ranking's scores differ by more than --tolerance
+# (float16 storage).
+#
+#   python -m bench.bench_replica                        # QDRANT_URL / QDRANT_API_KEY from config
+#   python -m bench.bench_replica --path ./qdrant_data   # local on-disk Qdrant
+#   python -m bench.bench_replica --searches 100 --limit 5
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Filter, FieldCondition, MatchValue, QueryRequest, Range
+
+import local_replica
+from config import (
+    QDRANT_URL, QDRANT_API_KEY, QDRANT_COLLECTION_NAME, EMBEDDING_SECTIONS, PAYLOAD_PROFILES, LEXICAL_VECTOR,
+)
+from lexical_index import sparse_query
+from local_replica import LocalReplica
+
+LEXICAL_QUERIES = ("finance budget", "health education", "urban development", "MeitY", "B.Tech IIT",
+                   "district collector", "rural water supply", "energy transport", "economics policy")
+
+
+def sample_filters(client: QdrantClient) -> dict[str, Filter | None]:
+    """Filters like semantic_search builds, with values taken from the collection."""
+    points, _ = client.scroll(QDRANT_COLLECTION_NAME, limit=1, with_payload=["cadre", "allotment_year"])
+    payload = points[0].payload if points else {}
+    filters = {"none": None}
+    if payload.get("cadre"):
+        filters["cadre"] = Filter(must=[FieldCondition(key="cadre", match=MatchValue(value=payload["cadre"]))])
+    if isinstance(payload.get("allotment_year"), int):
+        filters["year range"] = Filter(must=[FieldCondition(key="allotment_year",
+                                                            range=Range(gte=float(payload["allotment_year"])))])
+    filters["title"] = Filter(should=[FieldCondition(key="current_title", match=MatchValue(value=title))
+                                      for title in ("Joint Secretary", "Director")])
+    return filters
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local replica vs Qdrant: score parity and latency")
+    ap.add_argument("--path", help="Local Qdrant storage path instead of QDRANT_URL")
+    ap.add_argument("--searches", type=int, default=50)
+    ap.add_argument("--limit", type=int, default=5)
+    ap.add_argument("--tolerance", type=float, default=5e-3)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    client = QdrantClient(path=args.path) if args.path else QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY)
+    replica = LocalReplica(tempfile.mkdtemp(prefix="replica_"))
+    synced = replica.sync(client)
+    local_replica.current_data_version = lambda: replica.read_pointer()["version"]  # bench only: always current
+    dim = replica.read_pointer()["dim"]
+    rng = np.random.default_rng(args.seed)
+
+    print(f"{QDRANT_COLLECTION_NAME}: {synced['officers']} officers, synced in {synced['seconds']:.1f}s | "
+          f"{args.searches} searches × {len(EMBEDDING_SECTIONS)} sections, limit {args.limit}")
+    filters = sample_filters(client)
+    failed = False
+
+    def compare(name: str, runs: list[tuple], rankings: int):
+        """runs: (replica ms, qdrant ms, replica responses, qdrant responses) per search."""
+        nonlocal failed
+        same, worst = 0, 0.0
+        for _, _, local, remote in runs:
+            for a, b in zip(local, remote):
+                same += [p.id for p in a.points] == [p.id for p in b.points]
+                if len(a.points) != len(b.points):
+                    worst = float("inf")
+                elif a.points:
+                    worst = max(worst, max(abs(x.score - y.score) for x, y in zip(a.points, b.points)))
+        failed |= worst > args.tolerance
+        print(f"{name:<11} {statistics.median(r[0] for r in runs):10.2f} "
+              f"{statistics.median(r[1] for r in runs):10.2f} {same / rankings:9.1%} {worst:10.4f}")
+
+    def timed(search):
+        start = time.perf_counter()
+        result = search()
+        return (time.perf_counter() - start) * 1000, result
+
+    print(f"{'dense':<11} {'replica ms':>10} {'qdrant ms':>10} {'same ids':>9} {'max Δscore':>10}")
+    for name, qdrant_filter in filters.items():
+        runs = []
+        for query in rng.normal(size=(args.searches, dim)).astype(np.float32):
+            local_ms, local = timed(lambda: replica.search(query[None, :], qdrant_filter, args.limit))
+            remote_ms, remote = timed(lambda: client.query_batch_points(QDRANT_COLLECTION_NAME, requests=[
+                QueryRequest(query=query.tolist(), using=section, filter=qdrant_filter, limit=args.limit,
+                             with_payload=PAYLOAD_PROFILES["list"])
+                for section in EMBEDDING_SECTIONS
+            ]))
+            runs.append((local_ms, remote_ms, local, remote))
+        compare(name, runs, args.searches * len(EMBEDDING_SECTIONS))
+
+    if replica.read_pointer().get("lexical"):
+        print(f"{'lexical':<11} {'replica ms':>10} {'qdrant ms':>10} {'same ids':>9} {'max Δscore':>10}")
+        for name, qdrant_filter in filters.items():
+            runs = []
+            for query in map(sparse_query, LEXICAL_QUERIES):
+                local_ms, local = timed(lambda: replica.lexical_search([query], qdrant_filter, args.limit))
+                remote_ms, remote = timed(lambda: client.query_batch_points(QDRANT_COLLECTION_NAME, requests=[
+                    QueryRequest(query=query, using=LEXICAL_VECTOR, filter=qdrant_filter, limit=args.limit,
+                                 with_payload=PAYLOAD_PROFILES["list"])
+                ]))
+                runs.append((local_ms, remote_ms, local, remote))
+            compare(name, runs, len(LEXICAL_QUERIES))
+    else:
+        print("(replica synced without lexical vectors: BM25 searches go to Qdrant)")
+
+    if failed:
+        print(f"❌ Replica scores differ from Qdrant by more than {args.tolerance}")
+        sys.exit(1)
+    print(f"✅ Replica matches Qdrant within {args.tolerance} (id differences are ties)")
+
+
+if __name__ == "__main__":
+    main()
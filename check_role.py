@@ -4,6 +4,8 @@ import json
 import re
 from dotenv import load_dotenv
 from openai import OpenAI
+from config import TITLE_LEVELS
+from lexical_index import lexical_anchors
 
 # Load credentials
 load_dotenv(dotenv_path="GITHUB_TOKEN.env")
@@ -13,16 +15,6 @@ token = os.environ["GITHUB_TOKEN"]
 model = "gpt-4o"
 client = OpenAI(api_key=token)
 
-TITLES = [
-    "Junior Scale",
-    "Under Secretary",
-    "Deputy Secretary",
-    "Director",
-    "Joint Secretary",
-    "Additional Secretary",
-    "Secretary"
-]
-
 def safe_json_parse(text, fallback="{}"):
     """Parse JSON robustly from response."""
     try:
@@ -36,6 +28,28 @@ def safe_json_parse(text, fallback="{}"):
                 pass
         return json.loads(fallback)
 
+def infer_title(query: str) -> str | None:
+    """The longest of the TITLE_LEVELS titles named in the query (whole words, any case), e.g. "Joint Secretary"."""
+    for title in sorted(TITLE_LEVELS, key=len, reverse=True):
+        if re.search(rf"\b{re.escape(title)}\b", query, re.IGNORECASE):
+            return title
+    return None
+
+
+def lexical_intent(query: str) -> dict | None:
+    """
+    Intent without the LLM for queries that already carry strong lexical anchors
+    (MeitY, B.Tech, DoPT, "NITI Aayog") and name the target title: the raw query
+    is searched as is, where the BM25 side of hybrid search matches the anchors
+    exactly. None when either is missing, so check_role_intent expands the query.
+    """
+    anchors = lexical_anchors(query)
+    title = infer_title(query)
+    if not anchors or not title:
+        return None
+    return {"queries": [query], "current_title": title, "anchors": anchors}
+
+
 @tool
 def check_role_intent(query: str) -> dict:
     """
@@ -45,7 +59,7 @@ def check_role_intent(query: str) -> dict:
       - `queries`: semantic search prompts for vector similarity.
       - `current_title`: The position for which the recommendations are being made.
     """
-    titles_str = "\n".join(f"- {title}" for title in TITLES)
+    titles_str = "\n".join(f"- {title}" for title in TITLE_LEVELS)
 
     system_prompt = f"""
 You are an expert assistant that identifies IAS role recommendation requests and generates semantic search prompts.
@@ -0,0 +1,283 @@
+# collection_schema.py
+#
+# Declared layout of the officer collection: named section vectors, the sparse
+# lexical vector, quantization, on-disk payload and the payload indexes that
+# every filtered search relies on.
+# ensure_collection() diffs the declaration against the live collection and applies
+# the missing migrations (or, with apply=False, only reports them); on an
+# up-to-date collection it changes nothing.
+#
+#   python collection_schema.py            # show what differs from the declaration
+#   python collection_schema.py --apply    # apply the migrations
+
+import argparse
+from collections import defaultdict
+
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import (
+    Distance,
+    VectorParams,
+    VectorParamsDiff,
+    CollectionParamsDiff,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    QuantizationSearchParams,
+    SearchParams,
+    Disabled,
+    PayloadSchemaType,
+    SparseVectorParams,
+    Modifier,
+    SetPayload,
+    SetPayloadOperation,
+)
+
+from config import (
+    QDRANT_URL, QDRANT_API_KEY, QDRANT_COLLECTION_NAME, EMBEDDING_DIM, EMBEDDING_SECTIONS,
+    VECTOR_QUANTIZATION, QUANTIZATION_ALWAYS_RAM, QUANTIZATION_RESCORE, QUANTIZATION_OVERSAMPLING,
+    PAYLOAD_INDEXES, PAYLOAD_ON_DISK, UPSERT_BATCH_SIZE, HYBRID_SEARCH, LEXICAL_VECTOR,
+)
+from logger_config import setup_logger
+
+logger = setup_logger()
+
+SCROLL_PAGE_SIZE = 1000
+
+
+# === Declaration ===
+def vectors_config() -> dict[str, VectorParams]:
+    """One named vector per officer section (see EMBEDDING_SECTIONS)."""
+    return {
+        section: VectorParams(
+            size=EMBEDDING_DIM,
+            distance=Distance.COSINE,
+            on_disk=VECTOR_QUANTIZATION != "none",  # originals only needed for rescoring
+        )
+        for section in EMBEDDING_SECTIONS
+    }
+
+
+def sparse_vectors_config() -> dict[str, SparseVectorParams]:
+    """The BM25 lexical vector when HYBRID_SEARCH is on; Qdrant applies IDF at query time."""
+    if not HYBRID_SEARCH:
+        return {}
+    return {LEXICAL_VECTOR: SparseVectorParams(modifier=Modifier.IDF)}
+
+
+def quantization_config():
+    """Qdrant quantization config for VECTOR_QUANTIZATION (None = full float32 only)."""
+    if VECTOR_QUANTIZATION == "scalar":
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=QUANTIZATION_ALWAYS_RAM)
+        )
+    if VECTOR_QUANTIZATION == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=QUANTIZATION_ALWAYS_RAM))
+    if VECTOR_QUANTIZATION != "none":
+        raise ValueError(f"Unknown VECTOR_QUANTIZATION '{VECTOR_QUANTIZATION}'. Use none, scalar or binary.")
+    return None
+
+
+def search_params() -> SearchParams | None:
+    """Search params that rescore quantized candidates with the original vectors."""
+    if VECTOR_QUANTIZATION == "none":
+        return None
+    return SearchParams(
+        quantization=QuantizationSearchParams(rescore=QUANTIZATION_RESCORE, oversampling=QUANTIZATION_OVERSAMPLING)
+    )
+
+
+def payload_indexes() -> dict[str, PayloadSchemaType]:
+    """Indexed payload field → index type (see PAYLOAD_INDEXES)."""
+    return {field: PayloadSchemaType(kind) for field, kind in PAYLOAD_INDEXES.items()}
+
+
+# === Diff ===
+def plan_migrations(client: QdrantClient, collection: str = QDRANT_COLLECTION_NAME) -> list[dict]:
+    """
+    Steps that bring the live collection to the declared schema, in order.
+    Raises ValueError when the vector layout differs, which only a recreate can fix.
+    """
+    info = client.get_collection(collection)
+    params = info.config.params
+    vectors = params.vectors
+    layout = {name: p.size for name, p in vectors.items()} if isinstance(vectors, dict) else {}
+    if layout != {section: EMBEDDING_DIM for section in EMBEDDING_SECTIONS}:
+        raise ValueError(
+            f"Collection '{collection}' vectors {layout or vectors.size} do not match "
+            f"{EMBEDDING_DIM}-dim section vectors {EMBEDDING_SECTIONS}. Recreate it with "
+            f"'python refresh_worker.py --recreate-collection' (re-ingests every officer)."
+        )
+    sparse = params.sparse_vectors or {}
+    if not set(sparse_vectors_config()) <= set(sparse):
+        raise ValueError(
+            f"Collection '{collection}' has no sparse '{LEXICAL_VECTOR}' vector for HYBRID_SEARCH. Recreate it "
+            f"with 'python refresh_worker.py --recreate-collection' (re-ingests every officer), "
+            f"or set HYBRID_SEARCH=false."
+        )
+
+    steps = []
+    modifiers = {name: p for name, p in sparse_vectors_config().items() if sparse[name].modifier != p.modifier}
+    if modifiers:
+        steps.append({"action": "sparse_modifier", "vectors": modifiers,
+                      "description": f"sparse vector modifiers: {', '.join(modifiers)} → idf"})
+
+    on_disk = {name: p.on_disk for name, p in vectors_config().items() if bool(vectors[name].on_disk) != p.on_disk}
+    if on_disk:
+        steps.append({"action": "vectors_on_disk", "vectors": on_disk,
+                      "description": f"vectors on disk: {on_disk}"})
+
+    wanted = quantization_config()
+    if info.config.quantization_config != wanted:
+        steps.append({"action": "quantization", "config": wanted,
+                      "description": f"quantization → {VECTOR_QUANTIZATION}"})
+
+    if bool(params.on_disk_payload) != PAYLOAD_ON_DISK:
+        steps.append({"action": "payload_on_disk", "on_disk": PAYLOAD_ON_DISK,
+                      "description": f"payload on disk → {PAYLOAD_ON_DISK}"})
+
+    live = {field: index.data_type for field, index in (info.payload_schema or {}).items()}
+    for field, kind in payload_indexes().items():
+        if live.get(field) == kind:
+            continue
+        if kind == PayloadSchemaType.INTEGER:
+            steps.append({"action": "coerce_integers", "field": field,
+                          "description": f"convert '{field}' values to integers"})
+        if field in live:
+            steps.append({"action": "drop_index", "field": field,
+                          "description": f"drop {live[field].value} index on '{field}'"})
+        steps.append({"action": "create_index", "field": field, "kind": kind,
+                      "description": f"create {kind.value} index on '{field}'"})
+
+    undeclared = sorted(set(live) - set(PAYLOAD_INDEXES))
+    if undeclared:
+        logger.info(f"ℹ️ Payload indexes not in the schema (left as they are): {', '.join(undeclared)}")
+    return steps
+
+
+# === Migrations ===
+def coerce_integers(client: QdrantClient, collection: str, field: str) -> int:
+    """
+    Rewrite numeric strings in `field` as integers, so an integer index (and
+    Range filters) cover every point. Returns the number of points changed.
+    """
+    by_value = defaultdict(list)
+    offset, invalid = None, 0
+    while True:
+        points, offset = client.scroll(collection_name=collection, limit=SCROLL_PAGE_SIZE, offset=offset,
+                                       with_payload=[field], with_vectors=False)
+        for point in points:
+            value = (point.payload or {}).get(field)
+            if isinstance(value, str):
+                try:
+                    by_value[int(value.strip())].append(point.id)
+                except ValueError:
+                    invalid += 1
+        if offset is None:
+            break
+
+    operations = [
+        SetPayloadOperation(set_payload=SetPayload(payload={field: value}, points=ids[i:i + UPSERT_BATCH_SIZE]))
+        for value, ids in by_value.items()
+        for i in range(0, len(ids), UPSERT_BATCH_SIZE)
+    ]
+    for i in range(0, len(operations), UPSERT_BATCH_SIZE):
+        client.batch_update_points(collection_name=collection, update_operations=operations[i:i + UPSERT_BATCH_SIZE])
+    if invalid:
+        logger.warning(f"⚠️ {invalid} points have a non-numeric '{field}' and stay unindexed")
+    return sum(len(ids) for ids in by_value.values())
+
+
+def apply_migration(client: QdrantClient, step: dict, collection: str = QDRANT_COLLECTION_NAME):
+    action = step["action"]
+    if action == "vectors_on_disk":
+        client.update_collection(collection_name=collection, vectors_config={
+            name: VectorParamsDiff(on_disk=on_disk) for name, on_disk in step["vectors"].items()
+        })
+    elif action == "sparse_modifier":
+        client.update_collection(collection_name=collection, sparse_vectors_config=step["vectors"])
+    elif action == "quantization":
+        client.update_collection(collection_name=collection, quantization_config=step["config"] or Disabled.DISABLED)
+    elif action == "payload_on_disk":
+        client.update_collection(collection_name=collection,
+                                 collection_params=CollectionParamsDiff(on_disk_payload=step["on_disk"]))
+    elif action == "coerce_integers":
+        changed = coerce_integers(client, collection, step["field"])
+        logger.info(f"✅ Converted '{step['field']}' to integers on {changed} points")
+    elif action == "drop_index":
+        client.delete_payload_index(collection_name=collection, field_name=step["field"], wait=True)
+    elif action == "create_index":
+        client.create_payload_index(collection_name=collection, field_name=step["field"],
+                                    field_schema=step["kind"], wait=True)
+    else:
+        raise ValueError(f"Unknown schema migration '{action}'")
+
+
+def ensure_collection(client: QdrantClient, recreate: bool = False, apply: bool = True,
+                      collection: str = QDRANT_COLLECTION_NAME) -> list[dict]:
+    """
+    Create the collection from the declaration if it is missing (or recreate it),
+    otherwise apply whatever migrations it still needs. With apply=False nothing
+    is written: a missing collection raises and pending migrations are only logged.
+    Returns the migration steps (applied or pending).
+    """
+    exists = client.collection_exists(collection)
+    if not apply:
+        if not exists:
+            raise ValueError(f"Collection '{collection}' does not exist. "
+                             f"Create it with 'python collection_schema.py --apply'.")
+        steps = plan_migrations(client, collection)
+        if steps:
+            logger.warning(f"⚠️ {len(steps)} schema migrations pending on {collection} "
+                           f"(apply with 'python collection_schema.py --apply'): "
+                           f"{'; '.join(step['description'] for step in steps)}")
+        else:
+            logger.info(f"✅ Collection {collection} matches the declared schema")
+        return steps
+
+    if recreate and exists:
+        logger.warning(f"⚠️ Dropping collection '{collection}' to recreate it")
+        client.delete_collection(collection)
+        exists = False
+    if not exists:
+        logger.warning(f"⚠️ Collection '{collection}' not found. Creating...")
+        client.create_collection(
+            collection_name=collection,
+            vectors_config=vectors_config(),
+            sparse_vectors_config=sparse_vectors_config(),
+            quantization_config=quantization_config(),
+            on_disk_payload=PAYLOAD_ON_DISK,
+        )
+        logger.info(f"✅ Created Qdrant collection: {collection} "
+                    f"({EMBEDDING_DIM} dims, quantization: {VECTOR_QUANTIZATION})")
+
+    steps = plan_migrations(client, collection)
+    for step in steps:
+        apply_migration(client, step, collection)
+        logger.info(f"✅ Schema migration on {collection}: {step['description']}")
+    if exists and not steps:
+        logger.info(f"✅ Collection {collection} matches the declared schema")
+    return steps
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Diff the Qdrant collection against the declared schema")
+    ap.add_argument("--apply", action="store_true", help="Apply the migrations instead of only listing them")
+    args = ap.parse_args()
+
+    client = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY)
+    if args.apply:
+        ensure_collection(client)
+        return
+    if not client.collection_exists(QDRANT_COLLECTION_NAME):
+        print(f"Collection '{QDRANT_COLLECTION_NAME}' does not exist; --apply creates it")
+        return
+    steps = plan_migrations(client)
+    for step in steps:
+        print(f"- {step['description']}")
+    print(f"{len(steps)} migrations pending" if steps else "✅ Collection matches the declared schema")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,8 @@
 # config.py
 import os
 from pathlib import Path
-from sentence_transformers import SentenceTransformer
 from qdrant_client import QdrantClient
 from dotenv import load_dotenv
-from qdrant_client.http.models import Distance, VectorParams
 
 
 load_dotenv(dotenv_path="QDRANT.env")
@@ -14,13 +12,65 @@ MAX_WORKERS = 4
 RETRY_ATTEMPTS = 3
 RETRY_DELAY = 2  # seconds
 
+# === Crawl Scheduler ===
+REQUEST_CONCURRENCY = 20     # global budget of in-flight requests across all cadres and hosts
+CADRE_CONCURRENCY = 5        # cadres crawled at the same time
+PROGRESS_LOG_INTERVAL = 15   # seconds between per-cadre progress reports
+UPSERT_BATCH_SIZE = 100      # points per Qdrant upsert / payload-patch request
+UPSERT_FLUSH_INTERVAL = 5    # seconds before a partial batch is flushed anyway
+STAGE_QUEUE_SIZE = 50        # max items waiting between fetch → parse → embed → upsert stages
+
+# === Refresh Worker ===
+REFRESH_INTERVAL = int(os.getenv("REFRESH_INTERVAL", "0"))  # seconds between refreshes; 0 = run once
+DATA_VERSION_BUMP_INTERVAL = 60  # seconds; while a run writes, the data version moves on at most this often
+
+# === HTTP Client ===
+HTTP_TIMEOUT = 20  # seconds
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() == "true"  # needs the 'h2' package
+HTTP_MAX_CONNECTIONS_PER_HOST = 20
+HTTP_MAX_KEEPALIVE_PER_HOST = 10
+HTTP_KEEPALIVE_EXPIRY = 30  # seconds
+
+# === Adaptive Rate Control (per host, AIMD) ===
+RATE_INITIAL_CONCURRENCY = 4                     # starting window of in-flight requests per host
+RATE_MIN_CONCURRENCY = 1
+RATE_MAX_CONCURRENCY = REQUEST_CONCURRENCY       # per-host window cap; all hosts together share the global budget
+RATE_INCREASE_STEP = 1.0     # window growth per window's worth of healthy responses
+RATE_DECREASE_FACTOR = 0.5   # window multiplier on a timeout, 429 or 5xx
+RATE_LATENCY_TARGET = 5.0    # seconds; slower responses stop the window from growing
+RATE_MAX_RETRY_AFTER = 120   # seconds; cap on honoured Retry-After pauses
+RETRY_BACKOFF_BASE = 1.0     # seconds; first retry waits up to this, doubling per attempt
+RETRY_BACKOFF_MAX = 30.0     # seconds
+
+# === HTML Parsing ===
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", os.cpu_count() or 1))  # 0 = parse on the event loop
+DETAIL_PARSER_BACKEND = os.getenv("DETAIL_PARSER_BACKEND", "lxml")    # "lxml" or "bs4"
+PARSER_VERSION = 2  # bump when a parser's output changes: cached parses from other versions are re-parsed
+
+# === Change Detection ===
+# Re-check every listed officer's detail page (cheap with the page cache), not only
+# new officers and posting changes, so new experience / training / award rows are picked up
+FULL_CONTENT_CHECK = os.getenv("FULL_CONTENT_CHECK", "true").lower() == "true"
+
+# === Page Cache ===
+PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "true").lower() == "true"
+
 # === Directory Structure ===
 BASE_DIR = Path(__file__).parent.resolve()
 PDF_DIR = BASE_DIR / "pdfs"
 LOG_DIR = BASE_DIR / "logs"
+CACHE_DIR = BASE_DIR / "cache"
+PAGE_CACHE_DIR = CACHE_DIR / "pages"
+MANIFEST_PATH = CACHE_DIR / "officer_manifest.sqlite3"
+JOURNAL_PATH = CACHE_DIR / "run_journal.sqlite3"
+DATA_VERSION_PATH = CACHE_DIR / "data_version.json"
+ONNX_EXPORT_DIR = CACHE_DIR / "onnx"  # locally exported / quantized ONNX models
+QUERY_CACHE_PATH = CACHE_DIR / "query_embeddings.sqlite3"
+REPLICA_DIR = CACHE_DIR / "replica"  # in-process read replica generations (see local_replica.py)
 
 # === BASE URL ===
 CIVIL_LIST_URL = "https://iascivillist.dopt.gov.in/Home/ViewList"
+SUPREMO_URL = "https://supremo.nic.in/"
 
 # === Invalid Filename Characters ===
 INVALID_FILENAME_CHARS = ['/', '\\', ':', '*', '?', '"', '<', '>', '|', '(', ')', '.', ',']
@@ -28,7 +78,84 @@ REPLACE_CHAR = "_"
 
 # === Model Config ===
 EMBEDDING_MODEL_NAME = "nomic-ai/nomic-embed-text-v1.5"
-EMBEDDING_DIM = 768
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "768"))  # Matryoshka: 768, 512, 256, 128 or 64 (needs a new collection)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")  # "torch", "torch-int8", "onnx" or "onnx-int8"
+EMBEDDING_ONNX_INT8_FILE = os.getenv("EMBEDDING_ONNX_INT8_FILE", "onnx/model_quantized.onnx")  # in the model repo
+
+# === Query Embedding Cache ===
+QUERY_CACHE_SIZE = 2048        # query embeddings kept (LRU)
+QUERY_CACHE_PERSIST = os.getenv("QUERY_CACHE_PERSIST", "true").lower() == "true"  # survive restarts
+QUERY_CACHE_LOWERCASE = True   # nomic's tokenizer is uncased, so case never changes the vector
+QUERY_CACHE_TOUCH_BATCH = 32   # cache hits whose last_used is written in one go (or with the next put)
+
+# === Result Cache (chat workflow) ===
+RESULT_CACHE_SIZE = 256        # entries per tier (intent, retrieval, answer)
+RESULT_CACHE_TTL = 24 * 3600   # seconds; entries also expire when the data version changes
+
+# === Payload Profiles (fields fetched per Qdrant read) ===
+PAYLOAD_PROFILES = {
+    # ranking / dedup / filtering: small fields only
+    "list": ["name", "identity_no", "cadre", "allotment_year", "current_title", "gender", "supremo_url"],
+    # the shortlist handed to reasoning_tool (the fields of its Officer model)
+    "card": [
+        "name", "identity_no", "cadre", "scraped_from_cadre", "allotment_year", "recruitment_source",
+        "qualification", "current_posting", "current_title", "supremo_url", "gender", "dob",
+        "has_training", "has_awards", "education_count", "experience_count", "pdf_path",
+    ],
+    # everything, including the full "text"
+    "full": True,
+}
+
+# === Local Read Replica ===
+LOCAL_REPLICA_ENABLED = os.getenv("LOCAL_REPLICA_ENABLED", "false").lower() == "true"  # serve searches in-process
+REPLICA_FETCH_BATCH = 256   # points per vector retrieve when syncing the replica
+
+# === Hybrid (dense + sparse lexical) Retrieval ===
+HYBRID_SEARCH = os.getenv("HYBRID_SEARCH", "true").lower() == "true"  # needs the sparse vector in the collection
+LEXICAL_VECTOR = "lexical"     # sparse BM25 vector of the whole officer text (IDF applied by Qdrant)
+BM25_K1 = 1.2
+BM25_B = 0.75
+BM25_AVG_DOC_LENGTH = 300      # tokens; typical officer text length, for BM25 length normalisation
+HYBRID_CANDIDATES = 20         # candidates per ranking (dense, lexical) before fusion
+RRF_K = 60                     # reciprocal rank fusion: score = Σ 1 / (RRF_K + rank)
+QUERY_EXPANSION = os.getenv("QUERY_EXPANSION", "auto")  # "always": LLM queries; "auto": skip when anchored
+LEXICAL_GENERIC_TERMS = {"ias", "ips", "ifs", "govt", "goi"}  # never count as lexical anchors
+
+# === Title Levels (pay-matrix order, used for "same or one below" title matching) ===
+TITLE_LEVELS = {
+    "Junior Scale": 1,
+    "Under Secretary": 2,
+    "Deputy Secretary": 3,
+    "Director": 4,
+    "Joint Secretary": 5,
+    "Additional Secretary": 6,
+    "Secretary": 7,
+}
+
+# === Section Embeddings ===
+EMBEDDING_SECTIONS = ("personal", "education", "experience", "training")  # one named vector per section
+SECTION_SUPPORT_WEIGHT = 0.1  # officer score = best section score + this × the other sections' scores
+
+# === Vector Quantization ===
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "none")  # "none", "scalar" (int8) or "binary"
+QUANTIZATION_ALWAYS_RAM = True    # keep quantized vectors in RAM, originals may go to disk
+QUANTIZATION_RESCORE = True       # re-rank quantized candidates with the original vectors
+QUANTIZATION_OVERSAMPLING = float(os.getenv("QUANTIZATION_OVERSAMPLING", "2.0"))  # candidates = limit × this
+
+# === Payload Indexes (see collection_schema.py) ===
+PAYLOAD_INDEXES = {                  # field → index type; every search / filter call filters on these
+    "cadre": "keyword",
+    "gender": "keyword",
+    "current_title": "keyword",
+    "allotment_year": "integer",     # Range filters (before / from / after)
+    "supremo_url": "keyword",
+}
+PAYLOAD_ON_DISK = os.getenv("PAYLOAD_ON_DISK", "true").lower() == "true"  # indexed fields stay in RAM
+
+# === Embedding Batcher ===
+EMBED_MAX_BATCH_SIZE = 32   # texts per model.encode call
+EMBED_MAX_WAIT = 0.05       # seconds a text may wait for its batch to fill
+EMBED_BUCKET_CHARS = 512    # texts are batched with others of similar length (per this many chars)
 
 # === Qdrant Cloud Settings ===
 QDRANT_URL = os.getenv("QDRANT_CLOUD_URL")  # replace with actual URL
@@ -75,21 +202,19 @@ HEADERS = {
 
 # === Config Validation ===
 def validate_config():
+    """
+    Create local directories and check Qdrant connectivity. The collection schema
+    is checked (or migrated) separately, by collection_schema.ensure_collection.
+    """
     from logging import getLogger
     logger = getLogger("IASPipeline")
 
     # Create necessary directories
-    for dir_path in [PDF_DIR, LOG_DIR]:
+    for dir_path in [PDF_DIR, LOG_DIR, CACHE_DIR]:
         dir_path.mkdir(parents=True, exist_ok=True)
         logger.info(f"✅ Directory ready: {dir_path}")
 
-    # Check embedding model availability
-    try:
-        SentenceTransformer(EMBEDDING_MODEL_NAME, trust_remote_code=True)
-        logger.info(f"✅ Embedding model loaded: {EMBEDDING_MODEL_NAME}")
-    except Exception as e:
-        logger.error(f"❌ Failed to load embedding model '{EMBEDDING_MODEL_NAME}': {e}")
-        raise
+    # The embedding model is not loaded here: model_registry loads it once, on first use
 
     # Check Qdrant Cloud connectivity
     try:
@@ -97,20 +222,8 @@ def validate_config():
             url=QDRANT_URL,
             api_key=QDRANT_API_KEY,
         )
-        collections = [c.name for c in client.get_collections().collections]
-        if QDRANT_COLLECTION_NAME not in collections:
-            logger.warning(f"⚠️ Collection '{QDRANT_COLLECTION_NAME}' not found. Creating...")
-            client.create_collection(
-                collection_name=QDRANT_COLLECTION_NAME,
-                vectors_config=VectorParams(
-                    size=EMBEDDING_DIM,
-                    distance=Distance.COSINE
-                )
-            )
-            logger.info(f"✅ Created Qdrant collection: {QDRANT_COLLECTION_NAME}")
-        else:
-            logger.info(f"✅ Connected to Qdrant. Collection found: {QDRANT_COLLECTION_NAME}")
+        client.get_collections()
+        logger.info(f"✅ Connected to Qdrant at {QDRANT_URL}")
     except Exception as e:
         logger.error(f"❌ Qdrant Cloud connection error: {e}")
         raise
-
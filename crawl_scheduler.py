@@ -0,0 +1,148 @@
+# crawl_scheduler.py
+
+import asyncio
+import time
+
+from pipeline_runner import AsyncPipelineRunner
+from run_journal import RunJournal
+from config import STATE_CODES, CADRE_CONCURRENCY, PROGRESS_LOG_INTERVAL
+from logger_config import setup_logger
+
+logger = setup_logger()
+
+
+class CrawlScheduler:
+    """
+    Runs several cadres concurrently on one AsyncPipelineRunner.
+
+    All cadres share the runner's HTTP pool: per-host adaptive limiters pace
+    each host, and one global budget keeps the in-flight requests across all
+    hosts at or below REQUEST_CONCURRENCY, no matter how many cadres run.
+    Each supremo_url is claimed by the first cadre that lists it and is fetched
+    only once per run. Progress is written to a RunJournal so an interrupted
+    run can be resumed.
+    """
+
+    def __init__(self, runner: AsyncPipelineRunner, cadre_concurrency: int = CADRE_CONCURRENCY,
+                 progress_interval: float = PROGRESS_LOG_INTERVAL, journal: RunJournal | None = None):
+        self.runner = runner
+        self.cadre_concurrency = cadre_concurrency
+        self.progress_interval = progress_interval
+        self.journal = journal or RunJournal()
+        self.progress: dict[str, dict] = {}
+
+    def new_progress(self) -> dict:
+        return {
+            "status": "pending",
+            "listed": 0,
+            "duplicates": 0,
+            "queued": 0,
+            "processed": 0,
+            "failed": 0,
+            "skipped": 0,
+            "upserted": 0,
+            "elapsed": None,
+            "error": None,
+        }
+
+    def format_progress(self, cadre_code: str) -> str:
+        p = self.progress[cadre_code]
+        line = (
+            f"{cadre_code}: {p['status']} | listed {p['listed']} (dup {p['duplicates']}) | "
+            f"{p['processed'] + p['failed']}/{p['queued']} processed, {p['failed']} failed | "
+            f"{p['upserted']} upserted, {p['skipped']} unchanged"
+        )
+        if p["elapsed"] is not None:
+            line += f" | {p['elapsed']:.1f}s"
+        return line
+
+    def log_progress(self):
+        for cadre_code in self.progress:
+            logger.info(f"📊 {self.format_progress(cadre_code)}")
+        for limiter in self.runner.http.limiters.values():
+            logger.info(f"🚦 {limiter.format_snapshot()}")
+
+    def cadre_succeeded(self, cadre_code: str) -> bool:
+        p = self.progress[cadre_code]
+        return p["status"] in ("done", "unchanged", "resumed", "dry-run") and not p["failed"]
+
+    def journal_progress(self):
+        for cadre_code, progress in self.progress.items():
+            status = progress["status"]
+            if status == "resumed":
+                continue  # keep the journal record from the run that finished it
+            if status == "done" and progress["failed"]:
+                status = "incomplete"  # retried on --resume
+            self.journal.set_cadre(cadre_code, {**progress, "status": status})
+
+    async def _report_periodically(self):
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            self.log_progress()
+            self.journal_progress()
+
+    async def _run_cadre(self, cadre_code: str, cadre_slots: asyncio.Semaphore, claimed_urls: set,
+                         finished: set[str]):
+        progress = self.progress[cadre_code]
+        if cadre_code in finished:
+            progress["status"] = "resumed"
+            logger.info(f"⏭️ {cadre_code} already finished in the resumed run")
+            return
+        async with cadre_slots:
+            start = time.perf_counter()
+            try:
+                await self.runner.run_for_cadre(cadre_code, progress=progress, claimed_urls=claimed_urls)
+            except Exception as e:
+                progress["status"] = "failed"
+                progress["error"] = str(e)
+                logger.error(f"❌ Error in {cadre_code}: {e}")
+            progress["elapsed"] = time.perf_counter() - start
+            self.journal_progress()
+            logger.info(f"🏁 {self.format_progress(cadre_code)}")
+
+    async def run(self, cadre_codes: list[str] | None = None, resume: bool = False) -> dict[str, dict]:
+        """
+        Crawl the given cadres (default: every entry in STATE_CODES) and
+        return the per-cadre progress counters.
+        With resume=True, continue the latest unfinished run instead: finished
+        cadres are skipped and officers already upserted (or found unchanged)
+        are not fetched again.
+        """
+        finished: set[str] = set()
+        claimed_urls: set[str] = set()
+        resumed_cadres = self.journal.resume_run() if resume else None
+        if resumed_cadres:
+            cadre_codes = resumed_cadres
+            finished = self.journal.finished_cadres()
+            claimed_urls = self.journal.done_officers()
+            logger.info(f"⏯️ Resuming: {len(finished)} cadres and {len(claimed_urls)} officers already done")
+        else:
+            if resume:
+                logger.info("⏯️ No unfinished run to resume. Starting a new one.")
+            cadre_codes = list(cadre_codes or STATE_CODES.keys())
+            self.journal.start_run(cadre_codes)
+
+        self.progress = {code: self.new_progress() for code in cadre_codes}
+        cadre_slots = asyncio.Semaphore(self.cadre_concurrency)
+        self.runner.journal = self.journal
+
+        logger.info(f"🗓️ Crawling {len(cadre_codes)} cadres ({self.cadre_concurrency} at a time)")
+        start = time.perf_counter()
+        reporter = asyncio.create_task(self._report_periodically())
+        try:
+            async with self.runner:
+                await asyncio.gather(*(
+                    self._run_cadre(code, cadre_slots, claimed_urls, finished) for code in cadre_codes
+                ))
+        finally:
+            reporter.cancel()
+
+        self.log_progress()
+        self.journal_progress()
+        if all(self.cadre_succeeded(code) for code in cadre_codes):
+            self.journal.finish_run()
+        else:
+            logger.warning("⚠️ Some cadres did not finish cleanly. Run again with --resume to retry them.")
+        logger.info(f"🎉 Crawl finished in {time.perf_counter() - start:.1f}s ({len(claimed_urls)} unique officers)")
+        return self.progress
+
@@ -0,0 +1,81 @@
+# data_version.py
+
+import json
+import os
+import time
+from pathlib import Path
+
+from config import DATA_VERSION_PATH
+from logger_config import setup_logger
+
+logger = setup_logger()
+
+
+def read_data_version(path: Path = DATA_VERSION_PATH) -> dict | None:
+    """
+    The marker published by the last refresh, or None if no refresh has
+    completed yet (the collection is then served as-is).
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"⚠️ Could not read data version marker {path}: {e}")
+        return None
+
+
+def current_data_version() -> int:
+    """The published version number, 0 before the first refresh."""
+    marker = read_data_version()
+    return marker["version"] if marker else 0
+
+
+def write_data_version(marker: dict, path: Path = DATA_VERSION_PATH):
+    """Replace the marker in one step (temp file + os.replace): the app never reads half of one."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(marker, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def bump_data_version(written: int, path: Path = DATA_VERSION_PATH) -> dict:
+    """
+    Move the version on while a refresh run is still writing, so caches keyed on
+    it stop serving what the pipeline just replaced. The rest of the marker is
+    left to publish_data_version at the end of the run.
+    """
+    previous = read_data_version(path) or {}
+    now = time.time()
+    marker = {**previous, "version": previous.get("version", 0) + 1, "changed_at": now}
+    marker.setdefault("refreshed_at", now)
+    write_data_version(marker, path)
+    logger.info(f"🏷️ Data version {marker['version']} ({written} officers written since the last one)")
+    return marker
+
+
+def publish_data_version(progress: dict[str, dict], path: Path = DATA_VERSION_PATH, bump: bool | None = None) -> dict:
+    """
+    Publish the outcome of a refresh run. "version" is bumped only when the
+    run wrote to the collection (or, with `bump`, only when writes are left that
+    bump_data_version has not covered), so readers can key caches on it;
+    "refreshed_at" moves on every run.
+    """
+    previous = read_data_version(path) or {}
+    written = sum(p.get("upserted", 0) for p in progress.values())
+    bump = written > 0 if bump is None else bump
+    now = time.time()
+    marker = {
+        "version": previous.get("version", 0) + (1 if bump or not previous else 0),
+        "refreshed_at": now,
+        "changed_at": now if bump or not previous else previous.get("changed_at", now),
+        "written": written,
+        "failed": sum(p.get("failed", 0) for p in progress.values()),
+        "cadres": {code: p.get("status") for code, p in progress.items()},
+    }
+    write_data_version(marker, path)
+    logger.info(f"🏷️ Published data version {marker['version']} ({written} officers written)")
+    return marker
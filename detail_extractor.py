@@ -0,0 +1,162 @@
+# detail_extractor.py
+
+import html as html_lib
+from lxml import etree, html as lxml_html
+
+# === Declarative page spec ===
+# Labels in the first "tbl_border" table → personal keys (order = output order).
+# "Service/ Cadre/ Allotment Year" is split into cadre and allotment_year.
+SERVICE_CADRE_YEAR_LABEL = "Service/ Cadre/ Allotment Year"
+PERSONAL_LABELS = [
+    ("name", "Name"),
+    ("identity_no", "Identity No."),
+    ("cadre", None),
+    ("allotment_year", None),
+    ("recruitment_source", "Source of Recruitment"),
+    ("dob", "Date of Birth"),
+    ("gender", "Gender"),
+    ("domicile", "Place of Domicile"),
+    ("mother_tongue", "Mother Tongue"),
+    ("languages_known", "Languages Known"),
+    ("retirement_reason", "Retirement Reason"),
+]
+
+# The n-th "rounded-cornerA" table → (section, subsection, column names for td[1:]).
+# The first two rows of every table are headers; td[0] is the serial number.
+TABLE_SPECS = [
+    ("education", None, ["qualification", "subject", "division"]),
+    ("experience", None, ["designation", "ministry", "organization", "experience_area", "period"]),
+    ("training", "mid_career", ["year", "training_name", "date_from", "date_to"]),
+    ("training", "in_service", ["year", "training_name", "institute", "city", "duration"]),
+    ("training", "domestic", ["year", "training_name", "subject", "duration"]),
+    ("training", "foreign", ["year", "training_name", "subject", "duration", "country"]),
+    ("awards", None, ["type", "area", "year", "award_name_book_title", "award_by_publisher_name", "subject", "level"]),
+]
+
+# Education rows are only taken when they have exactly this many cells.
+EDUCATION_CELLS = 4
+# Columns kept as a list of <br/>-separated lines instead of flattened text.
+LINE_COLUMNS = {"designation"}
+HTML_BR = "<br>"  # how lxml serializes an attribute-less <br/> (BeautifulSoup writes "<br/>")
+HEADER_ROWS = 2
+
+TBL_BORDER_XPATH = etree.XPath("//table[contains(concat(' ', normalize-space(@class), ' '), ' tbl_border ')]")
+ROUNDED_XPATH = etree.XPath("//table[@id='rounded-cornerA']")
+ROWS_XPATH = etree.XPath(".//tr")
+CELLS_XPATH = etree.XPath(".//td")
+TEXT_XPATH = etree.XPath(".//text()")
+
+
+def _strings(el) -> list[str]:
+    # Text nodes only (comment contents are not text nodes), like BeautifulSoup's get_text()
+    return TEXT_XPATH(el)
+
+
+def _text(el) -> str:
+    """Equivalent of BeautifulSoup get_text(separator=" ", strip=True)."""
+    return " ".join(s for s in (t.strip() for t in _strings(el)) if s)
+
+
+def _raw_text(el) -> str:
+    """Equivalent of BeautifulSoup .text (no separator, no stripping)."""
+    return "".join(_strings(el))
+
+
+def _lines(el) -> list[str]:
+    """
+    Inner HTML of a cell split on every <br/> it contains (nested ones included,
+    comments kept), as BeautifulSoup decode_contents().split("<br/>") would give.
+    """
+    inner = html_lib.escape(el.text or "", quote=False) + "".join(
+        etree.tostring(child, method="html", encoding="unicode", with_tail=True) for child in el
+    )
+    return [part.strip() for part in inner.split(HTML_BR) if part.strip()] or [" "]
+
+
+def _personal(table) -> dict:
+    # Single pass over the rows: first row whose label cell contains each label wins
+    wanted = [label for _, label in PERSONAL_LABELS if label] + [SERVICE_CADRE_YEAR_LABEL]
+    found = {}
+    for tr in ROWS_XPATH(table):
+        tds = CELLS_XPATH(tr)
+        if len(tds) != 2:
+            continue
+        key_text = _raw_text(tds[0])
+        for label in wanted:
+            if label not in found and label in key_text:
+                found[label] = _text(tds[1])
+        if len(found) == len(wanted):
+            break
+
+    cadre = allotment_year = None
+    service_cadre_year = found.get(SERVICE_CADRE_YEAR_LABEL)
+    if service_cadre_year:
+        parts = [p.strip() for p in service_cadre_year.split("/")]
+        if len(parts) == 3:
+            cadre, allotment_year = parts[1], parts[2]
+
+    personal = {}
+    for key, label in PERSONAL_LABELS:
+        if key == "cadre":
+            personal[key] = cadre
+        elif key == "allotment_year":
+            personal[key] = allotment_year
+        else:
+            personal[key] = found.get(label)
+    return personal
+
+
+def _deputation(table) -> dict:
+    deputation = {}
+    for tr in ROWS_XPATH(table):
+        tds = CELLS_XPATH(tr)
+        if len(tds) == 2:
+            deputation[_raw_text(tds[0]).strip().replace("?", "")] = _text(tds[1])
+    return deputation
+
+
+def _table_rows(table, section: str, columns: list[str]) -> list[dict]:
+    rows = []
+    for tr in ROWS_XPATH(table)[HEADER_ROWS:]:
+        tds = CELLS_XPATH(tr)
+        if section == "education":
+            if len(tds) != EDUCATION_CELLS:
+                continue
+        elif len(tds) <= 1:
+            continue
+        rows.append({
+            column: _lines(tds[i]) if column in LINE_COLUMNS else _text(tds[i])
+            for i, column in enumerate(columns, start=1)
+        })
+    return rows
+
+
+def extract_officer_details(page_html: str) -> dict:
+    """
+    lxml-based single-pass extraction of a supremo.nic.in ER sheet, driven by
+    PERSONAL_LABELS and TABLE_SPECS. Returns the same dict as the BeautifulSoup
+    parser in fetch_officer_details.
+    """
+    doc = lxml_html.fromstring(page_html)
+
+    tbl_border = TBL_BORDER_XPATH(doc)
+    personal = _personal(tbl_border[0])
+    deputation = _deputation(tbl_border[1]) if len(tbl_border) >= 2 else {}
+
+    sections = {"education": [], "experience": [], "training": {}, "awards": []}
+    rounded = ROUNDED_XPATH(doc)
+    for i, (section, subsection, columns) in enumerate(TABLE_SPECS):
+        rows = _table_rows(rounded[i], section, columns) if i < len(rounded) else []
+        if subsection:
+            sections[section][subsection] = rows
+        else:
+            sections[section] = rows
+
+    return {
+        "personal": personal,
+        "education": sections["education"],
+        "experience": sections["experience"],
+        "training": sections["training"],
+        "awards": sections["awards"],
+        "deputation": deputation,
+    }
@@ -1,9 +1,32 @@
-from langchain_huggingface import HuggingFaceEmbeddings
-from concurrent.futures import ThreadPoolExecutor
+from langchain_core.embeddings import Embeddings
 
-def get_embedding_model():
-    return HuggingFaceEmbeddings(
-        model_name="nomic-ai/nomic-embed-text-v1.5",
-        model_kwargs={"trust_remote_code": True}
-    )
+from config import EMBEDDING_MODEL_NAME, EMBEDDING_BACKEND, EMBEDDING_DIM
+from model_registry import encode
+from query_cache import QueryEmbeddingCache
+
+
+class RegistryEmbeddings(Embeddings):
+    """
+    LangChain embeddings backed by the shared model registry; the model is
+    loaded on the first embed call, not at construction. Query embeddings go
+    through an LRU cache, so repeated queries skip the model.
+    """
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME, cache: QueryEmbeddingCache | None = None):
+        self.model_name = model_name
+        self.model_id = f"{model_name}|{EMBEDDING_BACKEND}|{EMBEDDING_DIM}"  # vectors differ per backend / dim
+        self.cache = cache if cache is not None else QueryEmbeddingCache()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return encode(texts, name=self.model_name)
 
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """Cached query embeddings; all cache misses are encoded in one batch."""
+        return self.cache.get_many(self.model_id, texts, self.embed_documents)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_queries([text])[0]
+
+
+def get_embedding_model():
+    return RegistryEmbeddings()
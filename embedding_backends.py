@@ -0,0 +1,86 @@
+# embedding_backends.py
+
+import importlib.util
+import re
+
+from config import ONNX_EXPORT_DIR, EMBEDDING_ONNX_INT8_FILE
+from logger_config import setup_logger
+
+logger = setup_logger()
+
+# Every backend returns a SentenceTransformer-compatible object (encode(texts, ...)),
+# so FullPDFEmbedder and the query embeddings work unchanged whichever is selected.
+
+
+def load_torch(name: str):
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(name, trust_remote_code=True, device="cpu")
+
+
+def load_torch_int8(name: str):
+    """
+    PyTorch model with Linear layers dynamically quantized to int8: weights are
+    stored in int8, activations quantized on the fly. No extra dependencies.
+    """
+    import torch
+
+    model = load_torch(name)
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def load_onnx(name: str, file_name: str | None = None):
+    """
+    ONNX Runtime model. Uses the repo's exported onnx/model.onnx when it ships
+    one; otherwise sentence-transformers exports it (needs 'optimum').
+    """
+    from sentence_transformers import SentenceTransformer
+
+    model_kwargs = {"file_name": file_name} if file_name else None
+    return SentenceTransformer(name, trust_remote_code=True, device="cpu", backend="onnx",
+                               model_kwargs=model_kwargs)
+
+
+def load_onnx_int8(name: str):
+    """
+    Dynamically int8-quantized ONNX model: EMBEDDING_ONNX_INT8_FILE from the
+    model repo if present, else quantized here once and kept under ONNX_EXPORT_DIR.
+    """
+    try:
+        return load_onnx(name, EMBEDDING_ONNX_INT8_FILE)
+    except Exception as e:
+        logger.info(f"ℹ️ No pre-quantized ONNX file for {name} ({e}). Quantizing locally.")
+
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    export_dir = ONNX_EXPORT_DIR / re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+    quantized = sorted(export_dir.glob("onnx/model_*int8_avx2.onnx"))
+    if not quantized:
+        model = load_onnx(name)
+        model.save_pretrained(str(export_dir))
+        export_dynamic_quantized_onnx_model(model, "avx2", str(export_dir))
+        quantized = sorted(export_dir.glob("onnx/model_*int8_avx2.onnx"))
+        logger.info(f"✅ Saved int8 ONNX model to {export_dir}")
+    return load_onnx(str(export_dir), quantized[0].relative_to(export_dir).as_posix())
+
+
+BACKENDS = {
+    "torch": load_torch,
+    "torch-int8": load_torch_int8,
+    "onnx": load_onnx,
+    "onnx-int8": load_onnx_int8,
+}
+ONNX_BACKENDS = ("onnx", "onnx-int8")
+
+
+def load_model(name: str, backend: str):
+    """
+    Load `name` with the given backend, falling back to PyTorch when an ONNX
+    backend is selected but onnxruntime is not installed.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}'. Choose one of: {', '.join(BACKENDS)}")
+    if backend in ONNX_BACKENDS and importlib.util.find_spec("onnxruntime") is None:
+        logger.warning(f"⚠️ Embedding backend '{backend}' needs 'onnxruntime'. Falling back to PyTorch.")
+        backend = "torch"
+    return BACKENDS[backend](name)
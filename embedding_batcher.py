@@ -0,0 +1,108 @@
+# embedding_batcher.py
+
+import asyncio
+import time
+from typing import Callable
+
+from config import EMBED_MAX_BATCH_SIZE, EMBED_MAX_WAIT, EMBED_BUCKET_CHARS
+from logger_config import setup_logger
+
+logger = setup_logger()
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batching front end for a synchronous batch encoder.
+
+    Concurrent callers await embed(text); texts are grouped into length buckets
+    (similar lengths → little padding waste) and a bucket is encoded as soon as it
+    holds max_batch_size texts, or once its oldest text has waited max_wait seconds.
+    Encoding runs in a worker thread, one batch at a time, so the event loop
+    never blocks on the model.
+    """
+
+    def __init__(self, encode_batch: Callable[[list[str]], list[list[float]]],
+                 max_batch_size: int = EMBED_MAX_BATCH_SIZE, max_wait: float = EMBED_MAX_WAIT,
+                 bucket_chars: int = EMBED_BUCKET_CHARS):
+        self.encode_batch = encode_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.bucket_chars = bucket_chars
+        self.queue: asyncio.Queue | None = None
+        self.worker: asyncio.Task | None = None
+        self.stats = {"texts": 0, "batches": 0, "encode_seconds": 0.0}
+
+    async def start(self):
+        if self.worker is None:
+            self.queue = asyncio.Queue()
+            self.worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Encode whatever is still pending, then stop the worker.
+        """
+        if self.worker is None:
+            return
+        await self.queue.put(None)
+        await self.worker
+        self.worker = None
+        if self.stats["batches"]:
+            logger.info(
+                f"🧮 Embedded {self.stats['texts']} texts in {self.stats['batches']} batches "
+                f"(avg {self.stats['texts'] / self.stats['batches']:.1f}/batch, "
+                f"{self.stats['encode_seconds']:.1f}s encoding)"
+            )
+
+    async def embed(self, text: str) -> list[float]:
+        if self.worker is None:
+            raise RuntimeError("EmbeddingBatcher is not started. Call start() first.")
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, future))
+        return await future
+
+    async def _encode(self, items: list[tuple]):
+        texts = [text for text, _, _ in items]
+        start = time.perf_counter()
+        try:
+            vectors = await asyncio.to_thread(self.encode_batch, texts)
+        except Exception as e:
+            for _, future, _ in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.stats["encode_seconds"] += time.perf_counter() - start
+        self.stats["batches"] += 1
+        self.stats["texts"] += len(items)
+        for (_, future, _), vector in zip(items, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    async def _run(self):
+        buckets: dict[int, list[tuple]] = {}
+        stopping = False
+        while not stopping:
+            timeout = None
+            if buckets:
+                oldest = min(items[0][2] for items in buckets.values())
+                timeout = max(0.0, self.max_wait - (time.monotonic() - oldest))
+
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                item = False
+
+            if item is None:
+                stopping = True
+            elif item:
+                text, future = item
+                bucket = buckets.setdefault(len(text) // self.bucket_chars, [])
+                bucket.append((text, future, time.monotonic()))
+                if len(bucket) >= self.max_batch_size:
+                    await self._encode(buckets.pop(len(text) // self.bucket_chars))
+                continue
+
+            # Timed out (or stopping): flush the buckets whose oldest text has waited long enough
+            now = time.monotonic()
+            for key in sorted(buckets):
+                if stopping or now - buckets[key][0][2] >= self.max_wait:
+                    await self._encode(buckets.pop(key))
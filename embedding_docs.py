@@ -1,7 +1,8 @@
 # full_pdf_embedder.py
 
-from sentence_transformers import SentenceTransformer
-from config import EMBEDDING_MODEL_NAME
+from config import EMBEDDING_MODEL_NAME, HYBRID_SEARCH, LEXICAL_VECTOR
+from lexical_index import sparse_document
+from model_registry import get_model, encode
 from logger_config import setup_logger
 from metadata_utils import MetadataUtils
 import json
@@ -9,28 +10,29 @@ import json
 logger = setup_logger()
 
 class FullPDFEmbedder:
-    def __init__(self):
-        self.model = SentenceTransformer(
-            EMBEDDING_MODEL_NAME,
-            trust_remote_code=True
-            )
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME):
+        self.model_name = model_name
         self.utils = MetadataUtils()
 
-    def format_officer_as_text(self, officer: dict) -> str:
+    @property
+    def model(self):
+        return get_model(self.model_name)  # shared, loaded on first embed
+
+    def format_officer_sections(self, officer: dict) -> list[tuple[str, str]]:
         """
         Flattens structured officer data (education, experience, training, awards, etc.)
-        into a readable text block.
+        into (section, line) pairs in display order. Sections are the named vectors
+        in EMBEDDING_SECTIONS: personal, education, experience (incl. deputation)
+        and training (incl. awards).
         Handles multiple training types grouped under their respective keys.
         """
-        import json
-
         parts = []
 
         # Personal Info
         personal = officer.get("personal") or {}
         for k, v in personal.items():
             if v:
-                parts.append(f"{k.title().replace('_', ' ')}: {v}")
+                parts.append(("personal", f"{k.title().replace('_', ' ')}: {v}"))
 
         # Education
         education_list = officer.get("education") or []
@@ -39,7 +41,7 @@ class FullPDFEmbedder:
             s = edu.get("subject", "")
             d = edu.get("division", "")
             if q or s or d:
-                parts.append(f"Education: {q} in {s} ({d})")
+                parts.append(("education", f"Education: {q} in {s} ({d})"))
 
         # Experience
         experience_list = officer.get("experience") or []
@@ -49,17 +51,17 @@ class FullPDFEmbedder:
             min_ = exp.get("ministry", "")
             area = exp.get("experience_area", "")
             period = exp.get("period", "")
-            parts.append(f"Worked as {desg} in {org} ({min_}, {area}) during {period}")
+            parts.append(("experience", f"Worked as {desg} in {org} ({min_}, {area}) during {period}"))
 
         # Training (dict of sections)
         training_sections = officer.get("training") or {}
         for section_name, rows in training_sections.items():
             if not rows:
                 continue
-            parts.append(f"{section_name.replace('_', ' ').title()} Training:")
+            parts.append(("training", f"{section_name.replace('_', ' ').title()} Training:"))
             for row in rows:
                 row_text = "; ".join(f"{k.replace('_', ' ').title()}: {v}" for k, v in row.items() if v)
-                parts.append(f"  - {row_text}")
+                parts.append(("training", f"  - {row_text}"))
 
         # Awards (extended structure)
         awards_list = officer.get("awards") or []
@@ -68,16 +70,30 @@ class FullPDFEmbedder:
                 f"{k.replace('_', ' ').title()}: {v}"
                 for k, v in aw.items() if v
             )
-            parts.append(f"Award: {line}")
+            parts.append(("training", f"Award: {line}"))
 
         # Deputation
         deputation = officer.get("deputation") or {}
         if deputation:
-            parts.append("Deputation Details:")
-            parts.append(json.dumps(deputation, indent=2))
+            parts.append(("experience", "Deputation Details:"))
+            parts.append(("experience", json.dumps(deputation, indent=2)))
 
-        return "\n".join(parts)
+        return parts
+
+    def format_officer_as_text(self, officer: dict) -> str:
+        """
+        The whole officer as one readable text block (stored as the payload "text").
+        """
+        return "\n".join(line for _, line in self.format_officer_sections(officer))
 
+    def section_texts(self, officer: dict) -> dict[str, str]:
+        """
+        Text per non-empty section, each embedded as its own named vector.
+        """
+        sections: dict[str, list[str]] = {}
+        for section, line in self.format_officer_sections(officer):
+            sections.setdefault(section, []).append(line)
+        return {section: "\n".join(lines) for section, lines in sections.items()}
 
     def extract_current_title(self, experience: list[dict]) -> str | None:
         """
@@ -102,13 +118,22 @@ class FullPDFEmbedder:
 
 
     def embed_text(self, text: str) -> list[float]:
-        return self.model.encode(text, convert_to_numpy=True).tolist()
+        return encode([text], name=self.model_name)[0]
 
-    def build_vector_payload(self, officer: dict) -> dict:
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        return encode(texts, name=self.model_name, batch_size=len(texts))
+
+    def build_point(self, officer: dict) -> dict:
+        """
+        Build the point id and payload (with text and fingerprints) without embedding.
+        point["sections"] holds the per-section texts to embed.
+        """
         personal = officer.get("personal", {})
         identity_no = personal.get("identity_no") or officer.get("identity_no")
         cadre = personal.get("cadre") or officer.get("scraped_from_cadre")
         year = personal.get("allotment_year")
+        if isinstance(year, str) and year.strip().isdigit():
+            year = int(year)  # integer payload index (see PAYLOAD_INDEXES)
 
         # Validate required fields
         missing_keys = []
@@ -126,11 +151,10 @@ class FullPDFEmbedder:
         vector_id = self.utils.generate_vector_id(officer["supremo_url"])
         current_title = self.extract_current_title(officer.get("experience", []))
         full_text = self.format_officer_as_text(officer)
-        vector = self.embed_text(full_text)
+        sections = self.section_texts(officer)
 
-        payload = {
+        point = {
             "id": vector_id,
-            "vector": vector,
             "payload": {
                 "name": personal.get("name") or officer.get("name", ""),
                 "identity_no": identity_no,
@@ -152,8 +176,23 @@ class FullPDFEmbedder:
                 "text": full_text
             }
         }
+        point["payload"]["meta_hash"] = self.utils.metadata_fingerprint(point["payload"])
+        point["payload"]["text_hash"] = self.utils.text_fingerprint(full_text)
+        point["payload"]["section_hashes"] = {
+            section: self.utils.text_fingerprint(text) for section, text in sections.items()
+        }
+        point["sections"] = sections  # not stored; embedded as named vectors
+        if HYBRID_SEARCH:
+            point["lexical"] = sparse_document(full_text)  # BM25 weights of the same text
+        return point
 
-        logger.info(f"✅ Embedded vector for {payload['payload']['name']} ({vector_id})")
-        return payload
+    def build_vector_payload(self, officer: dict) -> dict:
+        point = self.build_point(officer)
+        sections = point.pop("sections")
+        point["vector"] = dict(zip(sections, self.embed_texts(list(sections.values()))))
+        if "lexical" in point:
+            point["vector"][LEXICAL_VECTOR] = point.pop("lexical")
+        logger.info(f"✅ Embedded vector for {point['payload']['name']} ({point['id']})")
+        return point
 
 
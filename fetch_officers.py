@@ -1,19 +1,114 @@
 # officer_list_fetcher.py
 
-import requests
+import httpx
 from bs4 import BeautifulSoup
-from config import CIVIL_LIST_URL, HEADERS
+from config import CIVIL_LIST_URL, HEADERS, PARSER_VERSION
+from http_client import HttpClientPool
+from parse_pool import ParserPool
+from page_cache import PageCache
 from logger_config import setup_logger
 
 logger = setup_logger()
 
-class OfficerListFetcher:
-    def __init__(self):
-        self.session = requests.Session()
+LIST_PARSER = f"officer_list/v{PARSER_VERSION}"  # page cache key of parsed list pages
+
+def parse_officer_list(html: str, cadre_code: str) -> list[dict]:
+    """
+    Parse the DoPT civil list page into officer dicts.
+    Module-level (picklable) so it can run in a ParserPool worker process.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    rows = soup.select("table#IASList tbody tr")
+
+    if not rows:
+        return []
+
+    officers = []
+    for row in rows:
+        card = row.select_one(".IAS_cardCont")
+        if not card:
+            continue
+
+        def get_text_after_label(label):
+            for p in card.find_all("p"):
+                if p.text.strip().startswith(label):
+                    return p.text.strip().split(":", 1)[-1].strip()
+            return None
+
+        def get_cadre_domicile():
+            tag = card.find("b", string="Cadre & Domicile:")
+            if tag:
+                return tag.parent.get_text(strip=True).split(":", 1)[-1].replace("&", " & ")
+            return None
+
+        def get_posting():
+            posting_b = card.find("b", string="Posting:-")
+            if posting_b:
+                span = posting_b.find_next_sibling("span")
+                return span.get_text(" ", strip=True) if span else None
+            return None
+
+        name_tag = card.select_one("h2 a")
+        name = name_tag.get_text(strip=True).replace("Name:", "") if name_tag else None
+        link = name_tag["href"] if name_tag else None
+
+        officer = {
+            # Basic info (scraped in this layer)
+            "name": name,
+            "supremo_url": link,  # 🔄 renamed from supremo_url for consistency
+            "identity_no": get_text_after_label("Identity No."),
+            "allotment_year": get_text_after_label("Allotment Year"),
+            "recruitment_source": get_text_after_label("Source of Recruitment"),
+            "qualification": get_text_after_label("Qualification(Subject):"),
+            "pay_scale": get_text_after_label("Pay Scale"),
+            "remarks": get_text_after_label("Remarks"),
+            "cadre_domicile": get_cadre_domicile(),
+            "current_posting": get_posting(),
+            "scraped_from_cadre": cadre_code,
+
+            # Reserved full structure
+            "personal": {
+                "name": None,
+                "identity_no": None,
+                "cadre": None,
+                "dob": None,
+                "gender": None,
+                "allotment_year": None,
+                "domicile": None,
+                "mother_tongue": None,
+                "languages_known": None,
+                "retirement_reason": None
+            },
+            "education": [],
+            "experience": [],
+            "training": [],
+            "awards": [],
+            "deputation": {},
+        }
+
+
+        officers.append(officer)
+    return officers
+
 
-    def fetch_by_cadre(self, cadre_code: str) -> list[dict]:
+class OfficerListFetcher:
+    def __init__(self, http: HttpClientPool, parser: ParserPool, cache: PageCache):
+        self.http = http
+        self.parser = parser
+        self.cache = cache
+        self.pending: dict[str, tuple] = {}  # cadre_code → response waiting for mark_complete
+        self.http.configure_host(CIVIL_LIST_URL, headers=HEADERS)
+
+    @staticmethod
+    def cache_key(cadre_code: str) -> str:
+        return f"{CIVIL_LIST_URL}?ViewCadreCode={cadre_code}"
+
+    async def fetch_by_cadre(self, cadre_code: str) -> tuple[list[dict], bool]:
         """
         Fetch officers listed under a specific cadre code (state) from DoPT website.
+        Returns (officers, changed); changed is False when the list page is identical
+        to the last completed crawl of this cadre. Raises when the list cannot be
+        fetched or parsed, so the cadre is recorded as failed and retried on --resume.
         """
         payload = {
             "ViewCadreCode": cadre_code,
@@ -21,84 +116,34 @@ class OfficerListFetcher:
         }
 
         try:
-            response = self.session.post(CIVIL_LIST_URL, headers=HEADERS, data=payload)
+            # POST: no conditional headers (If-None-Match on POST means 412), compare body hashes instead
+            response = await self.http.post(CIVIL_LIST_URL, data=payload)
             response.raise_for_status()
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"❌ Failed to fetch officer list for {cadre_code}: {e}")
-            return []
+            raise
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        rows = soup.select("table#IASList tbody tr")
+        key = self.cache_key(cadre_code)
+        entry = self.cache.get(key, LIST_PARSER)
+        if self.cache.is_unchanged(entry, response.status_code, response.content):
+            logger.info(f"♻️ Officer list unchanged for cadre {cadre_code}")
+            return entry["parsed"], False
 
-        if not rows:
+        officers = await self.parser.run(parse_officer_list, response.text, cadre_code)
+        if not officers:
             logger.warning(f"⚠️ No officer table found for cadre {cadre_code}. HTML may have changed.")
-            return []
-
-        officers = []
-        for row in rows:
-            card = row.select_one(".IAS_cardCont")
-            if not card:
-                continue
-
-            def get_text_after_label(label):
-                for p in card.find_all("p"):
-                    if p.text.strip().startswith(label):
-                        return p.text.strip().split(":", 1)[-1].strip()
-                return None
-
-            def get_cadre_domicile():
-                tag = card.find("b", string="Cadre & Domicile:")
-                if tag:
-                    return tag.parent.get_text(strip=True).split(":", 1)[-1].replace("&", " & ")
-                return None
-
-            def get_posting():
-                posting_b = card.find("b", string="Posting:-")
-                if posting_b:
-                    span = posting_b.find_next_sibling("span")
-                    return span.get_text(" ", strip=True) if span else None
-                return None
-
-            name_tag = card.select_one("h2 a")
-            name = name_tag.get_text(strip=True).replace("Name:", "") if name_tag else None
-            link = name_tag["href"] if name_tag else None
-
-            officer = {
-                # Basic info (scraped in this layer)
-                "name": name,
-                "supremo_url": link,  # 🔄 renamed from supremo_url for consistency
-                "identity_no": get_text_after_label("Identity No."),
-                "allotment_year": get_text_after_label("Allotment Year"),
-                "recruitment_source": get_text_after_label("Source of Recruitment"),
-                "qualification": get_text_after_label("Qualification(Subject):"),
-                "pay_scale": get_text_after_label("Pay Scale"),
-                "remarks": get_text_after_label("Remarks"),
-                "cadre_domicile": get_cadre_domicile(),
-                "current_posting": get_posting(),
-                "scraped_from_cadre": cadre_code,
-
-                # Reserved full structure
-                "personal": {
-                    "name": None,
-                    "identity_no": None,
-                    "cadre": None,
-                    "dob": None,
-                    "gender": None,
-                    "allotment_year": None,
-                    "domicile": None,
-                    "mother_tongue": None,
-                    "languages_known": None,
-                    "retirement_reason": None
-                },
-                "education": [],
-                "experience": [],
-                "training": [],
-                "awards": [],
-                "deputation": {},
-            }
-
-
-            officers.append(officer)
+            raise ValueError(f"No officer table found for cadre {cadre_code}")
 
+        self.pending[cadre_code] = (response.content, response.headers, officers)
         logger.info(f"✅ Fetched {len(officers)} officers for cadre {cadre_code}")
-        return officers
+        return officers, True
+
+    def mark_complete(self, cadre_code: str):
+        """
+        Cache the cadre's list page once all its officers were processed, so an
+        interrupted or partly failed crawl is not mistaken for an unchanged one.
+        """
+        pending = self.pending.pop(cadre_code, None)
+        if pending:
+            body, headers, officers = pending
+            self.cache.put(self.cache_key(cadre_code), body, headers, officers, LIST_PARSER)
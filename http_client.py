@@ -0,0 +1,146 @@
+# http_client.py
+
+import asyncio
+import importlib.util
+from urllib.parse import urlparse
+
+import httpx
+from config import (
+    HTTP_TIMEOUT,
+    HTTP2_ENABLED,
+    HTTP_MAX_CONNECTIONS_PER_HOST,
+    HTTP_MAX_KEEPALIVE_PER_HOST,
+    HTTP_KEEPALIVE_EXPIRY,
+    REQUEST_CONCURRENCY,
+)
+from rate_limiter import AdaptiveLimiter, THROTTLE_STATUSES, parse_retry_after
+from logger_config import setup_logger
+
+logger = setup_logger()
+
+
+class HttpClientPool:
+    """
+    Shared async HTTP layer for the list and detail fetchers.
+
+    Keeps one httpx.AsyncClient per host, each with its own bounded keep-alive
+    pool, so list pages and detail pages are fetched side by side over reused
+    connections. Clients are created lazily under a lock (no duplicate clients)
+    and are all closed by close().
+
+    Every request goes through the host's AdaptiveLimiter, which sizes the
+    number of in-flight requests to what the host is currently serving well,
+    and holds one slot of the global budget (max_in_flight across all hosts).
+    """
+
+    def __init__(self, http2: bool = HTTP2_ENABLED, timeout: float = HTTP_TIMEOUT,
+                 max_connections: int = HTTP_MAX_CONNECTIONS_PER_HOST,
+                 max_keepalive: int = HTTP_MAX_KEEPALIVE_PER_HOST, max_in_flight: int = REQUEST_CONCURRENCY):
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("⚠️ HTTP/2 requested but the 'h2' package is not installed. Falling back to HTTP/1.1.")
+            http2 = False
+
+        self.http2 = http2
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        )
+        self.host_settings: dict[str, dict] = {}
+        self.clients: dict[str, httpx.AsyncClient] = {}
+        self.limiters: dict[str, AdaptiveLimiter] = {}
+        self.max_in_flight = max_in_flight
+        self._lock: asyncio.Lock | None = None
+        self._budget: asyncio.Semaphore | None = None
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlparse(url).netloc
+
+    def configure_host(self, url: str, headers: dict | None = None, warmup_url: str | None = None):
+        """
+        Register default headers and an optional warm-up page (for cookies)
+        for the host of `url`. Applied when that host's client is created.
+        """
+        self.host_settings[self.host_of(url)] = {"headers": headers or {}, "warmup_url": warmup_url}
+
+    async def open(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+            self._budget = asyncio.Semaphore(self.max_in_flight)
+
+    async def close(self):
+        clients, self.clients = self.clients, {}
+        for host, client in clients.items():
+            await client.aclose()
+            logger.debug(f"[DEBUG] Closed HTTP client for {host}")
+        self._lock = None
+        self._budget = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def client_for(self, url: str) -> httpx.AsyncClient:
+        host = self.host_of(url)
+        client = self.clients.get(host)
+        if client is not None:
+            return client
+
+        if self._lock is None:
+            raise RuntimeError("HttpClientPool is not open. Call open() or use 'async with'.")
+
+        async with self._lock:
+            client = self.clients.get(host)
+            if client is None:
+                settings = self.host_settings.get(host, {})
+                client = httpx.AsyncClient(
+                    timeout=self.timeout,
+                    headers=settings.get("headers"),
+                    limits=self.limits,
+                    http2=self.http2,
+                )
+                warmup_url = settings.get("warmup_url")
+                if warmup_url:
+                    try:
+                        await client.get(warmup_url)
+                    except Exception:
+                        await client.aclose()
+                        raise
+                self.clients[host] = client
+                logger.info(f"🌐 Opened HTTP client for {host} (http2={self.http2})")
+        return client
+
+    def limiter_for(self, url: str) -> AdaptiveLimiter:
+        host = self.host_of(url)
+        limiter = self.limiters.get(host)
+        if limiter is None:
+            limiter = self.limiters[host] = AdaptiveLimiter(host)
+        return limiter
+
+    def limiter_stats(self) -> list[dict]:
+        return [limiter.snapshot() for limiter in self.limiters.values()]
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a request within the host's adaptive concurrency window and the global
+        budget. Timeouts, transport errors, 429 and 5xx shrink the window; Retry-After
+        pauses the host.
+        """
+        client = await self.client_for(url)
+        async with self.limiter_for(url).slot(self._budget) as outcome:
+            response = await client.request(method, url, **kwargs)
+            if response.status_code in THROTTLE_STATUSES:
+                outcome["throttled"] = True
+                outcome["retry_after"] = parse_retry_after(response.headers.get("Retry-After"))
+        return response
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
@@ -0,0 +1,103 @@
+# lexical_index.py
+#
+# Sparse lexical (BM25) side of hybrid retrieval. Documents get BM25 term weights
+# (term-frequency saturation and length normalisation) at ingestion; Qdrant applies
+# the IDF part at query time (Modifier.IDF on the sparse vector), so weights never
+# need recomputing as the corpus changes. Terms are hashed to stable 32-bit indices.
+
+import re
+import unicodedata
+import zlib
+from collections import Counter
+
+from qdrant_client.http.models import SparseVector
+
+from config import BM25_K1, BM25_B, BM25_AVG_DOC_LENGTH, RRF_K, LEXICAL_GENERIC_TERMS
+
+# Words (keeping internal dots / ampersands: "b.tech", "r&d"), and quoted phrases
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.&][a-z0-9]+)*")
+WORD_RE = re.compile(r"[A-Za-z0-9]+(?:[.&][A-Za-z0-9]+)*\.?")
+# Single quotes only count at word boundaries, so apostrophes (who's, women's) never pair up
+QUOTED_RE = re.compile(r"\"([^\"]{2,})\"|“([^“”]{2,})”|(?<!\w)'([^']{2,})'(?!\w)")
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in into is it its of on or that the their this to was were
+which who with within under over than then also any all
+""".split())
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Lowercased NFKC tokens without stopwords. Dotted tokens also yield their
+    undotted form ("b.tech" → "b.tech", "btech"), so both spellings match.
+    """
+    tokens = []
+    for token in TOKEN_RE.findall(unicodedata.normalize("NFKC", text or "").lower()):
+        if token in STOPWORDS:
+            continue
+        tokens.append(token)
+        if "." in token:
+            tokens.append(token.replace(".", ""))
+    return tokens
+
+
+def term_index(term: str) -> int:
+    """Stable 32-bit index of a term (process-independent, unlike hash())."""
+    return zlib.crc32(term.encode("utf-8"))
+
+
+def to_sparse(weights: dict[int, float]) -> SparseVector:
+    indices = sorted(weights)
+    return SparseVector(indices=indices, values=[weights[i] for i in indices])
+
+
+def sparse_document(text: str) -> SparseVector:
+    """BM25 document-side term weights of an officer text (IDF is applied by Qdrant)."""
+    tokens = tokenize(text)
+    length_norm = 1 - BM25_B + BM25_B * len(tokens) / BM25_AVG_DOC_LENGTH
+    weights = {}
+    for term, tf in Counter(tokens).items():
+        index = term_index(term)
+        weights[index] = weights.get(index, 0.0) + tf * (BM25_K1 + 1) / (tf + BM25_K1 * length_norm)
+    return to_sparse(weights)
+
+
+def sparse_query(text: str) -> SparseVector:
+    """Query terms with weight 1 each; the score is then Σ IDF × document weight."""
+    return to_sparse({term_index(term): 1.0 for term in tokenize(text)})
+
+
+def lexical_anchors(query: str) -> list[str]:
+    """
+    Tokens of the raw query that name something exactly rather than describe it:
+    quoted phrases, acronyms and mixed-case names (DoPT, NITI, MeitY) and dotted
+    degrees (B.Tech, M.A.). Generic service words (LEXICAL_GENERIC_TERMS) don't count.
+    """
+    anchors = [next(filter(None, groups)).strip() for groups in QUOTED_RE.findall(query)]
+    for word in WORD_RE.findall(query):
+        if word.lower().rstrip(".") in LEXICAL_GENERIC_TERMS:
+            continue
+        uppercase = sum(c.isupper() for c in word)
+        if ("." in word.rstrip(".") and any(c.isalpha() for c in word)) or uppercase >= 2:
+            anchors.append(word)
+    return anchors
+
+
+def rrf_fuse(rankings: list[list[dict]], key=lambda item: item["_id"], k: int = RRF_K) -> list[dict]:
+    """
+    Reciprocal rank fusion: each item scores Σ 1 / (k + rank) over the rankings
+    it appears in (rank from 1). Items are merged by `key`, the first ranking's
+    copy winning; the fused score is stored as "_fused_score".
+    """
+    fused, scores = {}, {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            item_key = key(item)
+            merged = fused.setdefault(item_key, dict(item))
+            for field, value in item.items():
+                if field.startswith("_"):  # scores from every ranking are kept
+                    merged[field] = value
+            scores[item_key] = scores.get(item_key, 0.0) + 1.0 / (k + rank)
+    for item_key, item in fused.items():
+        item["_fused_score"] = scores[item_key]
+    return sorted(fused.values(), key=lambda item: item["_fused_score"], reverse=True)
@@ -0,0 +1,437 @@
+# local_replica.py
+#
+# In-process read replica of the officer collection, so semantic_search can skip
+# the network round trip to Qdrant: section vectors in one memory-mapped float16
+# matrix (sections × officers × dims), the BM25 lexical vectors (with HYBRID_SEARCH)
+# as term postings, the "list" payload profile in columnar arrays, and filtered
+# top-k search with numpy.
+#
+# The refresh worker syncs it after every published data version: payloads are
+# re-read in one vector-less scroll and vectors are fetched only for officers
+# whose section or text hashes changed. The app uses it only while its version matches
+# the data version; otherwise (or for a filter it cannot evaluate) searches go to Qdrant.
+#
+#   python local_replica.py            # sync the replica from the collection
+#   python local_replica.py --status   # show what is on disk
+
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import (
+    SparseVector,
+    Filter,
+    FieldCondition,
+    MatchValue,
+    MatchAny,
+    MatchExcept,
+    Range,
+    QueryResponse,
+    ScoredPoint,
+)
+
+from config import (
+    QDRANT_URL, QDRANT_API_KEY, QDRANT_COLLECTION_NAME, EMBEDDING_SECTIONS, PAYLOAD_PROFILES,
+    REPLICA_DIR, REPLICA_FETCH_BATCH, HYBRID_SEARCH, LEXICAL_VECTOR,
+)
+from data_version import current_data_version
+from logger_config import setup_logger
+
+logger = setup_logger()
+
+COLUMNS = PAYLOAD_PROFILES["list"]
+SCROLL_PAGE_SIZE = 1000
+
+
+def conditions(clause) -> list:
+    """A Filter clause (must / should / must_not) as a list: it may be None, one condition or a list."""
+    if clause is None:
+        return []
+    return clause if isinstance(clause, list) else [clause]
+
+
+def column_codes(values: list) -> tuple[dict[str, int], np.ndarray]:
+    """
+    Dictionary-encode a payload column. Values are keyed by their JSON form, so
+    2005 and "2005" stay distinct, exactly as Qdrant's match conditions treat them.
+    """
+    vocab, codes = {}, np.empty(len(values), dtype=np.int32)
+    for i, value in enumerate(values):
+        codes[i] = vocab.setdefault(json.dumps(value, sort_keys=True), len(vocab))
+    return vocab, codes
+
+
+def numeric_column(values: list) -> np.ndarray:
+    """Numbers as float64, anything else NaN (Range conditions skip non-numeric payloads)."""
+    return np.array([v if isinstance(v, (int, float)) and not isinstance(v, bool) else np.nan for v in values],
+                    dtype=np.float64)
+
+
+class ReplicaGeneration:
+    """
+    One published replica, immutable once loaded: ids, section vectors (memmap),
+    which sections each officer has, and the payload columns. Searches hold a
+    reference to one generation, so a reload never mixes two of them.
+    """
+
+    def __init__(self, directory: Path, pointer: dict):
+        with open(directory / "columns.json", encoding="utf-8") as f:
+            columns = json.load(f)
+        count, dim = pointer["count"], pointer["dim"]
+        self.meta = pointer
+        self.sections = tuple(pointer["sections"])
+        shape = (len(self.sections), count, dim)
+        self.vectors = (np.memmap(directory / "vectors.f16", dtype=np.float16, mode="r", shape=shape)
+                        if count else np.zeros(shape, dtype=np.float16))
+        self.present = np.load(directory / "present.npy")
+        self.ids = np.array(columns.pop("_id"), dtype=np.int64)
+        self.section_hashes = columns.pop("_section_hashes")
+        self.text_hashes = columns.pop("_text_hashes", [None] * count)
+        self.columns = columns
+        self.lexical = bool(pointer.get("lexical"))
+        if self.lexical:
+            # CSR per officer (indptr / terms / weights), plus the same entries sorted by term as postings
+            self.lexical_indptr = np.load(directory / "lexical_indptr.npy")
+            self.lexical_terms = np.load(directory / "lexical_terms.npy")
+            self.lexical_weights = np.load(directory / "lexical_weights.npy")
+            order = np.argsort(self.lexical_terms, kind="stable")
+            self.posting_terms = self.lexical_terms[order]
+            self.posting_rows = np.repeat(np.arange(count), np.diff(self.lexical_indptr))[order]
+            self.posting_weights = self.lexical_weights[order]
+        self.codes = {name: column_codes(values) for name, values in columns.items()}
+        self.numeric = {name: numeric_column(values) for name, values in columns.items()}
+
+    def condition_mask(self, condition) -> np.ndarray | None:
+        """Rows matching one condition, or None if the replica cannot evaluate it."""
+        if isinstance(condition, Filter):
+            return self.filter_mask(condition)
+        if not isinstance(condition, FieldCondition) or condition.key not in self.columns:
+            return None
+        if condition.range is not None and isinstance(condition.range, Range):
+            values, r = self.numeric[condition.key], condition.range
+            with np.errstate(invalid="ignore"):
+                mask = ~np.isnan(values)
+                for bound, compare in ((r.gt, np.greater), (r.gte, np.greater_equal),
+                                       (r.lt, np.less), (r.lte, np.less_equal)):
+                    if bound is not None:
+                        mask &= compare(values, bound)
+            return mask
+        vocab, codes = self.codes[condition.key]
+        match = condition.match
+        if isinstance(match, MatchValue):
+            wanted = [match.value]
+        elif isinstance(match, MatchAny):
+            wanted = match.any
+        elif isinstance(match, MatchExcept):
+            excluded = [vocab[k] for k in (json.dumps(v) for v in match.except_) if k in vocab]
+            return ~np.isin(codes, excluded)
+        else:
+            return None
+        return np.isin(codes, [vocab[k] for k in (json.dumps(v) for v in wanted) if k in vocab])
+
+    def filter_mask(self, qdrant_filter: Filter | None) -> np.ndarray | None:
+        """Boolean row mask for a Qdrant Filter (must / should / must_not), None if unsupported."""
+        mask = np.ones(len(self.ids), dtype=bool)
+        if qdrant_filter is None:
+            return mask
+        if qdrant_filter.min_should is not None:
+            return None
+        for condition in conditions(qdrant_filter.must):
+            part = self.condition_mask(condition)
+            if part is None:
+                return None
+            mask &= part
+        should = conditions(qdrant_filter.should)
+        if should:
+            any_mask = np.zeros_like(mask)
+            for condition in should:
+                part = self.condition_mask(condition)
+                if part is None:
+                    return None
+                any_mask |= part
+            mask &= any_mask
+        for condition in conditions(qdrant_filter.must_not):
+            part = self.condition_mask(condition)
+            if part is None:
+                return None
+            mask &= ~part
+        return mask
+
+    def payload(self, row: int) -> dict:
+        return {name: values[row] for name, values in self.columns.items()}
+
+    def lexical_row(self, row: int) -> tuple[np.ndarray, np.ndarray]:
+        start, end = self.lexical_indptr[row], self.lexical_indptr[row + 1]
+        return self.lexical_terms[start:end], self.lexical_weights[start:end]
+
+    def lexical_search(self, queries: list[SparseVector], mask: np.ndarray, limit: int) -> list[QueryResponse]:
+        """
+        Top-`limit` rows of `mask` per sparse query, scored as Qdrant's Modifier.IDF
+        does: Σ query weight × idf × document weight, with
+        idf = ln((N − df + 0.5) / (df + 0.5) + 1) over the whole collection.
+        """
+        count = len(self.ids)
+        responses = []
+        for query in queries:
+            scores = np.zeros(count, dtype=np.float32)
+            matched = np.zeros(count, dtype=bool)
+            for term, weight in zip(query.indices, query.values):
+                lo = np.searchsorted(self.posting_terms, term, side="left")
+                hi = np.searchsorted(self.posting_terms, term, side="right")
+                if lo == hi:
+                    continue
+                idf = np.log((count - (hi - lo) + 0.5) / ((hi - lo) + 0.5) + 1)
+                rows = self.posting_rows[lo:hi]
+                scores[rows] += weight * idf * self.posting_weights[lo:hi]
+                matched[rows] = True
+            rows = np.flatnonzero(matched & mask)
+            top = rows[np.argsort(-scores[rows], kind="stable")[:limit]]
+            responses.append(QueryResponse(points=[
+                ScoredPoint(id=int(self.ids[row]), version=0, score=float(scores[row]), payload=self.payload(row))
+                for row in top
+            ]))
+        return responses
+
+    def search(self, queries: np.ndarray, mask: np.ndarray, limit: int) -> list[QueryResponse]:
+        """Top-`limit` rows of `mask` per query × section (dot product of normalised vectors = cosine)."""
+        per_section = []
+        for s in range(len(self.sections)):
+            rows = np.flatnonzero(mask & self.present[s])
+            scores = (np.asarray(self.vectors[s, rows], dtype=np.float32) @ queries.T).T  # queries × rows
+            k = min(limit, len(rows))
+            if k:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+                top = np.take_along_axis(top, order, axis=1)
+            else:
+                top = np.empty((len(queries), 0), dtype=np.int64)
+            per_section.append((rows, scores, top))
+
+        return [
+            QueryResponse(points=[
+                ScoredPoint(id=int(self.ids[rows[i]]), version=0, score=float(scores[q, i]),
+                            payload=self.payload(rows[i]))
+                for i in top[q]
+            ])
+            for q in range(len(queries))
+            for rows, scores, top in per_section
+        ]
+
+
+class LocalReplica:
+    """
+    Read side: keeps the current generation under REPLICA_DIR loaded, switches to
+    a newer one when the refresh worker publishes it, and answers section searches
+    in the same shape as client.query_batch_points. Write side: sync().
+    """
+
+    def __init__(self, root: Path = REPLICA_DIR):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self.current: ReplicaGeneration | None = None
+
+    def read_pointer(self) -> dict | None:
+        try:
+            with open(self.root / "current.json", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def load(self, pointer: dict) -> ReplicaGeneration:
+        generation = ReplicaGeneration(self.root / pointer["generation"], pointer)
+        self.current = generation
+        logger.info(f"📥 Loaded local replica {pointer['generation']}: {pointer['count']} officers, "
+                    f"data version {pointer['version']}")
+        return generation
+
+    def ready(self) -> ReplicaGeneration | None:
+        """The loaded generation if it is at the current data version (reloading if one was published)."""
+        version = current_data_version()
+        current = self.current
+        if current and current.meta["version"] == version:
+            return current
+        with self._lock:
+            pointer = self.read_pointer()
+            if not pointer or pointer["version"] != version or tuple(pointer["sections"]) != EMBEDDING_SECTIONS:
+                return None
+            if self.current and self.current.meta["generation"] == pointer["generation"]:
+                return self.current
+            try:
+                return self.load(pointer)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not load local replica {pointer['generation']}: {e}")
+                return None
+
+    def search(self, query_vectors, qdrant_filter: Filter | None, limit: int) -> list[QueryResponse] | None:
+        """
+        Top-`limit` officers per query × section, in query_batch_points order. None
+        when the replica is stale or missing, or cannot evaluate the filter, so the
+        caller falls back to Qdrant.
+        """
+        generation = self.ready()
+        if generation is None:
+            return None
+        mask = generation.filter_mask(qdrant_filter)
+        if mask is None:
+            return None
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        queries /= np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        return generation.search(queries, mask, limit)
+
+    def lexical_search(self, queries: list[SparseVector], qdrant_filter: Filter | None,
+                       limit: int) -> list[QueryResponse] | None:
+        """
+        BM25 top-`limit` per sparse query, like query_batch_points on the lexical
+        vector. None when the replica is stale or missing, was synced without
+        lexical vectors, or cannot evaluate the filter.
+        """
+        generation = self.ready()
+        if generation is None or not generation.lexical:
+            return None
+        mask = generation.filter_mask(qdrant_filter)
+        if mask is None:
+            return None
+        return generation.lexical_search(queries, mask, limit)
+
+    def sync(self, client: QdrantClient, collection: str = QDRANT_COLLECTION_NAME) -> dict:
+        """
+        Bring the replica up to date with the collection and publish it as a new
+        generation. Vectors are fetched only for new officers and officers whose
+        section (or, for the lexical vector, text) hashes changed; every payload
+        column is re-read from one scroll. The generation is stamped with the data
+        version seen before the scroll, so one racing a refresh is re-synced later.
+        """
+        version = current_data_version()
+        started = time.perf_counter()
+        previous, pointer = None, self.read_pointer()
+        if pointer:
+            try:
+                previous = ReplicaGeneration(self.root / pointer["generation"], pointer)
+            except Exception as e:
+                logger.warning(f"⚠️ Rebuilding local replica, could not load {pointer['generation']}: {e}")
+
+        records, offset = [], None
+        while True:
+            points, offset = client.scroll(collection_name=collection, limit=SCROLL_PAGE_SIZE, offset=offset,
+                                           with_payload=COLUMNS + ["section_hashes", "text_hash"],
+                                           with_vectors=False)
+            records.extend(points)
+            if offset is None:
+                break
+        records.sort(key=lambda p: p.id)
+
+        params = client.get_collection(collection).config.params
+        dim = params.vectors[EMBEDDING_SECTIONS[0]].size
+        lexical = HYBRID_SEARCH and LEXICAL_VECTOR in (params.sparse_vectors or {})
+        reusable = (previous is not None and previous.sections == EMBEDDING_SECTIONS and previous.meta["dim"] == dim
+                    and previous.lexical == lexical)
+        old_rows = {int(i): row for row, i in enumerate(previous.ids)} if reusable else {}
+
+        count = len(records)
+        vectors = np.zeros((len(EMBEDDING_SECTIONS), count, dim), dtype=np.float16)
+        present = np.zeros((len(EMBEDDING_SECTIONS), count), dtype=bool)
+        no_terms = (np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.float32))
+        lexical_rows = [no_terms] * count
+        to_fetch, kept, kept_from = {}, [], []
+        for row, point in enumerate(records):
+            payload = point.payload or {}
+            hashes = payload.get("section_hashes")
+            old = old_rows.get(point.id)
+            if (old is not None and hashes and previous.section_hashes[old] == hashes
+                    and (not lexical or previous.text_hashes[old] == payload.get("text_hash"))):
+                kept.append(row)
+                kept_from.append(old)
+                if lexical:
+                    lexical_rows[row] = previous.lexical_row(old)
+            else:
+                to_fetch[point.id] = row
+        if kept:
+            vectors[:, kept] = previous.vectors[:, kept_from]
+            present[:, kept] = previous.present[:, kept_from]
+
+        ids = list(to_fetch)
+        fetch_vectors = list(EMBEDDING_SECTIONS) + ([LEXICAL_VECTOR] if lexical else [])
+        for i in range(0, len(ids), REPLICA_FETCH_BATCH):
+            for point in client.retrieve(collection_name=collection, ids=ids[i:i + REPLICA_FETCH_BATCH],
+                                         with_payload=False, with_vectors=fetch_vectors):
+                row = to_fetch[point.id]
+                sparse = (point.vector or {}).get(LEXICAL_VECTOR) if lexical else None
+                if sparse is not None:
+                    lexical_rows[row] = (np.asarray(sparse.indices, dtype=np.uint32),
+                                         np.asarray(sparse.values, dtype=np.float32))
+                for s, section in enumerate(EMBEDDING_SECTIONS):
+                    vector = (point.vector or {}).get(section)
+                    if vector is not None:
+                        vector = np.asarray(vector, dtype=np.float32)
+                        vectors[s, row] = vector / max(np.linalg.norm(vector), 1e-12)  # cosine = dot product
+                        present[s, row] = True
+
+        columns = {name: [(p.payload or {}).get(name) for p in records] for name in COLUMNS}
+        columns["_id"] = [p.id for p in records]
+        columns["_section_hashes"] = [(p.payload or {}).get("section_hashes") for p in records]
+        columns["_text_hashes"] = [(p.payload or {}).get("text_hash") for p in records]
+
+        generation = f"gen-{time.time_ns()}"
+        directory = self.root / generation
+        directory.mkdir(parents=True, exist_ok=True)
+        if count:
+            out = np.memmap(directory / "vectors.f16", dtype=np.float16, mode="w+", shape=vectors.shape)
+            out[:] = vectors
+            out.flush()
+            del out
+        np.save(directory / "present.npy", present)
+        if lexical:
+            lengths = np.array([len(terms) for terms, _ in lexical_rows], dtype=np.int64)
+            np.save(directory / "lexical_indptr.npy", np.concatenate([[0], np.cumsum(lengths)]))
+            np.save(directory / "lexical_terms.npy",
+                    np.concatenate([terms for terms, _ in lexical_rows] or [no_terms[0]]).astype(np.uint32))
+            np.save(directory / "lexical_weights.npy",
+                    np.concatenate([weights for _, weights in lexical_rows] or [no_terms[1]]).astype(np.float32))
+        with open(directory / "columns.json", "w", encoding="utf-8") as f:
+            json.dump(columns, f, ensure_ascii=False)
+
+        pointer = {"generation": generation, "version": version, "count": count, "dim": dim,
+                   "sections": list(EMBEDDING_SECTIONS), "lexical": lexical, "synced_at": time.time()}
+        tmp_path = self.root / "current.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(pointer, f, indent=2)
+        os.replace(tmp_path, self.root / "current.json")
+
+        # Older generations can go: open memmaps keep their (unlinked) files alive
+        for old in self.root.glob("gen-*"):
+            if old.name != generation:
+                shutil.rmtree(old, ignore_errors=True)
+
+        stats = {"officers": count, "vectors_fetched": len(ids), "reused": len(kept),
+                 "seconds": time.perf_counter() - started}
+        logger.info(f"🪞 Synced local replica to data version {version}: {count} officers, "
+                    f"{len(ids)} re-fetched, {stats['reused']} reused ({stats['seconds']:.1f}s)")
+        return stats
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Sync or inspect the in-process read replica")
+    ap.add_argument("--status", action="store_true", help="Show the replica on disk instead of syncing")
+    args = ap.parse_args()
+
+    replica = LocalReplica()
+    if args.status:
+        pointer = replica.read_pointer()
+        if not pointer:
+            print(f"No replica under {REPLICA_DIR}")
+            return
+        state = "current" if pointer["version"] == current_data_version() else "stale"
+        print(f"{pointer['generation']}: {pointer['count']} officers × {len(pointer['sections'])} sections × "
+              f"{pointer['dim']} dims, data version {pointer['version']} ({state})")
+        return
+    replica.sync(QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,10 @@ from langgraph.graph import StateGraph, END
 from langchain_core.messages import HumanMessage
 from typing import TypedDict, Annotated
 from tools import ALL_TOOLS
+from result_cache import ResultCache, canonical_filters
+from semantic_search import fetch_shortlist
+from check_role import lexical_intent
+from config import QUERY_EXPANSION, HYBRID_SEARCH
 
 # Unpack tools from ALL_TOOLS
 (
@@ -13,6 +17,9 @@ from tools import ALL_TOOLS
     check_role_intent_tool
 ) = ALL_TOOLS
 
+# Exact-key caches for intent, retrieval and answers (retrieval/answers expire with the data version)
+result_cache = ResultCache()
+
 # Shared state definition
 class AgentState(TypedDict):
     input: str
@@ -21,12 +28,23 @@ class AgentState(TypedDict):
     current_title: str
     search_results: list
     reasoning_output: str
+    expansion_skipped: bool
     steps: list[str]
 
 # Tool wrappers
 
 def check_role_intent(state: AgentState):
-    result = check_role_intent_tool.invoke(state["input"])
+    # Anchored queries (exact names, degrees, acronyms) skip the LLM expansion: BM25 matches them as written
+    result = lexical_intent(state["input"]) if QUERY_EXPANSION == "auto" and HYBRID_SEARCH else None
+    state["expansion_skipped"] = result is not None
+    if result is not None:
+        state["steps"].append(f"Matched lexical anchors {', '.join(result['anchors'])}; skipped query expansion.")
+    else:
+        result = result_cache.get_or_compute(
+            "intent",
+            result_cache.make_key(state["input"]),
+            lambda: check_role_intent_tool.invoke(state["input"]),
+        )
     state["queries"] = result["queries"]
     current_title = result.get("current_title")
     if current_title:
@@ -35,21 +53,29 @@ def check_role_intent(state: AgentState):
     return state
 
 def semantic_search(state: AgentState):
-    out = semantic_search_tool.invoke({
+    top_k = 5 if state.get("expansion_skipped") else 2  # expanded queries each add a few; a raw query gets more
+    key = result_cache.make_key(state["queries"], canonical_filters(state["filters"]), top_k)
+    out = result_cache.get_or_compute("retrieval", key, lambda: semantic_search_tool.invoke({
         "query": state["queries"],
-        "filters": state["filters"],
-        "top_k": 2
-    })
+        "filters": dict(state["filters"]),  # copy: the tool rewrites the year filter
+        "top_k": top_k
+    }))
     state["search_results"] = out if isinstance(out, list) else out.get("results", [])
     state["steps"].append("Performed semantic search.")
     return state
 
 def reasoning(state: AgentState):
-    result = reasoning_tool.invoke({
+    officers = state.get("search_results", [])
+    key = result_cache.make_key(
+        state["input"],
+        canonical_filters(state["filters"]),
+        [o.get("supremo_url") or o.get("name") or o.get("title") for o in officers if isinstance(o, dict)],
+    )
+    result = result_cache.get_or_compute("answer", key, lambda: reasoning_tool.invoke({
         "query": state["input"],
-        "officers": state.get("search_results", []),
+        "officers": fetch_shortlist(officers, "card"),  # one batched retrieve for the heavier fields
         "filters": state["filters"]
-    })
+    }))
 
     # 👇 Defensive check
     if isinstance(result, dict) and "output" in result:
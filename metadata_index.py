@@ -0,0 +1,159 @@
+# metadata_index.py
+#
+# Compact in-process index of the filterable officer metadata (cadre, gender,
+# allotment year, title level) for filter_officers. One vector-less scroll builds
+# it per data version; afterwards every trait is a boolean row mask, the match
+# counts of all 2^n − 1 relaxations come out of one histogram, and officers are
+# sampled uniformly from the whole matching set instead of the first scroll page.
+
+import threading
+import time
+from itertools import combinations
+
+import numpy as np
+from qdrant_client import QdrantClient
+from rapidfuzz import fuzz
+
+from config import QDRANT_COLLECTION_NAME, TITLE_LEVELS
+from data_version import current_data_version
+from logger_config import setup_logger
+
+logger = setup_logger()
+
+INDEX_FIELDS = ["cadre", "gender", "allotment_year", "current_title"]
+SCROLL_PAGE_SIZE = 1000
+
+# allotment_year_operation → comparison, as the Range filters it replaces
+YEAR_OPERATIONS = {
+    "before": np.less_equal,
+    "from": np.greater_equal,
+    "after": np.greater,
+}
+
+
+def title_levels(user_title: str) -> set[int]:
+    """
+    Levels matching a requested title, as semantic_search.match_titles: the
+    closest known title's level and the one below it.
+    """
+    best_title = max(TITLE_LEVELS, key=lambda title: fuzz.ratio(user_title.lower(), title.lower()))
+    level = TITLE_LEVELS[best_title]
+    return {level, level - 1} - {0}  # 0 = title not in TITLE_LEVELS
+
+
+def relaxation_counts(masks: list[np.ndarray]) -> np.ndarray:
+    """
+    counts[c] = rows matching every trait in combination c (bit i = trait i),
+    for all 2^n combinations at once: a histogram of each row's trait signature,
+    then a superset sum over it.
+    """
+    n = len(masks)
+    signature = np.zeros(len(masks[0]) if masks else 0, dtype=np.int64)
+    for i, mask in enumerate(masks):
+        signature |= mask.astype(np.int64) << i
+    counts = np.bincount(signature, minlength=1 << n)
+    for i in range(n):
+        for combo in range(1 << n):
+            if not combo & (1 << i):
+                counts[combo] += counts[combo | (1 << i)]
+    return counts
+
+
+def relaxation_order(n: int) -> list[tuple[int, ...]]:
+    """Trait combinations from strictest to loosest: more traits first, then trait order."""
+    return [combo for r in range(n, 0, -1) for combo in combinations(range(n), r)]
+
+
+class MetadataIndex:
+    """Columnar metadata of every officer, immutable once built."""
+
+    def __init__(self, ids: list[int], payloads: list[dict], version: int):
+        self.version = version
+        self.ids = np.array(ids, dtype=np.int64)
+        self.cadre = self.encode([p.get("cadre") for p in payloads])
+        self.gender = self.encode([p.get("gender") for p in payloads])
+        self.year = np.array([p.get("allotment_year") if isinstance(p.get("allotment_year"), int) else np.nan
+                              for p in payloads], dtype=np.float64)
+        self.title_level = np.array([TITLE_LEVELS.get(p.get("current_title"), 0) for p in payloads], dtype=np.int8)
+
+    @staticmethod
+    def encode(values: list) -> tuple[dict, np.ndarray]:
+        """Dictionary-encode a keyword column: (value → code, per-row codes)."""
+        vocab = {}
+        codes = np.array([vocab.setdefault(v, len(vocab)) for v in values], dtype=np.int32)
+        return vocab, codes
+
+    @classmethod
+    def build(cls, client: QdrantClient, collection: str = QDRANT_COLLECTION_NAME) -> "MetadataIndex":
+        version = current_data_version()  # read first: a write during the build leaves it stale, not wrong
+        started = time.perf_counter()
+        ids, payloads, offset = [], [], None
+        while True:
+            points, offset = client.scroll(collection_name=collection, limit=SCROLL_PAGE_SIZE, offset=offset,
+                                           with_payload=INDEX_FIELDS, with_vectors=False)
+            ids.extend(point.id for point in points)
+            payloads.extend(point.payload or {} for point in points)
+            if offset is None:
+                break
+        index = cls(ids, payloads, version)
+        logger.info(f"🗂️ Built metadata index: {len(ids)} officers, data version {version} "
+                    f"({time.perf_counter() - started:.1f}s)")
+        return index
+
+    def keyword_mask(self, column: tuple[dict, np.ndarray], value) -> np.ndarray:
+        vocab, codes = column
+        if value not in vocab:
+            return np.zeros(len(codes), dtype=bool)
+        return codes == vocab[value]
+
+    def trait_masks(self, filters: dict) -> list[tuple[str, np.ndarray]]:
+        """Row mask per requested trait, in relaxation priority order (first = kept longest)."""
+        traits = []
+        if filters.get("cadre") is not None:
+            traits.append(("cadre", self.keyword_mask(self.cadre, filters["cadre"])))
+        if filters.get("gender") is not None:
+            traits.append(("gender", self.keyword_mask(self.gender, filters["gender"])))
+        op, year = filters.get("allotment_year_operation"), filters.get("allotment_year")
+        if op in YEAR_OPERATIONS and year is not None:
+            with np.errstate(invalid="ignore"):
+                traits.append(("allotment_year", YEAR_OPERATIONS[op](self.year, float(year))))
+        if filters.get("current_title"):
+            traits.append(("current_title", np.isin(self.title_level, list(title_levels(filters["current_title"])))))
+        return traits
+
+    def best_match(self, filters: dict) -> tuple[list[str], np.ndarray]:
+        """
+        The strictest trait combination with any match (most traits first, then
+        trait order) and its matching rows; ([], empty) when nothing matches.
+        """
+        traits = self.trait_masks(filters)
+        if not traits:
+            return [], np.empty(0, dtype=np.int64)
+        counts = relaxation_counts([mask for _, mask in traits])
+        for combo in relaxation_order(len(traits)):
+            if counts[sum(1 << i for i in combo)]:
+                mask = np.logical_and.reduce([traits[i][1] for i in combo])
+                return [traits[i][0] for i in combo], np.flatnonzero(mask)
+        return [], np.empty(0, dtype=np.int64)
+
+    def sample(self, rows: np.ndarray, k: int, rng: np.random.Generator | None = None) -> list[int]:
+        """Up to k point ids drawn uniformly, without replacement, from the matching rows."""
+        rng = rng or np.random.default_rng()
+        chosen = rng.choice(rows, size=min(k, len(rows)), replace=False)
+        return [int(i) for i in self.ids[chosen]]
+
+
+_index: MetadataIndex | None = None
+_lock = threading.Lock()
+
+
+def get_metadata_index(client: QdrantClient) -> MetadataIndex:
+    """The process-wide index, rebuilt (one scroll) when the data version has moved on."""
+    global _index
+    version = current_data_version()
+    if _index is not None and _index.version == version:
+        return _index
+    with _lock:
+        if _index is None or _index.version != version:
+            _index = MetadataIndex.build(client)
+        return _index
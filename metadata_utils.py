@@ -1,8 +1,20 @@
 # metadata_utils.py
 
 import base64
+import hashlib
+import json
+import re
+import unicodedata
 from urllib.parse import urlparse, parse_qs
 
+# Fingerprints stored in the payload; kept verbatim (not re-hashed) in the manifest
+FINGERPRINT_FIELDS = ("text_hash", "meta_hash", "section_hashes")
+
+# Crawl bookkeeping rather than officer data: an officer listed by several cadres is
+# claimed by whichever list arrives first, so this may differ from run to run
+UNFINGERPRINTED_FIELDS = ("scraped_from_cadre",)
+
+
 class MetadataUtils:
     
 
@@ -25,3 +37,39 @@ class MetadataUtils:
         except Exception as e:
             print(f"[WARN] Could not decode internal ID from supremo_url: {e}")
             return -1  # fallback invalid ID
+
+    def field_hash(self, value) -> str:
+        """
+        Stable short hash of any JSON-serialisable payload value.
+        """
+        raw = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+    def field_hashes(self, payload: dict, exclude: tuple = ("text",)) -> dict:
+        """
+        Per-field hashes of a point payload (heavy fields excluded).
+        Fingerprint fields are already hashes and are kept as they are.
+        """
+        return {
+            k: v if k in FINGERPRINT_FIELDS else self.field_hash(v)
+            for k, v in payload.items() if k not in exclude
+        }
+
+    def text_fingerprint(self, text: str) -> str:
+        """
+        Fingerprint of the embedded text after canonicalization (NFKC, collapsed
+        whitespace, no blank lines), so formatting-only differences don't count as changes.
+        """
+        canonical = unicodedata.normalize("NFKC", text or "")
+        lines = (re.sub(r"\s+", " ", line).strip() for line in canonical.splitlines())
+        canonical = "\n".join(line for line in lines if line)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+    def metadata_fingerprint(self, payload: dict) -> str:
+        """
+        Fingerprint of the metadata payload (everything except the text, the
+        fingerprints and UNFINGERPRINTED_FIELDS).
+        """
+        metadata = {k: v for k, v in payload.items()
+                    if k != "text" and k not in FINGERPRINT_FIELDS and k not in UNFINGERPRINTED_FIELDS}
+        return self.field_hash(metadata)
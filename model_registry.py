@@ -0,0 +1,82 @@
+# model_registry.py
+
+import resource
+import sys
+import threading
+import time
+
+import numpy as np
+
+from config import EMBEDDING_MODEL_NAME, EMBEDDING_BACKEND, EMBEDDING_DIM
+from embedding_backends import load_model
+from logger_config import setup_logger
+
+logger = setup_logger()
+
+_models: dict[tuple[str, str], object] = {}
+_load_seconds: dict[tuple[str, str], float] = {}
+_lock = threading.Lock()
+
+
+def _rss_mb() -> float:
+    """Peak resident memory of this process in MB (ru_maxrss is bytes on macOS, KB elsewhere)."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def get_model(name: str = EMBEDDING_MODEL_NAME, backend: str = EMBEDDING_BACKEND):
+    """
+    The process-wide embedding model for `name` on `backend` (see
+    embedding_backends), loaded on first use. Ingestion (FullPDFEmbedder) and
+    query code (embedding.get_embedding_model) share the same instance, so each
+    model is held in memory once.
+    """
+    key = (name, backend)
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            logger.info(f"⏳ Loading embedding model {name} ({backend})...")
+            rss_before = _rss_mb()
+            start = time.perf_counter()
+            model = load_model(name, backend)
+            _load_seconds[key] = time.perf_counter() - start
+            _models[key] = model
+            logger.info(
+                f"✅ Embedding model {name} ({backend}) loaded in {_load_seconds[key]:.1f}s "
+                f"(peak RSS {rss_before:.0f} → {_rss_mb():.0f} MB)"
+            )
+    return model
+
+
+def truncate_dim(vectors: np.ndarray, dim: int) -> np.ndarray:
+    """
+    Matryoshka truncation as recommended for nomic-embed-text-v1.5: layer-norm
+    the full embedding, keep the first `dim` components, then L2-normalise.
+    Vectors already at (or below) `dim` are returned unchanged.
+    """
+    if dim >= vectors.shape[-1]:
+        return vectors
+    mean = vectors.mean(axis=-1, keepdims=True)
+    var = vectors.var(axis=-1, keepdims=True)
+    vectors = ((vectors - mean) / np.sqrt(var + 1e-5))[..., :dim]
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+def encode(texts: list[str], dim: int = EMBEDDING_DIM, name: str = EMBEDDING_MODEL_NAME,
+           backend: str = EMBEDDING_BACKEND, **kwargs) -> list[list[float]]:
+    """
+    Embed `texts` with the shared model, truncated to `dim` (EMBEDDING_DIM).
+    All code that writes or queries the collection should embed through here
+    so stored and query vectors always have the same shape.
+    """
+    vectors = get_model(name, backend).encode(texts, convert_to_numpy=True, **kwargs)
+    return truncate_dim(vectors, dim).tolist()
+
+
+def loaded_models() -> dict[str, float]:
+    """Loaded "name (backend)" entries and how long each took to load (seconds)."""
+    return {f"{name} ({backend})": seconds for (name, backend), seconds in _load_seconds.items()}
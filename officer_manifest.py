@@ -0,0 +1,207 @@
+# officer_manifest.py
+
+import argparse
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import PayloadSelectorExclude
+from config import MANIFEST_PATH, QDRANT_COLLECTION_NAME, QDRANT_URL, QDRANT_API_KEY
+from metadata_utils import MetadataUtils
+from logger_config import setup_logger
+
+logger = setup_logger()
+
+# Payload fields read from Qdrant on reconcile: everything except the heavy "text"
+RECONCILE_EXCLUDE = ["text"]
+
+
+class OfficerManifest:
+    """
+    Local SQLite record of what is indexed in Qdrant, used for change detection:
+    supremo_url → vector_id, per-field payload hashes and last-seen time.
+
+    Loaded once per run (load()) and kept up to date by the pipeline after each
+    successful upsert, so a refresh never has to scroll the whole collection.
+    """
+
+    def __init__(self, path: Path = MANIFEST_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.utils = MetadataUtils()
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS officers (
+                supremo_url  TEXT PRIMARY KEY,
+                vector_id    INTEGER NOT NULL,
+                field_hashes TEXT NOT NULL,
+                last_seen    REAL,
+                updated_at   REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+        self.entries: dict[str, dict] = {}
+
+    def close(self):
+        self.conn.close()
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM officers").fetchone()[0]
+
+    def load(self) -> dict[str, dict]:
+        """
+        Read the whole manifest into memory: supremo_url → {"vector_id", "field_hashes", "last_seen"}.
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT supremo_url, vector_id, field_hashes, last_seen FROM officers"
+            ).fetchall()
+        self.entries = {
+            url: {"vector_id": vector_id, "field_hashes": json.loads(hashes), "last_seen": last_seen}
+            for url, vector_id, hashes, last_seen in rows
+        }
+        logger.info(f"📋 Loaded {len(self.entries)} officers from local manifest")
+        return self.entries
+
+    def get(self, supremo_url: str) -> dict | None:
+        return self.entries.get(supremo_url)
+
+    def record(self, points: list[dict]):
+        """
+        Store or refresh entries for upserted points ({"id", "payload"}).
+        Payload-only updates pass just the changed fields (plus a top-level
+        "supremo_url"); they are merged into the stored hashes.
+        """
+        now = time.time()
+        rows = []
+        for point in points:
+            payload = point["payload"]
+            supremo_url = point.get("supremo_url") or payload.get("supremo_url")
+            if not supremo_url:
+                continue
+            entry = self.entries.get(supremo_url, {"field_hashes": {}})
+            hashes = {**entry["field_hashes"], **self.utils.field_hashes(payload)}
+            self.entries[supremo_url] = {"vector_id": point["id"], "field_hashes": hashes, "last_seen": now}
+            rows.append((supremo_url, point["id"], json.dumps(hashes), now, now))
+
+        with self._lock:
+            self.conn.executemany(
+                """
+                INSERT INTO officers (supremo_url, vector_id, field_hashes, last_seen, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(supremo_url) DO UPDATE SET
+                    vector_id = excluded.vector_id,
+                    field_hashes = excluded.field_hashes,
+                    last_seen = excluded.last_seen,
+                    updated_at = excluded.updated_at
+                """,
+                rows,
+            )
+            self.conn.commit()
+
+    def changed_fields(self, point: dict) -> dict:
+        """
+        The subset of a point's payload whose hash differs from the manifest
+        (the whole payload, minus "text", for unknown officers).
+        """
+        payload = point["payload"]
+        entry = self.entries.get(payload.get("supremo_url"))
+        stored = entry["field_hashes"] if entry else {}
+        current = self.utils.field_hashes(payload)
+        return {k: payload[k] for k, h in current.items() if stored.get(k) != h}
+
+    def touch(self, supremo_urls: list[str]):
+        """
+        Mark officers as seen in the current crawl.
+        """
+        now = time.time()
+        with self._lock:
+            self.conn.executemany(
+                "UPDATE officers SET last_seen = ? WHERE supremo_url = ?",
+                [(now, url) for url in supremo_urls],
+            )
+            self.conn.commit()
+
+    def reconcile(self, qdrant_client: QdrantClient) -> int:
+        """
+        Rebuild the manifest from Qdrant. Uses payload projection so the large
+        "text" field is never transferred.
+        """
+        logger.info("🔄 Reconciling officer manifest from Qdrant...")
+        points_seen = []
+        offset = None
+        while True:
+            points, offset = qdrant_client.scroll(
+                collection_name=QDRANT_COLLECTION_NAME,
+                with_payload=PayloadSelectorExclude(exclude=RECONCILE_EXCLUDE),
+                with_vectors=False,
+                limit=1000,
+                offset=offset,
+            )
+            points_seen.extend({"id": p.id, "payload": p.payload or {}} for p in points)
+            if offset is None:
+                break
+
+        self._backfill_fingerprints(qdrant_client, points_seen)
+
+        with self._lock:
+            self.conn.execute("DELETE FROM officers")
+            self.conn.commit()
+        self.entries = {}
+        self.record(points_seen)
+        logger.info(f"✅ Manifest rebuilt with {len(self.entries)} officers")
+        return len(self.entries)
+
+    def _backfill_fingerprints(self, qdrant_client: QdrantClient, points: list[dict]):
+        """
+        Points written before fingerprinting have no text_hash / meta_hash in their
+        payload. Compute them here (fetching "text" only for those points) so they
+        are not needlessly re-embedded on the next refresh.
+        """
+        legacy = {p["id"]: p for p in points if not p["payload"].get("text_hash")}
+        if not legacy:
+            return
+        logger.info(f"🧮 Backfilling fingerprints for {len(legacy)} points without them")
+        ids = list(legacy)
+        for i in range(0, len(ids), 500):
+            for record in qdrant_client.retrieve(
+                collection_name=QDRANT_COLLECTION_NAME,
+                ids=ids[i:i + 500],
+                with_payload=["text"],
+                with_vectors=False,
+            ):
+                payload = legacy[record.id]["payload"]
+                payload["text_hash"] = self.utils.text_fingerprint((record.payload or {}).get("text", ""))
+                payload.setdefault("meta_hash", self.utils.metadata_fingerprint(payload))
+
+    def ensure_loaded(self, qdrant_client: QdrantClient) -> dict[str, dict]:
+        """
+        Load the manifest, rebuilding it from Qdrant first if it is empty,
+        predates content fingerprints, or the collection was recreated empty.
+        """
+        if self.count() == 0 or qdrant_client.count(QDRANT_COLLECTION_NAME, exact=True).count == 0:
+            self.reconcile(qdrant_client)
+            return self.load()
+        entries = self.load()
+        if any("text_hash" not in e["field_hashes"] for e in entries.values()):
+            self.reconcile(qdrant_client)
+            entries = self.load()
+        return entries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or rebuild the local officer manifest")
+    parser.add_argument("--reconcile", action="store_true", help="Rebuild the manifest from Qdrant")
+    args = parser.parse_args()
+
+    manifest = OfficerManifest()
+    if args.reconcile:
+        manifest.reconcile(QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY))
+    print(f"{manifest.count()} officers in {manifest.path}")
+    manifest.close()
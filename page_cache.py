@@ -0,0 +1,100 @@
+# page_cache.py
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from config import PAGE_CACHE_DIR, PAGE_CACHE_ENABLED
+from logger_config import setup_logger
+
+logger = setup_logger()
+
+
+class PageCache:
+    """
+    On-disk page cache keyed by URL (or URL + form data for POSTs).
+
+    Each entry keeps the ETag / Last-Modified validators, a SHA-256 of the body
+    and the parsed result, so an unchanged page costs neither a full download
+    (when the server honours conditional requests) nor a re-parse. Entries are
+    also keyed by the parser (name / version) that produced the parsed result.
+    """
+
+    def __init__(self, cache_dir: Path = PAGE_CACHE_DIR, enabled: bool = PAGE_CACHE_ENABLED):
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+        if self.enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.stats = {"hits": 0, "not_modified": 0, "misses": 0}
+
+    @staticmethod
+    def body_hash(body: bytes) -> str:
+        return hashlib.sha256(body).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def get(self, key: str, parser: str) -> dict | None:
+        """
+        The entry for `key` if its parsed result came from `parser`. Otherwise
+        None: no conditional headers are sent, so the page is downloaded and
+        parsed again (and put() replaces the entry).
+        """
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"⚠️ Dropping unreadable cache entry for {key}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+        return entry if entry.get("parser") == parser else None
+
+    def conditional_headers(self, entry: dict | None) -> dict:
+        """If-None-Match / If-Modified-Since headers for a GET revalidation."""
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def is_unchanged(self, entry: dict | None, status_code: int, body: bytes) -> bool:
+        """True when the server said 304 or returned a body identical to the cached one."""
+        if not entry:
+            self.stats["misses"] += 1
+            return False
+        if status_code == 304:
+            self.stats["not_modified"] += 1
+            return True
+        if entry.get("hash") == self.body_hash(body):
+            self.stats["hits"] += 1
+            return True
+        self.stats["misses"] += 1
+        return False
+
+    def put(self, key: str, body: bytes, headers, parsed, parser: str) -> None:
+        if not self.enabled:
+            return
+        entry = {
+            "key": key,
+            "parser": parser,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "hash": self.body_hash(body),
+            "parsed": parsed,
+            "stored_at": time.time(),
+        }
+        path = self._path(key)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
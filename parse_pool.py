@@ -0,0 +1,43 @@
+# parse_pool.py
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from config import PARSE_WORKERS
+from logger_config import setup_logger
+
+logger = setup_logger()
+
+
+class ParserPool:
+    """
+    Runs CPU-bound HTML parsing in a process pool so the event loop only does I/O.
+
+    Parse functions must be module-level (picklable) and take/return plain data.
+    With workers=0 the function runs inline on the event loop (useful for debugging).
+    """
+
+    def __init__(self, workers: int = PARSE_WORKERS):
+        self.workers = workers
+        self.executor: ProcessPoolExecutor | None = None
+
+    def open(self):
+        if self.workers > 0 and self.executor is None:
+            # "spawn" avoids forking a process that already holds torch / event-loop threads
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(f"🧵 Started parser pool with {self.workers} worker processes")
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    async def run(self, func, *args):
+        if self.executor is None:
+            return func(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
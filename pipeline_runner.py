@@ -1,168 +1,470 @@
 import asyncio
-import httpx
-import random
 import time
-from tqdm.asyncio import tqdm_asyncio
 
 from fetch_officers import OfficerListFetcher
 from fetch_officer_details import OfficerDetailFetcherAsync
 from embedding_docs import FullPDFEmbedder
+from embedding_batcher import EmbeddingBatcher
+from http_client import HttpClientPool
+from parse_pool import ParserPool
+from page_cache import PageCache
+from officer_manifest import OfficerManifest
+from run_journal import RunJournal
+from rate_limiter import backoff_delay
 from qdrant_client import QdrantClient
-from config import QDRANT_COLLECTION_NAME
+from qdrant_client.http.models import (
+    PointStruct,
+    SetPayload,
+    SetPayloadOperation,
+    PointVectors,
+    UpdateVectors,
+    UpdateVectorsOperation,
+    DeleteVectors,
+    DeleteVectorsOperation,
+)
+from config import (
+    QDRANT_COLLECTION_NAME,
+    REQUEST_CONCURRENCY,
+    FULL_CONTENT_CHECK,
+    UPSERT_BATCH_SIZE,
+    UPSERT_FLUSH_INTERVAL,
+    STAGE_QUEUE_SIZE,
+    LEXICAL_VECTOR,
+    DATA_VERSION_BUMP_INTERVAL,
+)
+from data_version import bump_data_version
 from logger_config import setup_logger
 
 logger = setup_logger()
 
 
-def get_officers_to_update(fetched_officers: list[dict], qdrant_client: QdrantClient) -> list[dict]:
+def get_officers_to_update(fetched_officers: list[dict], manifest: OfficerManifest,
+                           full_content_check: bool = FULL_CONTENT_CHECK) -> list[dict]:
     """
-    Compare freshly fetched officers with what's in Qdrant.
-    Return only new or changed officers.
+    Compare freshly fetched officers with the local manifest of what's in Qdrant.
+    Return new or changed officers; with full_content_check, also every known
+    officer, since new experience / training / award rows only show on the detail page.
     """
-
-    # 1. Scroll through all existing points in Qdrant
-    existing_map = {}
-    offset = None
-
-    while True:
-        points, next_offset = qdrant_client.scroll(
-            collection_name=QDRANT_COLLECTION_NAME,
-            scroll_filter=None,
-            with_payload=True,
-            with_vectors=False,
-            limit=1000,  # safe batch size
-            offset=offset,
-        )
-        for p in points:
-            supremo_url = p.payload.get("supremo_url")
-            current_posting = p.payload.get("current_posting")
-            if supremo_url:
-                existing_map[supremo_url] = current_posting
-
-        if next_offset is None:  # ✅ stop condition
-            break
-        offset = next_offset
-
-    logger.info(f"📋 Loaded {len(existing_map)} existing officers from Qdrant")
-
-    # 2. Compare with freshly fetched
     to_update = []
     for officer in fetched_officers:
-        supremo_url = officer.get("supremo_url")
-        current_posting = officer.get("current_posting")
+        entry = manifest.get(officer.get("supremo_url"))
+        posting_hash = manifest.utils.field_hash(officer.get("current_posting", ""))
 
-        if supremo_url not in existing_map:
+        if entry is None:
+            officer["change"] = "new"
             to_update.append(officer)  # new officer
-        elif existing_map[supremo_url] != current_posting:
+        elif entry["field_hashes"].get("current_posting") != posting_hash:
+            officer["change"] = "posting"
             to_update.append(officer)  # posting changed
+        elif full_content_check:
+            officer["change"] = "recheck"
+            to_update.append(officer)  # detail page may have changed
         # else: unchanged → skip
 
     return to_update
 
 
+def decide_update(point: dict, entry: dict | None) -> str:
+    """
+    Per-officer update decision from the point's fingerprints and its manifest entry:
+    - "embed": new officer (or indexed without section hashes) → embed every section
+    - "sections": the text changed → re-embed only the changed sections (see
+      changed_sections, possibly none) and rewrite the text and its lexical vector
+    - "metadata": same text, different metadata → payload update, vectors reused
+    - "skip": nothing changed
+    """
+    if entry is None:
+        return "embed"
+    hashes = entry["field_hashes"]
+    payload = point["payload"]
+    if hashes.get("text_hash") != payload["text_hash"]:
+        return "sections" if hashes.get("section_hashes") else "embed"
+    if hashes.get("meta_hash") != payload["meta_hash"]:
+        return "metadata"
+    return "skip"
+
+
+def changed_sections(point: dict, entry: dict | None) -> tuple[list[str], list[str]]:
+    """
+    (sections to re-embed, sections that became empty and whose vectors must be deleted).
+    """
+    current = point["payload"]["section_hashes"]
+    stored = (entry or {}).get("field_hashes", {}).get("section_hashes") or {}
+    changed = [section for section, h in current.items() if stored.get(section) != h]
+    removed = [section for section in stored if section not in current]
+    return changed, removed
+
+
 class AsyncPipelineRunner:
-    def __init__(self, qdrant_client: QdrantClient, max_retries: int = 3, concurrency_limit: int = 20):
-        self.list_fetcher = OfficerListFetcher()
-        self.detail_fetcher = OfficerDetailFetcherAsync()
+    def __init__(self, qdrant_client: QdrantClient, max_retries: int = 3, concurrency_limit: int = REQUEST_CONCURRENCY,
+                 dry_run: bool = False):
+        self.http = HttpClientPool()
+        self.parser = ParserPool()
+        self.cache = PageCache()
+        self.list_fetcher = OfficerListFetcher(self.http, self.parser, self.cache)
+        self.detail_fetcher = OfficerDetailFetcherAsync(self.http, self.parser, self.cache)
         self.embedder = FullPDFEmbedder()
+        self.batcher = EmbeddingBatcher(self.embedder.embed_texts)
         self.qdrant = qdrant_client
+        self.manifest = OfficerManifest()
+        self.journal: RunJournal | None = None  # set by CrawlScheduler for crash-safe runs
         self.max_retries = max_retries
-        self.semaphore = asyncio.Semaphore(concurrency_limit)  # ✅ concurrency guard
-
-    async def process_officer(self, officer: dict, cadre_code: str):
-        async with self.semaphore:  # ✅ limit concurrency
-            retries = 0
-            while retries < self.max_retries:
-                try:
-                    officer["scraped_from_cadre"] = cadre_code
-
-                    raw_year = officer.get("allotment_year")
-                    try:
-                        allotment_year = int(raw_year) if raw_year else None
-                    except ValueError:
-                        logger.warning(f"⚠️ Invalid allotment year for {officer['name']}: {raw_year}")
-                        allotment_year = None
-
-                    enriched = {
-                        "name": officer.get("name", ""),
-                        "supremo_url": officer.get("supremo_url", ""),
-                        "identity_no": officer.get("identity_no", ""),
-                        "allotment_year": allotment_year,
-                        "recruitment_source": officer.get("recruitment_source", ""),
-                        "qualification": officer.get("qualification", ""),
-                        "pay_scale": officer.get("pay_scale", ""),
-                        "remarks": officer.get("remarks", ""),
-                        "cadre_domicile": officer.get("cadre_domicile", ""),
-                        "current_posting": officer.get("current_posting", ""),
-                        "scraped_from_cadre": cadre_code,
-                        "personal": {
-                            "name": None,
-                            "identity_no": None,
-                            "cadre": None,
-                            "dob": None,
-                            "gender": None,
-                            "allotment_year": None,
-                            "domicile": None,
-                            "mother_tongue": None,
-                            "languages_known": None,
-                            "retirement_reason": None
-                        },
-                        "education": [], "experience": [],
-                        "training": [], "awards": [],
-                        "deputation": {}
-                    }
-
-                    details = await self.detail_fetcher.fetch_details(officer)
-                    enriched["personal"] = details.get("personal", {})
-                    enriched["education"] = details.get("education", [])
-                    enriched["experience"] = details.get("experience", [])
-                    enriched["training"] = details.get("training", {})
-                    enriched["awards"] = details.get("awards", [])
-                    enriched["deputation"] = details.get("deputation", {})
-
-                    payload = self.embedder.build_vector_payload(enriched)
-
-                    logger.info(f"✅ Prepared vector for {officer['name']} (ID: {payload['id']})")
-                    return payload
-
-                except Exception as e:
-                    retries += 1
-                    logger.warning(f"⚠️ Retry {retries} for officer {officer.get('name')} due to error: {e}")
-                    await asyncio.sleep(0.5 * retries + random.random())
-
-            logger.error(f"❌ Skipped officer {officer.get('name')} after {self.max_retries} retries")
+        self.concurrency_limit = concurrency_limit  # fetch workers; the per-host limiters decide how many are active
+        self.dry_run = dry_run  # list cadres and report what would change, without fetching details or writing
+        self.unpublished_writes = 0  # points written since the data version last moved on
+        self.last_version_bump = float("-inf")
+
+    async def open(self):
+        await self.http.open()
+        self.parser.open()
+        await self.batcher.start()
+        await asyncio.to_thread(self.manifest.ensure_loaded, self.qdrant)  # once per run
+
+    async def close(self):
+        await self.batcher.stop()
+        await self.http.close()
+        await asyncio.to_thread(self.parser.close)
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def build_enriched(self, officer: dict, details: dict, cadre_code: str) -> dict:
+        officer["scraped_from_cadre"] = cadre_code
+
+        raw_year = officer.get("allotment_year")
+        try:
+            allotment_year = int(raw_year) if raw_year else None
+        except ValueError:
+            logger.warning(f"⚠️ Invalid allotment year for {officer['name']}: {raw_year}")
+            allotment_year = None
+
+        return {
+            "name": officer.get("name", ""),
+            "supremo_url": officer.get("supremo_url", ""),
+            "identity_no": officer.get("identity_no", ""),
+            "allotment_year": allotment_year,
+            "recruitment_source": officer.get("recruitment_source", ""),
+            "qualification": officer.get("qualification", ""),
+            "pay_scale": officer.get("pay_scale", ""),
+            "remarks": officer.get("remarks", ""),
+            "cadre_domicile": officer.get("cadre_domicile", ""),
+            "current_posting": officer.get("current_posting", ""),
+            "scraped_from_cadre": cadre_code,
+            "personal": details.get("personal", {}),
+            "education": details.get("education", []),
+            "experience": details.get("experience", []),
+            "training": details.get("training", {}),
+            "awards": details.get("awards", []),
+            "deputation": details.get("deputation", {}),
+        }
+
+    def journal_mark(self, supremo_urls: list[str], cadre_code: str, stage: str):
+        if self.journal is not None:
+            self.journal.mark(supremo_urls, cadre_code, stage)
+
+    # === Pipeline stages: fetch → parse → embed → upsert ===
+    # Each stage handler takes one item and returns the item for the next stage,
+    # or None when the officer is done (skipped) or failed.
+
+    async def fetch_stage(self, officer: dict, progress: dict):
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                page = await self.detail_fetcher.download(officer)  # ✅ paced by the host's AdaptiveLimiter
+                self.journal_mark([officer["supremo_url"]], officer["scraped_from_cadre"], "fetched")
+                return officer, page
+            except Exception as e:
+                logger.warning(f"⚠️ Retry {attempt} for officer {officer.get('name')} due to error: {e}")
+                await asyncio.sleep(backoff_delay(attempt))
+
+        logger.error(f"❌ Skipped officer {officer.get('name')} after {self.max_retries} retries")
+        progress["failed"] = progress.get("failed", 0) + 1
+        if officer.get("supremo_url"):
+            self.journal_mark([officer["supremo_url"]], officer["scraped_from_cadre"], "failed")
+        return None
+
+    async def parse_stage(self, item: tuple, cadre_code: str, progress: dict):
+        officer, page = item
+        try:
+            details, page_changed = await self.detail_fetcher.parse(page)
+            point = self.embedder.build_point(self.build_enriched(officer, details, cadre_code))
+        except Exception as e:
+            logger.error(f"❌ Skipped officer {officer.get('name')}: {e}")
+            progress["failed"] = progress.get("failed", 0) + 1
+            self.journal_mark([officer["supremo_url"]], cadre_code, "failed")
+            return None
+
+        action = decide_update(point, self.manifest.get(officer["supremo_url"]))
+        if action == "skip":
+            progress["processed"] = progress.get("processed", 0) + 1
+            progress["skipped"] = progress.get("skipped", 0) + 1
+            self.journal_mark([officer["supremo_url"]], cadre_code, "skipped")
+            logger.debug(f"[DEBUG] Unchanged: {officer['name']} (page changed: {page_changed})")
+            return None
+        if action == "metadata":
+            logger.info(f"♻️ Metadata-only update for {officer['name']} (ID: {point['id']})")
+        elif action == "sections":
+            logger.info(f"♻️ Section update for {officer['name']} (ID: {point['id']})")
+        self.journal_mark([officer["supremo_url"]], cadre_code, "parsed")
+        return {"action": action, "point": point}
+
+    async def embed_stage(self, item: dict, progress: dict):
+        point = item["point"]
+        sections = point.pop("sections")
+        lexical = point.pop("lexical", None)
+        if item["action"] == "metadata":
+            return item
+        if item["action"] == "sections":
+            names, item["removed"] = changed_sections(point, self.manifest.get(point["payload"]["supremo_url"]))
+        else:
+            names = list(sections)
+        try:
+            vectors = await asyncio.gather(*(self.batcher.embed(sections[name]) for name in names))
+        except Exception as e:
+            logger.error(f"❌ Failed to embed {point['payload'].get('name')}: {e}")
+            progress["failed"] = progress.get("failed", 0) + 1
+            self.journal_mark([point["payload"]["supremo_url"]], point["payload"]["scraped_from_cadre"], "failed")
             return None
+        point["vector"] = dict(zip(names, vectors))
+        if lexical is not None:
+            point["vector"][LEXICAL_VECTOR] = lexical  # text changed, so its term weights did too
+        self.journal_mark([point["payload"]["supremo_url"]], point["payload"]["scraped_from_cadre"], "embedded")
+        logger.info(f"✅ Prepared {len(names)} section vectors for {point['payload'].get('name')} (ID: {point['id']})")
+        return item
+
+    async def flush(self, pending: dict[str, list[dict]], cadre_code: str, progress: dict) -> bool:
+        """
+        Write one batch to Qdrant, per update action: full upserts for new points,
+        section vector updates for partly changed ones and payload patches for
+        metadata-only ones. Returns False if anything failed.
+        """
+        writers = {
+            "embed": (self.upsert_points, "Upserted"),
+            "sections": (self.update_sections, "Updated section vectors of"),
+            "metadata": (self.patch_payloads, "Patched payloads of"),
+        }
+        ok = True
+        for action, items in pending.items():
+            if not items:
+                continue
+            write, label = writers[action]
+            try:
+                await asyncio.to_thread(write, items)
+                self.journal_mark([i["point"]["payload"]["supremo_url"] for i in items], cadre_code, "upserted")
+                progress["upserted"] = progress.get("upserted", 0) + len(items)
+                progress["processed"] = progress.get("processed", 0) + len(items)
+                logger.info(f"✅ {label} {len(items)} points for {cadre_code}")
+                self.note_writes(len(items))
+            except Exception as e:
+                ok = False
+                progress["failed"] = progress.get("failed", 0) + len(items)
+                logger.error(f"❌ Failed to write {len(items)} points ({action}) for {cadre_code}: {e}")
+        return ok
+
+    def note_writes(self, count: int):
+        """
+        Bump the data version after a successful write, at most once every
+        DATA_VERSION_BUMP_INTERVAL seconds; writes left over are published with
+        the run (see refresh_worker.refresh).
+        """
+        self.unpublished_writes += count
+        if time.monotonic() - self.last_version_bump >= DATA_VERSION_BUMP_INTERVAL:
+            bump_data_version(self.unpublished_writes)
+            self.unpublished_writes = 0
+            self.last_version_bump = time.monotonic()
+
+    def upsert_points(self, items: list[dict]):
+        points = [item["point"] for item in items]
+        self.qdrant.upsert(collection_name=QDRANT_COLLECTION_NAME, points=[
+            PointStruct(id=point["id"], vector=point["vector"], payload=point["payload"]) for point in points
+        ])
+        self.manifest.record(points)
+
+    def payload_operations(self, points: list[dict], with_text: bool) -> list:
+        operations = []
+        for point in points:
+            changed = self.manifest.changed_fields(point)
+            if with_text:
+                changed["text"] = point["payload"]["text"]
+            else:
+                changed.pop("text", None)
+            if changed:
+                operations.append(SetPayloadOperation(set_payload=SetPayload(payload=changed, points=[point["id"]])))
+        return operations
+
+    def update_sections(self, items: list[dict]):
+        """
+        Partial re-embedding: replace only the changed section vectors (and the
+        lexical vector), delete the vectors of sections that became empty and set
+        the changed payload fields (including the new text), all in one batch request.
+        """
+        operations = []
+        for item in items:
+            point = item["point"]
+            if point["vector"]:  # empty when only text outside the embedded sections changed
+                operations.append(UpdateVectorsOperation(update_vectors=UpdateVectors(
+                    points=[PointVectors(id=point["id"], vector=point["vector"])]
+                )))
+            if item.get("removed"):
+                operations.append(DeleteVectorsOperation(delete_vectors=DeleteVectors(
+                    points=[point["id"]], vector=item["removed"]
+                )))
+        points = [item["point"] for item in items]
+        operations += self.payload_operations(points, with_text=True)
+        self.qdrant.batch_update_points(collection_name=QDRANT_COLLECTION_NAME, update_operations=operations)
+        self.manifest.record(points)
+
+    def patch_payloads(self, items: list[dict]):
+        """
+        Metadata-only update: set just the changed payload fields of existing points,
+        all in one batch request. Vectors (and the unchanged text) are left untouched.
+        """
+        points = [item["point"] for item in items]
+        operations = self.payload_operations(points, with_text=False)
+        if operations:
+            self.qdrant.batch_update_points(collection_name=QDRANT_COLLECTION_NAME, update_operations=operations)
+        self.manifest.record(points)
+
+    async def upsert_stage(self, inbox: asyncio.Queue, cadre_code: str, progress: dict) -> bool:
+        """
+        Single consumer: flushes to Qdrant when UPSERT_BATCH_SIZE items are pending
+        or the oldest pending item is UPSERT_FLUSH_INTERVAL seconds old.
+        """
+        pending = {"embed": [], "sections": [], "metadata": []}
+        first_pending = None
+        ok = True
+        done = False
+        while not done:
+            timeout = None
+            if first_pending is not None:
+                timeout = max(0.0, UPSERT_FLUSH_INTERVAL - (time.monotonic() - first_pending))
+            try:
+                item = await asyncio.wait_for(inbox.get(), timeout)
+            except asyncio.TimeoutError:
+                item = False
+
+            if item is None:
+                done = True
+            elif item:
+                pending[item["action"]].append(item)
+                first_pending = first_pending or time.monotonic()
+                if sum(map(len, pending.values())) < UPSERT_BATCH_SIZE:
+                    continue
 
-    async def run_for_cadre(self, cadre_code: str):
+            if any(pending.values()):
+                ok = await self.flush(pending, cadre_code, progress) and ok
+                pending = {action: [] for action in pending}
+            first_pending = None
+        return ok
+
+    async def run_stage(self, handler, inbox: asyncio.Queue, outbox: asyncio.Queue, workers: int):
+        """
+        Run `workers` copies of a stage handler until each reads a None sentinel,
+        then pass one sentinel per downstream worker (sent by the caller).
+        """
+        async def worker():
+            while (item := await inbox.get()) is not None:
+                result = await handler(item)
+                if result is not None:
+                    await outbox.put(result)
+
+        await asyncio.gather(*(worker() for _ in range(workers)))
+
+    async def run_for_cadre(self, cadre_code: str, progress: dict | None = None, claimed_urls: set | None = None):
+        """
+        Fetch, embed and upsert new or changed officers of one cadre.
+        - progress: optional counters dict updated in place (see CrawlScheduler).
+        - claimed_urls: supremo_urls already taken by another cadre in this run (or already
+          done in a resumed run); skipped here.
+        """
+        progress = progress if progress is not None else {}
+        progress["status"] = "listing"
         logger.info(f"🚀 Starting async pipeline for cadre: {cadre_code}")
 
-        officer_list = self.list_fetcher.fetch_by_cadre(cadre_code)
+        officer_list, list_changed = await self.list_fetcher.fetch_by_cadre(cadre_code)
+        progress["listed"] = len(officer_list)
+        if not list_changed and not FULL_CONTENT_CHECK and all(
+            self.manifest.get(o.get("supremo_url")) for o in officer_list
+        ):
+            progress["status"] = "unchanged"
+            logger.info(f"✅ Officer list for {cadre_code} unchanged since last crawl. Skipping.")
+            return
+
         logger.info(f"✅ Fetched {len(officer_list)} officers for cadre {cadre_code}")
-        logger.debug(f"[DEBUG] First officer from list: {officer_list[0]}")
+        if officer_list:
+            logger.debug(f"[DEBUG] First officer from list: {officer_list[0]}")
+
+        if claimed_urls is not None:
+            unclaimed = []
+            for officer in officer_list:
+                supremo_url = officer.get("supremo_url")
+                if supremo_url and supremo_url in claimed_urls:
+                    continue
+                if supremo_url:
+                    claimed_urls.add(supremo_url)
+                unclaimed.append(officer)
+            progress["duplicates"] = len(officer_list) - len(unclaimed)
+            officer_list = unclaimed
+
+        if not self.dry_run:
+            self.manifest.touch([o["supremo_url"] for o in officer_list if o.get("supremo_url")])
+        officer_list = get_officers_to_update(officer_list, self.manifest)
+        progress["queued"] = len(officer_list)
+        logger.info(f"🔍 {len(officer_list)} officers need processing (new or changed) in {cadre_code}")
 
-        officer_list = get_officers_to_update(officer_list, self.qdrant)
-        logger.info(f"🔍 {len(officer_list)} officers need processing (new or changed)")
+        if self.dry_run:
+            progress["status"] = "dry-run"
+            changes = {}
+            for officer in officer_list:
+                changes[officer["change"]] = changes.get(officer["change"], 0) + 1
+            logger.info(f"🧪 Dry run for {cadre_code}: would process {changes or 'nothing'}")
+            return
 
         if not officer_list:
-            logger.info("✅ Nothing new to process.")
+            self.list_fetcher.mark_complete(cadre_code)
+            progress["status"] = "done"
+            logger.info(f"✅ Nothing new to process for {cadre_code}.")
             return
 
-        tasks = [self.process_officer(officer, cadre_code) for officer in officer_list]
-        results = await tqdm_asyncio.gather(*tasks, desc="Processing officers")
+        progress["status"] = "processing"
 
-        payloads = [res for res in results if res]
-        logger.info(f"📦 {len(payloads)} vectors ready for upsert. Uploading in batches...")
+        # Bounded queues between stages: a slow stage back-pressures the ones before it,
+        # so memory stays flat regardless of cadre size
+        fetch_q, parse_q, embed_q, upsert_q = (asyncio.Queue(maxsize=STAGE_QUEUE_SIZE) for _ in range(4))
+        fetch_workers = self.concurrency_limit
+        parse_workers = max(1, self.parser.workers)
+        embed_workers = 2 * self.batcher.max_batch_size  # enough waiters to fill a batch
 
-        batch_size = 100
-        for i in range(0, len(payloads), batch_size):
-            batch = payloads[i:i + batch_size]
-            try:
-                self.qdrant.upsert(
-                    collection_name=QDRANT_COLLECTION_NAME,
-                    points=batch
-                )
-                logger.info(f"✅ Upserted batch {i // batch_size + 1} ({len(batch)} vectors)")
-            except Exception as e:
-                logger.error(f"❌ Failed to upsert batch {i // batch_size + 1}: {e}")
+        async def feed():
+            for officer in officer_list:
+                await fetch_q.put(officer)
+            for _ in range(fetch_workers):
+                await fetch_q.put(None)
+
+        async def chain(stage, next_q: asyncio.Queue, next_workers: int):
+            await stage
+            for _ in range(next_workers):
+                await next_q.put(None)
 
-        logger.info(f"🎉 Finished processing and upserting for cadre {cadre_code}")
+        results = await asyncio.gather(
+            feed(),
+            chain(self.run_stage(lambda o: self.fetch_stage(o, progress), fetch_q, parse_q, fetch_workers),
+                  parse_q, parse_workers),
+            chain(self.run_stage(lambda i: self.parse_stage(i, cadre_code, progress), parse_q, embed_q, parse_workers),
+                  embed_q, embed_workers),
+            chain(self.run_stage(lambda i: self.embed_stage(i, progress), embed_q, upsert_q, embed_workers),
+                  upsert_q, 1),
+            self.upsert_stage(upsert_q, cadre_code, progress),
+        )
+        upsert_ok = results[-1]
+
+        if upsert_ok and not progress.get("failed"):
+            self.list_fetcher.mark_complete(cadre_code)
+        progress["status"] = "done"
+        logger.info(
+            f"🎉 Finished {cadre_code}: {progress.get('upserted', 0)} written, "
+            f"{progress.get('skipped', 0)} unchanged, {progress.get('failed', 0)} failed"
+        )
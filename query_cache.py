@@ -0,0 +1,135 @@
+# query_cache.py
+
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from config import (
+    QUERY_CACHE_SIZE, QUERY_CACHE_PERSIST, QUERY_CACHE_PATH, QUERY_CACHE_LOWERCASE, QUERY_CACHE_TOUCH_BATCH,
+)
+from logger_config import setup_logger
+
+logger = setup_logger()
+
+
+def normalize_query(text: str, lowercase: bool = QUERY_CACHE_LOWERCASE) -> str:
+    """NFKC, collapsed whitespace (and lowercase for uncased models): the cache key text."""
+    text = re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text or "")).strip()
+    return text.lower() if lowercase else text
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded LRU cache of query embeddings keyed by (model id, normalized text).
+
+    With persistence on, entries are written through to a SQLite file and the
+    most recently used ones are loaded back at startup, so common queries skip
+    the model even right after a restart. Hits update last_used in batches.
+    """
+
+    def __init__(self, max_entries: int = QUERY_CACHE_SIZE, path: Path | None = QUERY_CACHE_PATH,
+                 persist: bool = QUERY_CACHE_PERSIST):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[tuple[str, str], list[float]] = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self.conn = None
+        self._touched: dict[tuple[str, str], float] = {}  # hits whose last_used is not written yet
+        if persist and path is not None:
+            self._open(Path(path))
+
+    def _open(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS query_embeddings (
+                model     TEXT NOT NULL,
+                text      TEXT NOT NULL,
+                vector    BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text)
+            )
+        """)
+        self.conn.commit()
+        rows = self.conn.execute(
+            "SELECT model, text, vector FROM query_embeddings ORDER BY last_used DESC LIMIT ?",
+            (self.max_entries,),
+        ).fetchall()
+        for model, text, blob in reversed(rows):  # oldest first, so LRU order is preserved
+            self.entries[(model, text)] = np.frombuffer(blob, dtype=np.float32).tolist()
+        if rows:
+            logger.info(f"📦 Loaded {len(rows)} cached query embeddings from {path}")
+
+    def _flush_touched(self):
+        """Write the buffered hit times (caller holds the lock and commits)."""
+        if self._touched:
+            self.conn.executemany("UPDATE query_embeddings SET last_used = ? WHERE model = ? AND text = ?",
+                                  [(used, *key) for key, used in self._touched.items()])
+            self._touched.clear()
+
+    def close(self):
+        if self.conn is not None:
+            with self._lock:
+                self._flush_touched()
+                self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    def get(self, model_id: str, text: str) -> list[float] | None:
+        key = (model_id, normalize_query(text))
+        with self._lock:
+            vector = self.entries.get(key)
+            if vector is None:
+                self.stats["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            if self.conn is not None:
+                self._touched[key] = time.time()
+                if len(self._touched) >= QUERY_CACHE_TOUCH_BATCH:
+                    self._flush_touched()
+                    self.conn.commit()
+            return vector
+
+    def put(self, model_id: str, text: str, vector: list[float]):
+        key = (model_id, normalize_query(text))
+        with self._lock:
+            self.entries[key] = vector
+            self.entries.move_to_end(key)
+            evicted = []
+            while len(self.entries) > self.max_entries:
+                evicted.append(self.entries.popitem(last=False)[0])
+            self.stats["evictions"] += len(evicted)
+            if self.conn is not None:
+                self._touched.pop(key, None)  # superseded by the insert below
+                self._flush_touched()
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO query_embeddings (model, text, vector, last_used) VALUES (?, ?, ?, ?)",
+                    (*key, np.asarray(vector, dtype=np.float32).tobytes(), time.time()),
+                )
+                self.conn.executemany("DELETE FROM query_embeddings WHERE model = ? AND text = ?", evicted)
+                self.conn.commit()
+
+    def get_many(self, model_id: str, texts: list[str], embed) -> list[list[float]]:
+        """
+        Vectors for `texts`, calling embed(missing_texts) once for the cache misses
+        (duplicates after normalization are embedded once).
+        """
+        vectors = [self.get(model_id, text) for text in texts]
+        pending: dict[str, str] = {}  # normalized → first original text
+        for text, vector in zip(texts, vectors):
+            if vector is None:
+                pending.setdefault(normalize_query(text), text)
+        if pending:
+            computed = dict(zip(pending, embed(list(pending.values()))))
+            for key, vector in computed.items():
+                self.put(model_id, key, vector)
+            vectors = [v if v is not None else computed[normalize_query(t)] for t, v in zip(texts, vectors)]
+        return vectors
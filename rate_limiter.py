@@ -0,0 +1,202 @@
+# rate_limiter.py
+
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+
+from config import (
+    RATE_INITIAL_CONCURRENCY,
+    RATE_MIN_CONCURRENCY,
+    RATE_MAX_CONCURRENCY,
+    RATE_INCREASE_STEP,
+    RATE_DECREASE_FACTOR,
+    RATE_LATENCY_TARGET,
+    RATE_MAX_RETRY_AFTER,
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_MAX,
+)
+from logger_config import setup_logger
+
+logger = setup_logger()
+
+# Status codes that mean "the server is overloaded": back off
+THROTTLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or HTTP-date).
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float = RETRY_BACKOFF_BASE, cap: float = RETRY_BACKOFF_MAX) -> float:
+    """
+    Exponential backoff with full jitter for retry number `attempt` (1-based).
+    """
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for one host.
+
+    The window grows by `increase_step` per window's worth of healthy responses
+    (fast and not throttled) and is multiplied by `decrease_factor` on a timeout,
+    429 or 5xx; at most once per observed round trip, so a burst of failures
+    from the same overload only counts once. A Retry-After header pauses new
+    requests to the host until it expires.
+    """
+
+    def __init__(self, host: str, initial: float = RATE_INITIAL_CONCURRENCY,
+                 minimum: float = RATE_MIN_CONCURRENCY, maximum: float = RATE_MAX_CONCURRENCY,
+                 increase_step: float = RATE_INCREASE_STEP, decrease_factor: float = RATE_DECREASE_FACTOR,
+                 latency_target: float = RATE_LATENCY_TARGET):
+        self.host = host
+        self.window = float(initial)
+        self.minimum = float(minimum)
+        self.maximum = float(maximum)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self.latency_ewma: float | None = None
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.recent = deque(maxlen=100)  # True = healthy outcome
+        self.stats = {"requests": 0, "errors": 0, "throttled": 0, "decreases": 0, "retry_after_waits": 0}
+        self._cond: asyncio.Condition | None = None
+
+    def _condition(self) -> asyncio.Condition:
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    async def acquire(self):
+        cond = self._condition()
+        while True:
+            pause = self.paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)  # Retry-After: nobody talks to the host until it expires
+                continue
+            async with cond:
+                if self.paused_until > time.monotonic():
+                    continue
+                if self.in_flight < max(1, int(self.window)):
+                    self.in_flight += 1
+                    self.stats["requests"] += 1
+                    return
+                await cond.wait()
+
+    async def abandon(self, sent: bool = False):
+        """
+        Give back a slot without recording an outcome: its request was never sent,
+        or (sent=True) was cancelled before the response, which says nothing about
+        the host's health.
+        """
+        cond = self._condition()
+        async with cond:
+            self.in_flight -= 1
+            if not sent:
+                self.stats["requests"] -= 1
+            cond.notify_all()
+
+    async def release(self, latency: float, throttled: bool = False, error: bool = False,
+                      retry_after: float | None = None):
+        cond = self._condition()
+        async with cond:
+            self.in_flight -= 1
+            self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+            now = time.monotonic()
+            healthy = not (throttled or error)
+            self.recent.append(healthy)
+
+            if throttled:
+                self.stats["throttled"] += 1
+            if error:
+                self.stats["errors"] += 1
+            if retry_after:
+                self.stats["retry_after_waits"] += 1
+                self.paused_until = max(self.paused_until, now + min(retry_after, RATE_MAX_RETRY_AFTER))
+                logger.warning(f"⏳ {self.host} asked to retry after {retry_after:.0f}s. Pausing requests.")
+
+            if not healthy:
+                if now - self.last_decrease >= (self.latency_ewma or 0.0):
+                    old = self.window
+                    self.window = max(self.minimum, self.window * self.decrease_factor)
+                    self.last_decrease = now
+                    self.stats["decreases"] += 1
+                    logger.info(f"📉 {self.host}: concurrency {old:.1f} → {self.window:.1f}")
+            elif latency <= self.latency_target:
+                self.window = min(self.maximum, self.window + self.increase_step / max(1.0, self.window))
+            # Healthy but slow: hold the window, the server is near its limit
+            cond.notify_all()
+
+    @asynccontextmanager
+    async def slot(self, budget: asyncio.Semaphore | None = None):
+        """
+        Hold one request slot; the caller reports the outcome via the yielded dict
+        ({"throttled", "retry_after"}). Exceptions count as errors; a cancellation
+        records no outcome at all.
+        budget: optional semaphore shared across hosts, taken after the host slot
+        (a paused host holds none of it) and not counted in the host's latency.
+        """
+        await self.acquire()
+        try:
+            if budget is not None:
+                await budget.acquire()
+        except BaseException:
+            await self.abandon()
+            raise
+        outcome = {"throttled": False, "retry_after": None}
+        error = cancelled = False
+        start = time.monotonic()
+        try:
+            yield outcome
+        except Exception:
+            error = True
+            raise
+        except BaseException:  # CancelledError: neither healthy nor an error
+            cancelled = True
+            raise
+        finally:
+            if budget is not None:
+                budget.release()
+            if cancelled:
+                await self.abandon(sent=True)
+            else:
+                await self.release(time.monotonic() - start, throttled=outcome["throttled"], error=error,
+                                   retry_after=outcome["retry_after"])
+
+    def snapshot(self) -> dict:
+        return {
+            "host": self.host,
+            "window": round(self.window, 2),
+            "in_flight": self.in_flight,
+            "latency_ewma": round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+            "error_rate": round(1 - sum(self.recent) / len(self.recent), 3) if self.recent else 0.0,
+            "paused_for": round(max(0.0, self.paused_until - time.monotonic()), 1),
+            **self.stats,
+        }
+
+    def format_snapshot(self) -> str:
+        s = self.snapshot()
+        latency = f"{s['latency_ewma']:.2f}s" if s["latency_ewma"] is not None else "n/a"
+        line = (
+            f"{s['host']}: window {s['window']:.1f} ({s['in_flight']} in flight) | latency {latency} | "
+            f"errors {s['error_rate']:.0%} | {s['requests']} requests, {s['decreases']} backoffs"
+        )
+        if s["paused_for"]:
+            line += f" | paused {s['paused_for']:.0f}s"
+        return line
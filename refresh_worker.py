@@ -0,0 +1,97 @@
+# refresh_worker.py
+#
+# Standalone ingestion entry point: crawls the civil list, embeds new or changed
+# officers into Qdrant and publishes a data-version marker for the chat app.
+#
+#   python refresh_worker.py                          # refresh every cadre once
+#   python refresh_worker.py --cadres GJ,BH --dry-run # report what would change
+#   python refresh_worker.py --resume                 # continue an interrupted run
+#   python refresh_worker.py --interval 86400         # keep running, refresh daily
+
+import argparse
+import asyncio
+import time
+
+from qdrant_client import QdrantClient
+
+from collection_schema import ensure_collection
+from config import validate_config, STATE_CODES, QDRANT_URL, QDRANT_API_KEY, REFRESH_INTERVAL, LOCAL_REPLICA_ENABLED
+from crawl_scheduler import CrawlScheduler
+from data_version import publish_data_version
+from local_replica import LocalReplica
+from pipeline_runner import AsyncPipelineRunner
+from logger_config import setup_logger
+
+logger = setup_logger()
+
+
+def parse_cadres(value: str | None) -> list[str] | None:
+    if not value:
+        return None
+    cadres = [code.strip().upper() for code in value.split(",") if code.strip()]
+    unknown = [code for code in cadres if code not in STATE_CODES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unknown cadre codes: {', '.join(unknown)} (see STATE_CODES)")
+    return cadres
+
+
+async def refresh(scheduler: CrawlScheduler, cadres: list[str] | None, resume: bool) -> dict[str, dict]:
+    progress = await scheduler.run(cadres, resume=resume)
+    if not scheduler.runner.dry_run:
+        # Points written mid-run already moved the version on; bump again only for the remainder
+        marker = publish_data_version(progress, bump=scheduler.runner.unpublished_writes > 0)
+        scheduler.runner.unpublished_writes = 0
+        replica = LocalReplica()
+        pointer = replica.read_pointer()
+        if LOCAL_REPLICA_ENABLED and (not pointer or pointer["version"] != marker["version"]):
+            await asyncio.to_thread(replica.sync, scheduler.runner.qdrant)
+    return progress
+
+
+async def run_worker(cadres: list[str] | None, dry_run: bool, resume: bool, interval: int):
+    runner = AsyncPipelineRunner(QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY), dry_run=dry_run)
+    scheduler = CrawlScheduler(runner)
+    while True:
+        started = time.monotonic()
+        try:
+            await refresh(scheduler, cadres, resume)
+            resume = False
+        except Exception as e:
+            if not interval:
+                raise
+            logger.error(f"❌ Refresh failed: {e}")
+            resume = True  # the next cycle picks up where this one stopped
+        if not interval:
+            return
+        delay = max(0.0, interval - (time.monotonic() - started))
+        logger.info(f"💤 Next refresh in {delay / 60:.0f} min")
+        await asyncio.sleep(delay)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the IAS officer collection in Qdrant")
+    parser.add_argument("--cadres", type=parse_cadres, help="Comma-separated cadre codes (default: all)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="List cadres and report what would change, without fetching details or writing")
+    parser.add_argument("--resume", action="store_true", help="Continue the latest unfinished run")
+    parser.add_argument("--recreate-collection", action="store_true",
+                        help="Drop and recreate the collection with the current vector layout, then re-ingest")
+    parser.add_argument("--skip-migrations", action="store_true",
+                        help="Only check the collection schema, e.g. when 'collection_schema.py --apply' already ran")
+    parser.add_argument("--interval", type=int, default=REFRESH_INTERVAL,
+                        help="Seconds between refreshes; 0 runs once and exits (default: REFRESH_INTERVAL)")
+    args = parser.parse_args()
+
+    if args.recreate_collection and args.dry_run:
+        parser.error("--recreate-collection cannot be combined with --dry-run")
+    if args.recreate_collection and args.skip_migrations:
+        parser.error("--recreate-collection cannot be combined with --skip-migrations")
+    validate_config()
+    # A dry run writes nothing, schema migrations included: pending ones are only listed
+    ensure_collection(QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY), recreate=args.recreate_collection,
+                      apply=not (args.dry_run or args.skip_migrations))
+    asyncio.run(run_worker(args.cadres, args.dry_run, args.resume, args.interval))
+
+
+if __name__ == "__main__":
+    main()
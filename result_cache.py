@@ -0,0 +1,100 @@
+# result_cache.py
+
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from config import RESULT_CACHE_SIZE, RESULT_CACHE_TTL
+from data_version import current_data_version
+from query_cache import normalize_query
+from logger_config import setup_logger
+
+logger = setup_logger()
+
+# Tiers whose results depend on what is indexed; intent only depends on the question
+DATA_TIERS = ("retrieval", "answer")
+TIERS = ("intent",) + DATA_TIERS
+
+
+def canonical_filters(filters: dict | None) -> str:
+    """Filters as a stable string: None values dropped, keys sorted."""
+    return json.dumps({k: v for k, v in (filters or {}).items() if v is not None}, sort_keys=True, default=str)
+
+
+class ResultCache:
+    """
+    Exact-key caches for the chat workflow: intent (check_role_intent output),
+    retrieval (semantic_search results) and answer (reasoning output).
+
+    Keys are built from normalized text and canonical filters. Retrieval and
+    answer entries are tagged with the ingestion data version and dropped as
+    soon as the refresh worker publishes a new one. Per tier, hits, misses and
+    the compute time saved by hits are counted.
+    """
+
+    def __init__(self, max_entries: int = RESULT_CACHE_SIZE, ttl: float = RESULT_CACHE_TTL,
+                 data_version: Callable[[], int] = current_data_version):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.data_version = data_version
+        self.tiers: dict[str, OrderedDict] = {tier: OrderedDict() for tier in TIERS}
+        self.stats = {tier: {"hits": 0, "misses": 0, "saved_seconds": 0.0} for tier in TIERS}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """Cache key from strings (normalized), lists of strings and other JSON values."""
+        def norm(part):
+            if isinstance(part, str):
+                return normalize_query(part)
+            if isinstance(part, (list, tuple)):
+                return [norm(p) for p in part]
+            return part
+        return json.dumps([norm(p) for p in parts], sort_keys=True, default=str)
+
+    def get_or_compute(self, tier: str, key: str, compute: Callable[[], object]):
+        """
+        Return the cached value for (tier, key), or compute it, store it and return it.
+        """
+        version = self.data_version() if tier in DATA_TIERS else None
+        now = time.time()
+        entries = self.tiers[tier]
+        with self._lock:
+            entry = entries.get(key)
+            if entry and entry["version"] == version and now - entry["stored_at"] < self.ttl:
+                entries.move_to_end(key)
+                self.stats[tier]["hits"] += 1
+                self.stats[tier]["saved_seconds"] += entry["seconds"]
+                logger.info(f"💾 {tier} cache hit (saved {entry['seconds']:.1f}s)")
+                return copy.deepcopy(entry["value"])
+            if entry:
+                del entries[key]  # stale: older data version or expired
+            self.stats[tier]["misses"] += 1
+
+        start = time.perf_counter()
+        value = compute()
+        seconds = time.perf_counter() - start
+
+        with self._lock:
+            entries[key] = {"value": copy.deepcopy(value), "version": version, "stored_at": now, "seconds": seconds}
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+        return value
+
+    def report(self) -> dict[str, dict]:
+        """Per tier: hits, misses, hit_rate, saved_seconds."""
+        report = {}
+        for tier, s in self.stats.items():
+            lookups = s["hits"] + s["misses"]
+            report[tier] = {**s, "hit_rate": s["hits"] / lookups if lookups else 0.0}
+        return report
+
+    def format_report(self) -> str:
+        return " | ".join(
+            f"{tier}: {r['hit_rate']:.0%} of {r['hits'] + r['misses']} ({r['saved_seconds']:.1f}s saved)"
+            for tier, r in self.report().items()
+        )
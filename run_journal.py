@@ -0,0 +1,149 @@
+# run_journal.py
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from config import JOURNAL_PATH
+from logger_config import setup_logger
+
+logger = setup_logger()
+
+# Officer stages in pipeline order; "skipped" (unchanged) and "upserted" are terminal
+OFFICER_STAGES = ("fetched", "parsed", "embedded", "upserted", "skipped", "failed")
+DONE_STAGES = ("upserted", "skipped")
+
+
+class RunJournal:
+    """
+    Durable SQLite journal of ingestion runs: per-officer stage completion and
+    per-cadre progress. If the process dies mid-run, the next run can resume
+    the unfinished run and redo only officers that never reached a done stage.
+    """
+
+    def __init__(self, path: Path = JOURNAL_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+                cadres      TEXT NOT NULL,
+                started_at  REAL NOT NULL,
+                finished_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS cadre_progress (
+                run_id     INTEGER NOT NULL,
+                cadre      TEXT NOT NULL,
+                status     TEXT NOT NULL,
+                progress   TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (run_id, cadre)
+            );
+            CREATE TABLE IF NOT EXISTS officer_stages (
+                run_id      INTEGER NOT NULL,
+                supremo_url TEXT NOT NULL,
+                cadre       TEXT NOT NULL,
+                stage       TEXT NOT NULL,
+                updated_at  REAL NOT NULL,
+                PRIMARY KEY (run_id, supremo_url)
+            );
+        """)
+        self.conn.commit()
+        self.run_id: int | None = None
+
+    def close(self):
+        self.conn.close()
+
+    def _write(self, sql: str, rows: list[tuple]):
+        with self._lock:
+            self.conn.executemany(sql, rows)
+            self.conn.commit()
+
+    # --- Runs ---
+
+    def start_run(self, cadres: list[str]) -> int:
+        with self._lock:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (cadres, started_at) VALUES (?, ?)", (json.dumps(cadres), time.time())
+            )
+            self.conn.commit()
+        self.run_id = cursor.lastrowid
+        logger.info(f"📓 Started run #{self.run_id} for {len(cadres)} cadres")
+        return self.run_id
+
+    def resume_run(self) -> list[str] | None:
+        """
+        Re-open the latest unfinished run. Returns its cadres, or None if every run finished.
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT run_id, cadres FROM runs WHERE finished_at IS NULL ORDER BY run_id DESC LIMIT 1"
+            ).fetchone()
+        if row is None:
+            return None
+        self.run_id = row[0]
+        logger.info(f"📓 Resuming run #{self.run_id}")
+        return json.loads(row[1])
+
+    def finish_run(self):
+        self._write("UPDATE runs SET finished_at = ? WHERE run_id = ?", [(time.time(), self.run_id)])
+        logger.info(f"📓 Run #{self.run_id} finished")
+
+    # --- Cadres ---
+
+    def set_cadre(self, cadre: str, progress: dict):
+        self._write(
+            """
+            INSERT INTO cadre_progress (run_id, cadre, status, progress, updated_at) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(run_id, cadre) DO UPDATE SET
+                status = excluded.status, progress = excluded.progress, updated_at = excluded.updated_at
+            """,
+            [(self.run_id, cadre, progress.get("status", ""), json.dumps(progress, default=str), time.time())],
+        )
+
+    def finished_cadres(self) -> set[str]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT cadre FROM cadre_progress WHERE run_id = ? AND status IN ('done', 'unchanged')",
+                (self.run_id,),
+            ).fetchall()
+        return {cadre for (cadre,) in rows}
+
+    # --- Officers ---
+
+    def mark(self, supremo_urls: list[str], cadre: str, stage: str):
+        if self.run_id is None or not supremo_urls:
+            return
+        now = time.time()
+        self._write(
+            """
+            INSERT INTO officer_stages (run_id, supremo_url, cadre, stage, updated_at) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(run_id, supremo_url) DO UPDATE SET stage = excluded.stage, updated_at = excluded.updated_at
+            """,
+            [(self.run_id, url, cadre, stage, now) for url in supremo_urls],
+        )
+
+    def done_officers(self) -> set[str]:
+        """
+        supremo_urls that already reached a done stage in this run (any cadre).
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT supremo_url FROM officer_stages WHERE run_id = ? "
+                f"AND stage IN ({', '.join('?' for _ in DONE_STAGES)})",
+                (self.run_id, *DONE_STAGES),
+            ).fetchall()
+        return {url for (url,) in rows}
+
+    def stage_counts(self) -> dict[str, int]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT stage, COUNT(*) FROM officer_stages WHERE run_id = ? GROUP BY stage", (self.run_id,)
+            ).fetchall()
+        return dict(rows)
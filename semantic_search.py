@@ -4,9 +4,17 @@ from qdrant_client.http.models import (
     FieldCondition,
     MatchValue,
     Range,
+    QueryRequest,
 )
 from qdrant_client import QdrantClient
 from embedding import get_embedding_model
+from collection_schema import search_params
+from config import (
+    EMBEDDING_SECTIONS, SECTION_SUPPORT_WEIGHT, PAYLOAD_PROFILES, LOCAL_REPLICA_ENABLED,
+    HYBRID_SEARCH, HYBRID_CANDIDATES, LEXICAL_VECTOR, TITLE_LEVELS,
+)
+from lexical_index import sparse_query, rrf_fuse
+from local_replica import LocalReplica
 import os
 from dotenv import load_dotenv
 from typing import Union, List, Dict, Any
@@ -14,15 +22,7 @@ from rapidfuzz import process
 
 load_dotenv(dotenv_path="QDRANT.env")
 
-TITLES = {
-    "Junior Scale" : 1,
-    "Under Secretary": 2,
-    "Deputy Secretary" : 3,
-    "Director" : 4,
-    "Joint Secretary": 5,
-    "Additional Secretary": 6,
-    "Secretary": 7,
-}
+TITLES = TITLE_LEVELS
 
 from rapidfuzz import fuzz
 
@@ -58,6 +58,18 @@ ALLOTMENT_YEAR_MAPPING = {
     "from": lambda year: Range(gte=float(year)),
     "after": lambda year: Range(gt=float(year))
 }
+
+
+def parse_year(value) -> int | None:
+    """An allotment year as an int (2005, "2005", 2005.0), or None if value is not one."""
+    if isinstance(value, bool):
+        return None
+    try:
+        year = float(str(value).strip())
+    except ValueError:
+        return None
+    return int(year) if year.is_integer() else None
+
 load_dotenv(dotenv_path="QDRANT.env")
 QDRANT_CLOUD_URL = os.getenv("QDRANT_CLOUD_URL")
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
@@ -67,6 +79,124 @@ client = QdrantClient(
     api_key=QDRANT_API_KEY
 )
 EMBEDDING_FUNC = get_embedding_model()
+replica = LocalReplica() if LOCAL_REPLICA_ENABLED else None
+
+
+def aggregate_section_hits(responses, sections=EMBEDDING_SECTIONS, limit: int = 5,
+                           support_weight: float = SECTION_SUPPORT_WEIGHT) -> list[dict]:
+    """
+    Merge per-section search results into one ranking per officer: the best
+    section score, plus support_weight × the scores of the other matching sections.
+    """
+    officers = {}
+    for section, response in zip(sections, responses):
+        for hit in response.points:
+            entry = officers.setdefault(hit.id, {"payload": hit.payload, "scores": {}})
+            entry["scores"][section] = hit.score
+
+    ranked = []
+    for hit_id, entry in officers.items():
+        scores = entry["scores"]
+        best = max(scores.values())
+        officer = dict(entry["payload"])
+        officer["_id"] = hit_id
+        officer["_vector_score"] = best + support_weight * (sum(scores.values()) - best)
+        officer["_section_scores"] = scores
+        ranked.append(officer)
+    ranked.sort(key=lambda o: o["_vector_score"], reverse=True)
+    return ranked[:limit]
+
+
+def lexical_hits(response) -> list[dict]:
+    """Officers of one sparse (BM25) search, best first."""
+    return [{**hit.payload, "_id": hit.id, "_lexical_score": hit.score} for hit in response.points]
+
+
+def search_queries(queries: List[str], qdrant_filter: Filter | None, limit: int) -> List[List[dict]]:
+    """
+    Search several queries at once: one batched model call for all query
+    embeddings and one search of all queries × sections, served by the local
+    replica when it is current, else by one Qdrant round trip. With HYBRID_SEARCH
+    the BM25 searches ride along (on the replica too, when it holds the lexical
+    vectors) and each query's dense and lexical rankings are merged by reciprocal
+    rank fusion.
+    Returns the per-officer ranking of each query, in query order.
+    """
+    query_vectors = EMBEDDING_FUNC.embed_queries(queries)  # cached; misses encoded in one batch
+    candidates = max(limit, HYBRID_CANDIDATES) if HYBRID_SEARCH else limit
+    sparse = {i: sparse_query(q) for i, q in enumerate(queries)} if HYBRID_SEARCH else {}
+    sparse = {i: vector for i, vector in sparse.items() if vector.indices}  # nothing to match on otherwise
+    lexical_requests = [
+        QueryRequest(
+            query=vector,
+            using=LEXICAL_VECTOR,
+            filter=qdrant_filter,
+            limit=candidates,
+            with_payload=PAYLOAD_PROFILES["list"],
+            with_vector=False,
+        )
+        for vector in sparse.values()
+    ]
+
+    dense = replica.search(query_vectors, qdrant_filter, candidates) if replica else None
+    lexical = None
+    if dense is not None and sparse:
+        lexical = replica.lexical_search(list(sparse.values()), qdrant_filter, candidates)
+    if dense is None:
+        dense_requests = [
+            QueryRequest(
+                query=query_vector,
+                using=section,  # one named vector per officer section
+                filter=qdrant_filter,
+                limit=candidates,
+                params=search_params(),  # rescoring when the collection is quantized
+                with_payload=PAYLOAD_PROFILES["list"],  # heavier fields only for the final shortlist
+                with_vector=False,
+            )
+            for query_vector in query_vectors
+            for section in EMBEDDING_SECTIONS
+        ]
+        responses = client.query_batch_points(collection_name=COLLECTION_NAME,
+                                              requests=dense_requests + lexical_requests)
+        dense, lexical = responses[:len(dense_requests)], responses[len(dense_requests):]
+    elif lexical is None and lexical_requests:
+        # Replica synced without lexical vectors: only the BM25 half goes to Qdrant
+        lexical = client.query_batch_points(collection_name=COLLECTION_NAME, requests=lexical_requests)
+    elif lexical is None:
+        lexical = []
+    lexical = dict(zip(sparse, lexical))
+
+    n_sections = len(EMBEDDING_SECTIONS)
+    rankings = []
+    for i in range(len(queries)):
+        ranked = aggregate_section_hits(dense[i * n_sections:(i + 1) * n_sections], limit=candidates)
+        if HYBRID_SEARCH:
+            ranked = rrf_fuse([ranked, lexical_hits(lexical[i]) if i in lexical else []])
+        rankings.append(ranked[:limit])
+    return rankings
+
+
+def fetch_shortlist(officers: List[dict], profile: str = "card") -> List[dict]:
+    """
+    Load the `profile` payload of the final shortlist in one batched retrieve by
+    point id, keeping order and the "_"-prefixed scores. Entries without an "_id"
+    (e.g. web results) are passed through unchanged.
+    """
+    ids = [o["_id"] for o in officers if isinstance(o, dict) and o.get("_id") is not None]
+    if not ids:
+        return officers
+    records = client.retrieve(
+        collection_name=COLLECTION_NAME, ids=ids, with_payload=PAYLOAD_PROFILES[profile], with_vectors=False
+    )
+    payloads = {record.id: record.payload or {} for record in records}
+    shortlist = []
+    for officer in officers:
+        if isinstance(officer, dict) and officer.get("_id") in payloads:
+            extras = {k: v for k, v in officer.items() if k.startswith("_")}
+            officer = {**officer, **payloads[officer["_id"]], **extras}
+        shortlist.append(officer)
+    return shortlist
+
 
 @tool
 def semantic_search(
@@ -79,7 +209,8 @@ def semantic_search(
     - query: Single or list of semantic queries.
     - top_k: Number of top results to return (default is 5).
     - current_title: The current title to filter the search.
-    Returns: List of deduplicated officer payloads with _vector_score field.
+    Returns: List of deduplicated officer payloads ("list" profile) with _id and _vector_score fields
+    (plus _lexical_score / _fused_score with hybrid search).
     """
 
     if not filters or "current_title" not in filters:
@@ -107,15 +238,22 @@ def semantic_search(
 
         for key, value in fdict.items():
             if key == "allotment_year" and value is not None:
+                # The LLM extracts the year as free text: without a whole-number year there is no year filter
                 if isinstance(value, dict):
                     op = value.get("operator")
-                    val = value.get("value")
-                    if op in ALLOTMENT_YEAR_MAPPING and val is not None:
+                    year = parse_year(value.get("value"))
+                    if op in ALLOTMENT_YEAR_MAPPING and year is not None:
                         must_conditions.append(
-                            FieldCondition(key=key, range=ALLOTMENT_YEAR_MAPPING[op](float(val)))
+                            FieldCondition(key=key, range=ALLOTMENT_YEAR_MAPPING[op](year))
                         )
+                    elif value.get("value") is not None:
+                        print(f"Skipping allotment_year filter: {value.get('value')!r} is not a year")
                 else:
-                    must_conditions.append(FieldCondition(key=key, match=MatchValue(value=value)))
+                    year = parse_year(value)
+                    if year is not None:
+                        must_conditions.append(FieldCondition(key=key, match=MatchValue(value=year)))
+                    else:
+                        print(f"Skipping allotment_year filter: {value!r} is not a year")
 
             elif key == "gender" and value is not None:
                 must_conditions.append(FieldCondition(key="gender", match=MatchValue(value=value)))
@@ -147,21 +285,8 @@ def semantic_search(
     seen = set()
     combined_results = []
 
-    for q in queries:
-        query_vector = EMBEDDING_FUNC.embed_query(q)
-
-        hits = client.search(
-            collection_name=COLLECTION_NAME,
-            query_vector=query_vector,
-            limit=min(k, 5),
-            with_payload=True,
-            with_vectors=False,
-            query_filter=qdrant_filter
-        )
-
-        for hit in hits:
-            officer = hit.payload
-            officer["_vector_score"] = hit.score
+    for ranked in search_queries(queries, qdrant_filter, limit=min(k, 5)):
+        for officer in ranked:
             identity = (
                 officer.get("officer_name", ""),
                 officer.get("cadre", ""),
@@ -0,0 +1,12 @@
+# tests/conftest.py
+#
+# The app modules live at the repository root; make them importable from tests/.
+# Module-level caches (e.g. semantic_search's query embedding cache) stay in
+# memory instead of writing to the repository's cache/ directory.
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("QUERY_CACHE_PERSIST", "false")
@@ -0,0 +1,31 @@
+# tests/test_check_role.py
+#
+# Title inference for the LLM-free intent path: titles come from config.TITLE_LEVELS.
+
+import os
+
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("openai")
+os.environ.setdefault("GITHUB_TOKEN", "test")  # read at import; no request is made
+
+from check_role import infer_title, lexical_intent
+from config import TITLE_LEVELS
+
+
+@pytest.mark.parametrize("title", TITLE_LEVELS)
+def test_every_configured_title_is_inferred(title):
+    assert infer_title(f"recommend officers for {title.lower()} in MeitY") == title
+
+
+def test_longest_title_wins():
+    assert infer_title("Additional Secretary, Finance") == "Additional Secretary"
+    assert infer_title("a secretaryship") is None
+
+
+def test_lexical_intent_needs_anchor_and_title():
+    intent = lexical_intent("Joint Secretary in MeitY with B.Tech")
+    assert intent["current_title"] == "Joint Secretary" and intent["queries"] == ["Joint Secretary in MeitY with B.Tech"]
+    assert lexical_intent("Joint Secretary with digital experience") is None
+    assert lexical_intent("officers from MeitY") is None
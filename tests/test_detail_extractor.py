@@ -0,0 +1,63 @@
+# tests/test_detail_extractor.py
+#
+# Parity of the lxml ER-sheet extractor with the BeautifulSoup reference parser,
+# field by field, on the sanitized pages in fixtures/er_sheets.
+
+from pathlib import Path
+
+import pytest
+
+from detail_extractor import extract_officer_details, _lines
+from fetch_officer_details import parse_officer_details_bs4
+
+FIXTURES = sorted((Path(__file__).parent / "fixtures" / "er_sheets").glob("*.html"))
+
+
+def flatten(value, path=()):
+    """(path, leaf) pairs of a nested dict / list, so a mismatch names the field."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from flatten(item, path + (key,))
+    elif isinstance(value, list) and value and isinstance(value[0], (dict, list)):
+        for i, item in enumerate(value):
+            yield from flatten(item, path + (i,))
+    else:
+        yield path, value
+
+
+@pytest.mark.parametrize("page", FIXTURES, ids=lambda page: page.stem)
+def test_lxml_matches_bs4(page):
+    html = page.read_text(encoding="utf-8")
+    expected = parse_officer_details_bs4(html)
+    actual = extract_officer_details(html)
+
+    assert list(actual) == list(expected)
+    expected_fields = dict(flatten(expected))
+    actual_fields = dict(flatten(actual))
+    assert actual_fields.keys() == expected_fields.keys()
+    for path, value in expected_fields.items():
+        assert actual_fields[path] == value, "/".join(map(str, path))
+
+
+def test_fixtures_cover_every_section():
+    parsed = [extract_officer_details(page.read_text(encoding="utf-8")) for page in FIXTURES]
+    assert any(p["experience"] for p in parsed)
+    assert any(p["awards"] for p in parsed)
+    assert any(p["training"].get("foreign") for p in parsed)
+    assert any(not p["education"] for p in parsed)
+
+
+@pytest.mark.parametrize("cell, lines", [
+    ("<td>Joint Secretary<br/>Level 14</td>", ["Joint Secretary", "Level 14"]),
+    ("<td><span>a<br/>b</span></td>", ["<span>a", "b</span>"]),
+    ("<td><br/>Collector <!-- acting --><br/>District</td>", ["Collector <!-- acting -->", "District"]),
+    ("<td>Test &amp; Welfare<br></td>", ["Test &amp; Welfare"]),
+    ("<td>   </td>", [" "]),
+])
+def test_lines_split_on_every_br(cell, lines):
+    from lxml import html as lxml_html
+    from bs4 import BeautifulSoup
+
+    td = lxml_html.fromstring(f"<table><tr>{cell}</tr></table>").find(".//td")
+    reference = BeautifulSoup(cell, "html.parser").td.decode_contents().split("<br/>")
+    assert _lines(td) == lines == ([part.strip() for part in reference if part.strip()] or [" "])
@@ -0,0 +1,90 @@
+# tests/test_embedding_backends.py
+#
+# The reduced-precision and ONNX backends (embedding_backends.BACKENDS) against
+# the fp32 PyTorch model: every text's vector must point the same way (cosine ≥
+# a per-backend threshold). Uses a tiny randomly initialised BERT saved as a
+# sentence-transformers model, so no download is needed.
+
+import importlib.util
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("sentence_transformers")
+
+import embedding_backends
+from embedding_backends import BACKENDS
+
+TEXTS = [
+    "Joint Secretary with experience in public finance",
+    "officer who worked on e-governance projects in MeitY",
+    "Collector with rural development background in Bihar",
+    "health secretary with a medical degree",
+    "B.Tech from IIT Delhi, MBA, Director in the Department of Expenditure",
+    "Deputy Commissioner, Principal Secretary (Urban Development), Chief Secretary",
+]
+# Different texts reach ~0.96 on the random model, so int8 must stay well above that
+MIN_COSINE = {"torch": 0.9999, "onnx": 0.999, "torch-int8": 0.99, "onnx-int8": 0.99}
+NEEDS = {"onnx": ("onnxruntime", "optimum"), "onnx-int8": ("onnxruntime", "optimum")}
+
+
+@pytest.fixture(scope="module")
+def model_dir(tmp_path_factory):
+    import torch
+    from sentence_transformers import SentenceTransformer, models
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+
+    directory = tmp_path_factory.mktemp("tiny_st")
+    words = sorted({w for text in TEXTS for w in text.lower().replace(",", " ").split()})
+    letters = "abcdefghijklmnopqrstuvwxyz0123456789.-()"
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", *letters, *(f"##{c}" for c in letters), *words]
+    (directory / "vocab.txt").write_text("\n".join(vocab) + "\n", encoding="utf-8")
+
+    torch.manual_seed(0)
+    config = BertConfig(vocab_size=len(vocab), hidden_size=64, num_hidden_layers=2, num_attention_heads=4,
+                        intermediate_size=128, max_position_embeddings=128)
+    hf_dir = directory / "hf"
+    BertModel(config).save_pretrained(hf_dir)
+    BertTokenizerFast(vocab_file=str(directory / "vocab.txt")).save_pretrained(hf_dir)
+
+    transformer = models.Transformer(str(hf_dir), max_seq_length=64)
+    pooling = models.Pooling(transformer.get_word_embedding_dimension(), pooling_mode="mean")
+    SentenceTransformer(modules=[transformer, pooling], device="cpu").save(str(directory / "st"))
+    return directory / "st"
+
+
+def cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return (a * b).sum(axis=1)
+
+
+@pytest.fixture(scope="module")
+def baseline(model_dir):
+    return BACKENDS["torch"](str(model_dir)).encode(TEXTS, convert_to_numpy=True)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backend_agrees_with_fp32(backend, model_dir, baseline, tmp_path, monkeypatch):
+    for module in NEEDS.get(backend, ()):
+        if importlib.util.find_spec(module) is None:
+            pytest.skip(f"{backend} needs '{module}'")
+    monkeypatch.setattr(embedding_backends, "ONNX_EXPORT_DIR", tmp_path)  # locally quantized models
+
+    vectors = BACKENDS[backend](str(model_dir)).encode(TEXTS, convert_to_numpy=True)
+
+    assert vectors.shape == baseline.shape
+    assert cosine_rows(baseline, vectors).min() >= MIN_COSINE[backend]
+
+
+def test_batched_and_single_encodes_agree(model_dir, baseline):
+    """Padding in a mixed-length batch must not change a text's vector."""
+    model = BACKENDS["torch"](str(model_dir))
+    single = np.stack([model.encode(text, convert_to_numpy=True) for text in TEXTS])
+    assert cosine_rows(baseline, single).min() >= MIN_COSINE["torch"]
+
+
+def test_load_model_rejects_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown embedding backend"):
+        embedding_backends.load_model("any", "tensorrt")
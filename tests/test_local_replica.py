@@ -0,0 +1,123 @@
+# tests/test_local_replica.py
+#
+# The in-process replica against local-mode Qdrant on a small synthetic
+# collection: same officers and scores for dense section searches and for BM25
+# (Modifier.IDF) lexical searches, with and without filters.
+
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import (
+    Distance,
+    FieldCondition,
+    Filter,
+    MatchValue,
+    Modifier,
+    PointStruct,
+    QueryRequest,
+    Range,
+    SparseVectorParams,
+    VectorParams,
+)
+
+import local_replica
+from config import EMBEDDING_SECTIONS, LEXICAL_VECTOR, PAYLOAD_PROFILES
+from lexical_index import sparse_document, sparse_query
+from local_replica import LocalReplica
+
+COLLECTION = "replica_test"
+DIM = 16
+WORDS = ("finance budget revenue health education urban transport rural roads water energy meity dopt "
+         "b.tech economics policy welfare district collector secretary").split()
+FILTERS = {
+    "none": None,
+    "cadre": Filter(must=[FieldCondition(key="cadre", match=MatchValue(value="Test Cadre A"))]),
+    "year": Filter(must=[FieldCondition(key="allotment_year", range=Range(gte=2005))]),
+    "title": Filter(should=[FieldCondition(key="current_title", match=MatchValue(value=title))
+                            for title in ("Joint Secretary", "Director")]),
+}
+
+
+@pytest.fixture(scope="module")
+def collection(tmp_path_factory):
+    rng = np.random.default_rng(3)
+    client = QdrantClient(path=str(tmp_path_factory.mktemp("qdrant")))
+    client.create_collection(
+        COLLECTION,
+        vectors_config={section: VectorParams(size=DIM, distance=Distance.COSINE) for section in EMBEDDING_SECTIONS},
+        sparse_vectors_config={LEXICAL_VECTOR: SparseVectorParams(modifier=Modifier.IDF)},
+    )
+    points = []
+    for i in range(120):
+        text = " ".join(rng.choice(WORDS, size=rng.integers(5, 40)))
+        vector = {section: rng.normal(size=DIM).tolist() for section in EMBEDDING_SECTIONS if rng.random() > 0.1}
+        vector[LEXICAL_VECTOR] = sparse_document(text)
+        payload = {field: None for field in PAYLOAD_PROFILES["list"]}
+        payload.update({
+            "name": f"Officer {i}",
+            "cadre": f"Test Cadre {'AB'[i % 2]}",
+            "allotment_year": 1995 + i % 20,
+            "current_title": ("Joint Secretary", "Director", "Secretary")[i % 3],
+            "section_hashes": {section: str(i) for section in vector if section != LEXICAL_VECTOR},
+            "text_hash": str(i),
+        })
+        points.append(PointStruct(id=i + 1, vector=vector, payload=payload))
+    client.upsert(COLLECTION, points)
+    return client
+
+
+@pytest.fixture(scope="module")
+def replica(collection, tmp_path_factory):
+    local_replica.current_data_version = lambda: 0  # one fixed data version for sync and reads
+    replica = LocalReplica(tmp_path_factory.mktemp("replica"))
+    replica.sync(collection, collection=COLLECTION)
+    return replica
+
+
+def assert_same(local, remote):
+    assert len(local) == len(remote)
+    for a, b in zip(local, remote):
+        assert len(a.points) == len(b.points)
+        assert [p.score for p in a.points] == pytest.approx([p.score for p in b.points], abs=5e-3)
+        # ids may only differ where scores tie
+        for x, y in zip(a.points, b.points):
+            assert x.id == y.id or abs(x.score - y.score) < 5e-3
+
+
+@pytest.mark.parametrize("name", FILTERS)
+def test_dense_matches_qdrant(collection, replica, name):
+    queries = np.random.default_rng(5).normal(size=(4, DIM)).astype(np.float32)
+    local = replica.search(queries, FILTERS[name], 10)
+    remote = collection.query_batch_points(COLLECTION, requests=[
+        QueryRequest(query=q.tolist(), using=section, filter=FILTERS[name], limit=10)
+        for q in queries for section in EMBEDDING_SECTIONS
+    ])
+    assert_same(local, remote)
+
+
+@pytest.mark.parametrize("name", FILTERS)
+def test_lexical_matches_qdrant(collection, replica, name):
+    queries = [sparse_query(text) for text in ("finance budget", "MeitY B.Tech policy", "rural roads water",
+                                               "district collector welfare", "unmatched words only")]
+    local = replica.lexical_search(queries, FILTERS[name], 10)
+    remote = collection.query_batch_points(COLLECTION, requests=[
+        QueryRequest(query=q, using=LEXICAL_VECTOR, filter=FILTERS[name], limit=10) for q in queries
+    ])
+    assert_same(local, remote)
+    assert any(response.points for response in local)
+
+
+def test_incremental_sync_refetches_changed_text(collection, replica):
+    point = collection.retrieve(COLLECTION, [7], with_payload=True, with_vectors=True)[0]
+    vector = {**point.vector, LEXICAL_VECTOR: sparse_document("energy energy energy transport")}
+    collection.upsert(COLLECTION, [PointStruct(id=7, vector=vector, payload={**point.payload, "text_hash": "new"})])
+
+    stats = replica.sync(collection, collection=COLLECTION)
+    assert stats["vectors_fetched"] == 1
+
+    query = [sparse_query("energy transport")]
+    local = replica.lexical_search(query, None, 5)
+    remote = collection.query_batch_points(COLLECTION, requests=[
+        QueryRequest(query=query[0], using=LEXICAL_VECTOR, limit=5)
+    ])
+    assert_same(local, remote)
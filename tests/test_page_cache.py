@@ -0,0 +1,38 @@
+# tests/test_page_cache.py
+#
+# PageCache entries are only reused by the parser that produced their parsed result.
+
+from page_cache import PageCache
+
+HEADERS = {"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"}
+
+
+def test_same_parser_reuses_the_parse(tmp_path):
+    cache = PageCache(tmp_path)
+    cache.put("url", b"<html>", HEADERS, {"name": "A"}, "lxml/v2")
+
+    entry = cache.get("url", "lxml/v2")
+    assert entry["parsed"] == {"name": "A"}
+    assert cache.conditional_headers(entry) == {"If-None-Match": '"v1"', "If-Modified-Since": HEADERS["Last-Modified"]}
+    assert cache.is_unchanged(entry, 200, b"<html>")
+
+
+def test_other_parser_or_version_misses(tmp_path):
+    cache = PageCache(tmp_path)
+    cache.put("url", b"<html>", HEADERS, {"name": "A"}, "lxml/v2")
+
+    for parser in ("bs4/v2", "lxml/v3"):
+        entry = cache.get("url", parser)
+        assert entry is None
+        assert cache.conditional_headers(entry) == {}  # full download: a 304 would leave nothing to parse
+        assert not cache.is_unchanged(entry, 200, b"<html>")
+
+    cache.put("url", b"<html>", HEADERS, {"name": "A."}, "lxml/v3")
+    assert cache.get("url", "lxml/v3")["parsed"] == {"name": "A."}
+    assert cache.get("url", "lxml/v2") is None
+
+
+def test_entries_without_a_parser_are_misses(tmp_path):
+    cache = PageCache(tmp_path)
+    cache.put("url", b"<html>", HEADERS, {"name": "A"}, None)  # as written before entries named their parser
+    assert cache.get("url", "lxml/v2") is None
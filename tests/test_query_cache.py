@@ -0,0 +1,64 @@
+# tests/test_query_cache.py
+#
+# Persistence of the query embedding cache: entries reloaded after a restart are
+# the most recently used ones, hits included, not just the most recently stored.
+
+import itertools
+import sqlite3
+
+import pytest
+
+import query_cache
+from query_cache import QueryEmbeddingCache
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    """Strictly increasing timestamps, so last_used orderings never tie."""
+    ticks = itertools.count(1)
+    monkeypatch.setattr(query_cache.time, "time", lambda: float(next(ticks)))
+
+
+def last_used(path) -> dict[str, float]:
+    with sqlite3.connect(path) as conn:
+        return dict(conn.execute("SELECT text, last_used FROM query_embeddings"))
+
+
+def test_hits_survive_a_restart(tmp_path):
+    path = tmp_path / "queries.sqlite3"
+    cache = QueryEmbeddingCache(max_entries=3, path=path, persist=True)
+    for i, text in enumerate(("old", "b", "c")):
+        cache.put("m", text, [float(i)])
+    assert cache.get("m", "OLD") == [0.0]  # hit: "old" is now the most recently used
+    cache.close()
+
+    restarted = QueryEmbeddingCache(max_entries=2, path=path, persist=True)
+    assert list(restarted.entries) == [("m", "c"), ("m", "old")]
+    restarted.close()
+
+
+def test_hits_are_written_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(query_cache, "QUERY_CACHE_TOUCH_BATCH", 2)
+    path = tmp_path / "queries.sqlite3"
+    cache = QueryEmbeddingCache(path=path, persist=True)
+    cache.put("m", "a", [1.0])
+    cache.put("m", "b", [2.0])
+    stored = last_used(path)
+
+    cache.get("m", "a")
+    assert last_used(path) == stored  # buffered
+    cache.get("m", "b")
+    touched = last_used(path)
+    assert touched["a"] > stored["a"] and touched["b"] > stored["b"]
+
+    cache.get("m", "a")
+    cache.put("m", "c", [3.0])  # a put writes the buffered hits too
+    assert last_used(path)["a"] > touched["a"]
+    cache.close()
+
+
+def test_memory_only_cache_keeps_no_touches():
+    cache = QueryEmbeddingCache(persist=False)
+    cache.put("m", "a", [1.0])
+    assert cache.get("m", "a") == [1.0]
+    assert cache.stats["hits"] == 1 and not cache._touched
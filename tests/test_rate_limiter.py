@@ -0,0 +1,65 @@
+# tests/test_rate_limiter.py
+#
+# Outcome accounting of AdaptiveLimiter.slot: healthy responses grow the window,
+# errors shrink it, and a cancelled request leaves it alone.
+
+import asyncio
+
+import pytest
+
+from rate_limiter import AdaptiveLimiter
+
+
+def limiter() -> AdaptiveLimiter:
+    return AdaptiveLimiter("test", initial=4, minimum=1, maximum=20, latency_target=60)
+
+
+async def use_slot(limiter: AdaptiveLimiter, body, budget: asyncio.Semaphore | None = None):
+    async with limiter.slot(budget) as outcome:
+        await body(outcome)
+
+
+async def healthy(outcome):
+    pass
+
+
+async def failing(outcome):
+    raise RuntimeError("connection reset")
+
+
+def test_healthy_response_grows_the_window():
+    lim = limiter()
+    asyncio.run(use_slot(lim, healthy))
+    assert lim.window > 4 and lim.in_flight == 0
+    assert lim.stats["requests"] == 1 and list(lim.recent) == [True]
+
+
+def test_error_shrinks_the_window():
+    lim = limiter()
+    with pytest.raises(RuntimeError):
+        asyncio.run(use_slot(lim, failing))
+    assert lim.window == 2 and lim.in_flight == 0 and lim.stats["errors"] == 1
+
+
+def test_cancelled_request_records_no_outcome():
+    lim = limiter()
+    budget = asyncio.Semaphore(1)
+
+    async def main():
+        started = asyncio.Event()
+
+        async def hang(outcome):
+            started.set()
+            await asyncio.sleep(3600)
+
+        task = asyncio.create_task(use_slot(lim, hang, budget))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert lim.window == 4 and lim.in_flight == 0
+    assert lim.latency_ewma is None and not lim.recent
+    assert lim.stats["requests"] == 1 and lim.stats["errors"] == 0
+    assert not budget.locked()  # the shared budget is given back too
@@ -0,0 +1,58 @@
+# tests/test_semantic_search.py
+#
+# The Qdrant filter semantic_search builds from LLM-extracted filters: a year
+# that is not a whole number drops the year condition instead of failing.
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+import semantic_search
+from semantic_search import parse_year
+
+
+@pytest.mark.parametrize("value, year", [
+    (2005, 2005), ("2005", 2005), (" 2005 ", 2005), (2005.0, 2005), ("2005.0", 2005),
+    ("2005.5", None), ("twenty", None), ("", None), (None, None), (True, None), ("nan", None), ("2005-06", None),
+])
+def test_parse_year(value, year):
+    assert parse_year(value) == year
+
+
+@pytest.fixture
+def built_filter(monkeypatch):
+    """Run the tool with the search stubbed out; returns the filter it searched with."""
+    seen = []
+    monkeypatch.setattr(semantic_search, "search_queries", lambda queries, f, limit: seen.append(f) or [[]])
+
+    def run(filters: dict):
+        semantic_search.semantic_search.invoke({"query": "finance", "filters": filters})
+        return seen[-1]
+    return run
+
+
+def year_conditions(qdrant_filter) -> list:
+    return [c for c in (qdrant_filter.must or []) if c.key == "allotment_year"] if qdrant_filter else []
+
+
+def test_exact_year(built_filter):
+    [condition] = year_conditions(built_filter({"current_title": "Director", "allotment_year": "2005"}))
+    assert condition.match.value == 2005
+
+
+@pytest.mark.parametrize("value", ["around 2005", "2005.5", "", "unknown"])
+def test_non_numeric_exact_year_is_skipped(built_filter, value):
+    qdrant_filter = built_filter({"current_title": "Director", "allotment_year": value, "cadre": "Gujarat"})
+    assert year_conditions(qdrant_filter) == []
+    assert [c.key for c in qdrant_filter.must] == ["cadre"]
+
+
+def test_year_range(built_filter):
+    filters = {"current_title": "Director", "allotment_year": "2005", "allotment_year_operation": "after"}
+    [condition] = year_conditions(built_filter(filters))
+    assert condition.range.gt == 2005
+
+
+def test_non_numeric_year_range_is_skipped(built_filter):
+    filters = {"current_title": "Director", "allotment_year": "mid-2000s", "allotment_year_operation": "before"}
+    assert year_conditions(built_filter(filters)) == []